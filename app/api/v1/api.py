@@ -1,6 +1,9 @@
 from fastapi import APIRouter
 
-from .routers import vcd
+from .routers import health, inventory, statistics, vcd
 
 api_v1_router = APIRouter()
 api_v1_router.include_router(vcd.router)
+api_v1_router.include_router(statistics.router)
+api_v1_router.include_router(inventory.router)
+api_v1_router.include_router(health.router)
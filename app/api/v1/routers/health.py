@@ -0,0 +1,19 @@
+import json
+
+from fastapi import APIRouter, Depends, Response
+
+from app.executor import BlockingCallExecutor
+from app.providers.stubs import BlockingCallExecutorStub
+
+router = APIRouter()
+
+
+@router.get('/health')
+async def health(
+        blocking_call_executor: BlockingCallExecutor = Depends(BlockingCallExecutorStub)
+) -> Response:
+    """Получает счётчики процесса: очередь и время
+    ожидания пула потоков синхронных вызовов `pyvcloud`."""
+    return Response(json.dumps({
+        'executor': blocking_call_executor.get_statistics()
+    }))
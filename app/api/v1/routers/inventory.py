@@ -0,0 +1,70 @@
+import json
+import logging
+
+from fastapi import APIRouter, Depends, Query, Response, status
+
+from app.core.settings import constants
+from app.db.models.vm import VMInventoryModel
+from app.exceptions import VMNotFoundException
+from app.providers.stubs import VMRepositoryStub
+from app.repositories import VMRepository
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+@router.get('/inventory')
+async def vm_inventory(
+        vdc_title: str = Query(None, alias='VDC_TITLE', description='Название vDC'),
+        vapp_title: str = Query(None, alias='VAPP_TITLE', description='Название vApp'),
+        power_status: str = Query(
+            None, alias='POWER_STATUS', description='Статус ВМ, например POWERED_ON'
+        ),
+        vm_repository: VMRepository = Depends(VMRepositoryStub)
+) -> Response:
+    """Получает ВМ из локального инвентаря без обращения к vCD."""
+    logger.info(constants.INCOMING_INVENTORY_REQUEST_MESSAGE, {
+        'vdc_title': vdc_title,
+        'vapp_title': vapp_title,
+        'power_status': power_status
+    })
+    vm_inventory_models = await vm_repository.get_all_inventory(
+        vdc_title=vdc_title,
+        vapp_title=vapp_title,
+        power_status=power_status
+    )
+    return Response(json.dumps([
+        _serialize_vm_inventory(vm_inventory_model)
+        for vm_inventory_model in vm_inventory_models
+    ]))
+
+
+@router.get('/inventory/{vm_id}')
+async def vm_inventory_item(
+        vm_id: str,
+        vm_repository: VMRepository = Depends(VMRepositoryStub)
+) -> Response:
+    """Получает ВМ из локального инвентаря по ID."""
+    vm_inventory_model = await vm_repository.get_inventory(vm_id)
+    if vm_inventory_model is None:
+        raise VMNotFoundException(
+            content=constants.VM_NOT_FOUND_IN_INVENTORY_MESSAGE,
+            status_code=status.HTTP_404_NOT_FOUND
+        )
+    return Response(json.dumps(_serialize_vm_inventory(vm_inventory_model)))
+
+
+def _serialize_vm_inventory(vm_inventory_model: VMInventoryModel) -> dict:
+    """Переводит ВМ инвентаря в объект ответа."""
+    return {
+        'VM_ID': vm_inventory_model.vm_id,
+        'VM_TITLE': vm_inventory_model.title,
+        'VDC_TITLE': vm_inventory_model.vdc_title,
+        'VAPP_TITLE': vm_inventory_model.vapp_title,
+        'status': vm_inventory_model.power_status,
+        'CPU': vm_inventory_model.cpu,
+        'RAM': vm_inventory_model.ram,
+        'HDD': vm_inventory_model.hdd,
+        'modified_at': vm_inventory_model.modified_at.isoformat(),
+        'synced_at': vm_inventory_model.synced_at.isoformat(),
+    }
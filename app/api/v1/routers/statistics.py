@@ -0,0 +1,72 @@
+import json
+import logging
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from app.api.v1.schemas.statistics import StatisticsQueryParamsSchema
+from app.core.settings import constants
+from app.providers.stubs import (
+    VCDControllerStub,
+    VMRepositoryStub
+)
+from app.repositories import VMRepository
+from app.service import VCDController
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+@router.get('/statistics')
+async def vm_statistics(
+        params: StatisticsQueryParamsSchema = Depends(),
+        vm_repository: VMRepository = Depends(VMRepositoryStub),
+        vcd_controller: VCDController = Depends(VCDControllerStub)
+) -> StreamingResponse:
+    """Потоково возвращает историю статистики ВМ или ВМ vApp
+    в формате JSON Lines: одна строка - одно значение серии."""
+    resolution = params.get_resolution()
+    logger.info(constants.INCOMING_STATISTICS_REQUEST_MESSAGE, {
+        'vm_id': params.vm_id,
+        'vapp_title': params.vapp_title,
+        'resolution': resolution
+    })
+    vm_ids = await vcd_controller.list_statistics_vm_ids(params)
+    metric_columns = params.get_metric_columns()
+    rows = vm_repository.stream_statistics(
+        vm_ids,
+        resolution=resolution,
+        metric_columns=list(metric_columns.values()),
+        from_time=params.from_time,
+        to_time=params.to_time
+    )
+    return StreamingResponse(
+        _serialize_statistics(rows, metric_columns=metric_columns),
+        media_type='application/x-ndjson'
+    )
+
+
+async def _serialize_statistics(
+        rows: AsyncIterator[dict],
+        *,
+        metric_columns: dict[str, str]
+) -> AsyncIterator[str]:
+    """Переводит строки статистики в строки JSON Lines."""
+    async for row in rows:
+        item = {'VM_ID': row['vm_id'], 'time': row['time'].isoformat()}
+        if 'samples' in row:
+            item['samples'] = row['samples']
+            item['metrics'] = {
+                metric_name: {
+                    aggregate: row[f'{column}_{aggregate}']
+                    for aggregate in ('min', 'avg', 'max', 'p95')
+                }
+                for metric_name, column in metric_columns.items()
+            }
+        else:
+            item['metrics'] = {
+                metric_name: row[column]
+                for metric_name, column in metric_columns.items()
+            }
+        yield json.dumps(item) + '\n'
@@ -1,14 +1,18 @@
 import json
 import logging
 
-from fastapi import APIRouter, Depends, Response
+from fastapi import APIRouter, Body, Depends, Query, Response, status
 
-from app.api.v1.schemas.vcd import VCDQueryParamsSchema
+from app.api.v1.schemas.vcd import VCDQueryParamsSchema, VCDJobSchema
 from app.core.settings import constants
 from app.core.settings.constants import INCOMING_REQUEST_MESSAGE
+from app.exceptions import JobNotFoundException
 from app.providers.stubs import (
-    VCDControllerStub
+    JobRepositoryStub,
+    VCDControllerStub,
+    VCDTaskRepositoryStub
 )
+from app.repositories import JobRepository, VCDTaskRepository
 from app.service import VCDController
 
 logger = logging.getLogger(__name__)
@@ -23,9 +27,88 @@ async def vcd(
     logger.info(INCOMING_REQUEST_MESSAGE, {
         k: v for k, v in params.__dict__.items() if v is not None
     })
+    if vcd_controller.is_enqueueable(params):
+        job_id = await vcd_controller.enqueue_job_type_handler(params)
+        return Response(job_id, status_code=status.HTTP_202_ACCEPTED)
     response = await vcd_controller.call_job_type_handler(params)
     if response is None:
         return Response(constants.JOB_TYPE_WAS_SENT)
     if isinstance(response, str):
         return Response(response)
     return Response(json.dumps(response))
+
+
+@router.post('/batch')
+async def vcd_batch(
+        jobs: list[VCDJobSchema],
+        vcd_controller: VCDController = Depends(VCDControllerStub)
+) -> Response:
+    """Выполняет пакет работ и возвращает результат каждой из них."""
+    logger.info(constants.INCOMING_BATCH_REQUEST_MESSAGE, {
+        'count': len(jobs)
+    })
+    results = await vcd_controller.call_job_type_handlers(jobs)
+    return Response(json.dumps(results))
+
+
+@router.post('/statuses')
+async def vcd_statuses(
+        vm_ids: list[str] = Body(..., description='ID ВМ'),
+        vcd_controller: VCDController = Depends(VCDControllerStub)
+) -> Response:
+    """Получает статусы нескольких ВМ запросами к query API vCD."""
+    logger.info(constants.INCOMING_STATUSES_REQUEST_MESSAGE, {
+        'count': len(vm_ids)
+    })
+    statuses = await vcd_controller.vm_get_power_statuses(vm_ids)
+    return Response(json.dumps(statuses))
+
+
+@router.get('/jobs/{job_id}')
+async def vcd_job(
+        job_id: str,
+        job_repository: JobRepository = Depends(JobRepositoryStub)
+) -> Response:
+    """Получает состояние и результат асинхронной работы."""
+    job_model = await job_repository.get(job_id)
+    if job_model is None:
+        raise JobNotFoundException(
+            content=constants.JOB_NOT_FOUND_MESSAGE,
+            status_code=status.HTTP_404_NOT_FOUND
+        )
+    return Response(json.dumps({
+        'JOB_ID': job_model.id,
+        'JOB_TYPE': job_model.job_type,
+        'VM_ID': job_model.vm_id,
+        'status': job_model.status,
+        'status_code': job_model.status_code,
+        'content': job_model.result,
+        'created_at': job_model.created_at.isoformat(),
+        'finished_at': job_model.finished_at and job_model.finished_at.isoformat(),
+    }))
+
+
+@router.get('/tasks')
+async def vcd_tasks(
+        vm_id: str = Query(..., alias='VM_ID', description='ID ВМ'),
+        limit: int = Query(
+            20, alias='LIMIT', ge=1, le=100,
+            description='Количество последних задач'
+        ),
+        vcd_task_repository: VCDTaskRepository = Depends(VCDTaskRepositoryStub)
+) -> Response:
+    """Получает статусы последних задач vCD, запущенных операциями над ВМ."""
+    vcd_task_models = await vcd_task_repository.get_all_by_vm(vm_id, limit=limit)
+    return Response(json.dumps([
+        {
+            'TASK_ID': vcd_task_model.id,
+            'JOB_TYPE': vcd_task_model.operation,
+            'status': vcd_task_model.status,
+            'created_at': vcd_task_model.created_at.isoformat(),
+            'finished_at': (
+                vcd_task_model.finished_at
+                and vcd_task_model.finished_at.isoformat()
+            ),
+        }
+        for vcd_task_model in vcd_task_models
+    ]))
@@ -0,0 +1,112 @@
+import datetime
+import logging
+from enum import Enum
+
+from fastapi import Query, status
+
+from app.core.settings import constants
+from app.exceptions import QueryParamsException
+
+logger = logging.getLogger(__name__)
+
+
+class StatisticsResolutionEnum(Enum):
+    AUTO = 'auto'
+    RAW = 'raw'
+    FIVE_MINUTES = '5m'
+    HOUR = '1h'
+    DAY = '1d'
+
+
+class StatisticsQueryParamsSchema:
+    """Схема параметров запроса истории статистики ВМ."""
+
+    def __init__(
+            self,
+            from_time: datetime.datetime = Query(
+                ...,
+                alias='FROM',
+                description='Начало периода',
+            ),
+            to_time: datetime.datetime = Query(
+                None,
+                alias='TO',
+                description='Конец периода, по умолчанию текущее время',
+            ),
+            vm_id: str = Query(
+                None,
+                alias='VM_ID',
+                description='Идентификатор ВМ из vCloud Director',
+            ),
+            vapp_title: str = Query(
+                None,
+                alias='VAPP_TITLE',
+                description='Название vApp, по ВМ которого возвращается статистика',
+            ),
+            vdc_title: str = Query(
+                None,
+                alias='VDC_TITLE',
+                description='Название vDC',
+            ),
+            resolution: StatisticsResolutionEnum = Query(
+                StatisticsResolutionEnum.AUTO,
+                alias='RESOLUTION',
+                description='Интервал значений: сырые записи, 5m, 1h, 1d или выбор по периоду',
+            ),
+            metrics: str = Query(
+                None,
+                alias='METRICS',
+                description='Метрики vCD через запятую, по умолчанию все',
+            ),
+    ) -> None:
+        self.from_time = self._to_naive_local_time(from_time)
+        self.to_time = self._to_naive_local_time(to_time or datetime.datetime.now())
+        self.vm_id = vm_id
+        self.vapp_title = vapp_title
+        self.vdc_title = vdc_title
+        self.resolution = resolution
+        self.metrics = metrics.split(',') if metrics else list(constants.VM_METRIC_COLUMNS)
+        self._validate()
+
+    def get_resolution(self) -> str:
+        """Получает интервал значений, при автоматическом выборе -
+        самый мелкий интервал, подходящий для длины периода."""
+        if self.resolution != StatisticsResolutionEnum.AUTO:
+            return self.resolution.value
+        period = self.to_time - self.from_time
+        for max_period, resolution in constants.STATISTICS_AUTO_RESOLUTIONS:
+            if period <= max_period:
+                return resolution
+        return StatisticsResolutionEnum.DAY.value
+
+    def get_metric_columns(self) -> dict[str, str]:
+        """Получает колонки запрошенных метрик."""
+        return {
+            metric_name: constants.VM_METRIC_COLUMNS[metric_name]
+            for metric_name in self.metrics
+        }
+
+    @staticmethod
+    def _to_naive_local_time(time: datetime.datetime) -> datetime.datetime:
+        """Переводит время с часовым поясом в локальное время без пояса,
+        в котором хранится статистика. Время без пояса считается локальным."""
+        if time.tzinfo is None:
+            return time
+        return time.astimezone().replace(tzinfo=None)
+
+    def _validate(self) -> None:
+        """Валидация объекта статистики, периода и метрик."""
+        is_valid = (
+            (self.vm_id is None) != (self.vapp_title is None)
+            and self.from_time < self.to_time
+            and all(
+                metric_name in constants.VM_METRIC_COLUMNS
+                for metric_name in self.metrics
+            )
+        )
+        if not is_valid:
+            logger.error(constants.INVALID_QUERY_PARAMS_MESSAGE)
+            raise QueryParamsException(
+                content=constants.INVALID_QUERY_PARAMS_MESSAGE,
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY
+            )
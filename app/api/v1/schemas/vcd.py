@@ -2,6 +2,7 @@ import logging
 from enum import Enum
 
 from fastapi import Query, status
+from pydantic import BaseModel, Field
 
 from app.core.settings import constants
 from app.exceptions import (
@@ -26,6 +27,25 @@ class JobTypeEnum(Enum):
     VM_GET_CONSOLE_URL = 'GET_CONSOLE_URL'
 
 
+# работы, которые можно выполнить асинхронно через Celery
+MUTATING_JOB_TYPES = frozenset({
+    JobTypeEnum.VM_CREATE.value,
+    JobTypeEnum.VM_SET_CPU.value,
+    JobTypeEnum.VM_SET_RAM.value,
+    JobTypeEnum.VM_SET_HDD.value,
+    JobTypeEnum.VM_POWER_ON.value,
+    JobTypeEnum.VM_POWER_OFF.value,
+    JobTypeEnum.VM_POWER_RESET.value,
+    JobTypeEnum.VM_CREATE_SNAPSHOT.value,
+})
+
+class JobStatusEnum(Enum):
+    PENDING = 'PENDING'
+    RUNNING = 'RUNNING'
+    SUCCEEDED = 'SUCCEEDED'
+    FAILED = 'FAILED'
+
+
 class VCDQueryParamsSchema:
     """Схема параметров запроса."""
 
@@ -86,6 +106,11 @@ class VCDQueryParamsSchema:
                 alias='DISK_NUMBER',
                 description='Номер диска'
             ),
+            is_async: bool = Query(
+                False,
+                alias='ASYNC',
+                description='Поставить работу в очередь и сразу вернуть её идентификатор'
+            ),
     ) -> None:
         self.job_type = job_type
         self.vm_id = vm_id
@@ -98,8 +123,16 @@ class VCDQueryParamsSchema:
         self.ram = ram
         self.hdd = hdd
         self.disk_number = disk_number
+        self.is_async = is_async
         self._validate_job_type()
 
+    def to_dict(self) -> dict:
+        """Параметры работы для передачи в задачу Celery."""
+        return {
+            key: value for key, value in self.__dict__.items()
+            if key != 'is_async'
+        }
+
     def _validate_vm_create(self) -> None:
         """Валидация параметров для создания ВМ."""
         if not all((self.template_id, self.vm_title, self.os_password)):
@@ -175,3 +208,26 @@ class VCDQueryParamsSchema:
                 content=constants.INVALID_JOB_TYPE_MESSAGE,
                 status_code=status.HTTP_400_BAD_REQUEST
             )
+
+
+class VCDJobSchema(BaseModel):
+    """Схема работы пакетного запроса.
+    Поля совпадают с параметрами запроса `VCDQueryParamsSchema`."""
+    job_type: str = Field(..., alias='JOB_TYPE')
+    vm_id: str | None = Field(None, alias='VM_ID')
+    vm_title: str | None = Field(None, alias='VM_TITLE')
+    os_password: str | None = Field(None, alias='OS_PASS')
+    template_id: int | None = Field(None, alias='TEMPLATE_ID')
+    vdc_title: str | None = Field(None, alias='VDC_TITLE')
+    vapp_title: str | None = Field(None, alias='VAPP_TITLE')
+    cpu: int | None = Field(None, alias='CPU')
+    ram: int | None = Field(None, alias='RAM')
+    hdd: int | None = Field(None, alias='HDD')
+    disk_number: int | None = Field(None, alias='DISK_NUMBER')
+
+    class Config:
+        allow_population_by_field_name = True
+
+    def to_query_params(self) -> VCDQueryParamsSchema:
+        """Валидирует работу по правилам `VCDQueryParamsSchema`."""
+        return VCDQueryParamsSchema(**self.dict(), is_async=False)
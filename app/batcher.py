@@ -0,0 +1,130 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Hashable
+
+
+@dataclass
+class _Batch:
+    """Собираемая пачка элементов с ожидающими результата вызовами."""
+    items: list = field(default_factory=list)
+    futures: list[asyncio.Future] = field(default_factory=list)
+    is_full: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+class Batcher:
+    """Объединение вызовов процесса в пачки по ключу:
+    элементы, пришедшие в течение `window` секунд после первого,
+    обрабатываются одним вызовом, а его результат или исключение
+    получает каждый из вызвавших. Пачки одного ключа обрабатываются
+    по очереди, пока обрабатывается пачка, собирается следующая.
+    Пачка обрабатывается отдельной задачей, поэтому отмена любого
+    из вызвавших не отменяет её для остальных. Если обработка пачки
+    из нескольких элементов завершилась одним из `split_exceptions`,
+    то её элементы обрабатываются повторно по одному, чтобы ошибка
+    одного элемента не передавалась остальным."""
+
+    def __init__(
+            self,
+            *,
+            window: float,
+            max_size: int,
+            split_exceptions: tuple[type[Exception], ...] = ()
+    ) -> None:
+        self._window = window
+        self._max_size = max_size
+        self._split_exceptions = split_exceptions
+        self._batches: dict[Hashable, _Batch] = {}
+        # последняя запущенная обработка пачки ключа
+        self._flushes: dict[Hashable, asyncio.Task] = {}
+
+    async def submit(
+            self,
+            key: Hashable,
+            item: Any,
+            function: Callable[[list], Awaitable]
+    ) -> Any:
+        """Добавляет элемент в собираемую пачку ключа и дожидается
+        результата её обработки. Первый элемент пачки запускает
+        её обработку функцией `function`."""
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = _Batch()
+            self._batches[key] = batch
+            self._start_flush(key, batch, function)
+        future = asyncio.get_running_loop().create_future()
+        batch.items.append(item)
+        batch.futures.append(future)
+        if len(batch.items) >= self._max_size:
+            self._close(key, batch)
+        return await asyncio.shield(future)
+
+    def _start_flush(
+            self,
+            key: Hashable,
+            batch: _Batch,
+            function: Callable[[list], Awaitable]
+    ) -> None:
+        """Запускает обработку пачки после обработки предыдущей пачки ключа."""
+        previous_flush = self._flushes.get(key)
+        flush = asyncio.create_task(
+            self._flush(key, batch, function, previous_flush=previous_flush)
+        )
+        self._flushes[key] = flush
+        flush.add_done_callback(lambda _: self._forget_flush(key, flush))
+
+    def _forget_flush(self, key: Hashable, flush: asyncio.Task) -> None:
+        """Забывает завершённую обработку, если после неё не запущено другой."""
+        if self._flushes.get(key) is flush:
+            del self._flushes[key]
+
+    async def _flush(
+            self,
+            key: Hashable,
+            batch: _Batch,
+            function: Callable[[list], Awaitable],
+            *,
+            previous_flush: asyncio.Task | None
+    ) -> None:
+        """Дожидается сбора пачки и обработки предыдущей, после чего
+        обрабатывает пачку и передаёт результат ожидающим вызовам."""
+        try:
+            await asyncio.wait_for(batch.is_full.wait(), timeout=self._window)
+        except asyncio.TimeoutError:
+            pass
+        self._close(key, batch)
+        if previous_flush is not None:
+            await asyncio.wait([previous_flush])
+        await self._process(batch.items, batch.futures, function)
+
+    async def _process(
+            self,
+            items: list,
+            futures: list[asyncio.Future],
+            function: Callable[[list], Awaitable]
+    ) -> None:
+        """Обрабатывает элементы одним вызовом и передаёт
+        результат либо исключение ожидающим вызовам."""
+        try:
+            result = await function(items)
+        except asyncio.CancelledError:
+            for future in futures:
+                future.cancel()
+            raise
+        except BaseException as exception:
+            if len(items) > 1 and isinstance(exception, self._split_exceptions):
+                for item, future in zip(items, futures):
+                    await self._process([item], [future], function)
+                return
+            for future in futures:
+                future.set_exception(exception)
+                # ожидавший вызов мог быть отменён и не забрать исключение
+                future.exception()
+            return
+        for future in futures:
+            future.set_result(result)
+
+    def _close(self, key: Hashable, batch: _Batch) -> None:
+        """Прекращает приём элементов в пачку."""
+        if self._batches.get(key) is batch:
+            del self._batches[key]
+        batch.is_full.set()
@@ -0,0 +1,384 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Iterable
+
+import asyncpg
+from lxml.objectify import ObjectifiedElement
+
+from app.core.settings import constants
+
+logger = logging.getLogger(__name__)
+
+
+class PostgresListener:
+    """Подписка процесса на уведомления Postgres LISTEN/NOTIFY.
+    Держит одно соединение asyncpg на все каналы. Обработчик получает
+    данные уведомления, а при подключении и при разрыве соединения
+    вызывается без них (`None`) - уведомления в это время могли быть пропущены."""
+
+    def __init__(self, *, dsn: str, reconnect_interval: float) -> None:
+        self._dsn = dsn
+        self._reconnect_interval = reconnect_interval
+        self._callbacks: dict[str, list[Callable[[str | None], None]]] = {}
+        self._connection: asyncpg.Connection | None = None
+        self._connect_attempted_at = float('-inf')
+        # соединение не выполняет несколько запросов одновременно
+        self._notify_lock = asyncio.Lock()
+
+    def subscribe(
+            self,
+            channel: str,
+            callback: Callable[[str | None], None]
+    ) -> None:
+        """Подписывает обработчик на канал уведомлений."""
+        self._callbacks.setdefault(channel, []).append(callback)
+
+    async def ensure_connected(self) -> bool:
+        """Подключается и подписывается на каналы, если подписки ещё нет."""
+        if self._connection is not None and not self._connection.is_closed():
+            return True
+        now = time.monotonic()
+        if now - self._connect_attempted_at < self._reconnect_interval:
+            return False
+        self._connect_attempted_at = now
+        try:
+            connection = await asyncpg.connect(self._dsn)
+            for channel in self._callbacks:
+                await connection.add_listener(channel, self._on_notification)
+        except (OSError, asyncpg.PostgresError) as exception:
+            logger.warning(constants.POSTGRES_LISTENER_FAILED_MESSAGE, {
+                'exception': str(exception)
+            })
+            return False
+        connection.add_termination_listener(self._on_termination)
+        self._connection = connection
+        self._notify_all()
+        return True
+
+    async def notify(self, channel: str, payload: str = '') -> None:
+        """Отправляет уведомление в канал всем процессам, включая текущий.
+        Уведомление отправляется через соединение подписки, вне сессий БД
+        запросов, а при ошибке только логируется: кэши остальных процессов
+        в этом случае устаревают не дольше срока жизни записей."""
+        if not await self.ensure_connected():
+            return
+        try:
+            async with self._notify_lock:
+                if self._connection is not None:
+                    await self._connection.execute(
+                        'SELECT pg_notify($1, $2)', channel, payload
+                    )
+        except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as exception:
+            logger.warning(constants.POSTGRES_NOTIFY_FAILED_MESSAGE, {
+                'channel': channel,
+                'exception': str(exception)
+            })
+
+    async def close(self) -> None:
+        """Закрывает соединение подписки."""
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+        self._notify_all()
+
+    def _notify_all(self) -> None:
+        """Вызывает обработчики всех каналов."""
+        for callbacks in self._callbacks.values():
+            for callback in callbacks:
+                callback(None)
+
+    def _on_notification(self, _, __, channel: str, payload: str) -> None:
+        """Обработчик уведомления из канала."""
+        logger.debug('Postgres notification', {'channel': channel})
+        for callback in self._callbacks.get(channel, []):
+            callback(payload)
+
+    def _on_termination(self, _) -> None:
+        """Обработчик разрыва соединения подписки."""
+        logger.warning(constants.POSTGRES_LISTENER_FAILED_MESSAGE)
+        self._connection = None
+        self._notify_all()
+
+
+class SettingsCache:
+    """Кэш настроек приложения в памяти процесса.
+    Сбрасывается по уведомлению Postgres LISTEN/NOTIFY
+    при изменении таблицы `settings` любым процессом.
+    Пока подписка на уведомления не установлена, кэш не используется."""
+
+    def __init__(self, *, listener: PostgresListener, ttl: float) -> None:
+        self._listener = listener
+        self._ttl = ttl
+        self._settings: dict[str, Any] | None = None
+        self._cached_at = 0.0
+        self.version = 0
+        listener.subscribe(
+            constants.SETTINGS_CHANGED_CHANNEL, lambda _: self.invalidate()
+        )
+
+    async def get(self) -> dict[str, Any] | None:
+        """Получает закэшированные значения настроек."""
+        if not await self._listener.ensure_connected():
+            return None
+        if self._settings is None:
+            return None
+        if time.monotonic() - self._cached_at >= self._ttl:
+            return None
+        return self._settings
+
+    def set(self, settings: dict[str, Any], *, version: int) -> None:
+        """Кэширует значения настроек, если с момента
+        их чтения из БД кэш не был сброшен."""
+        if version != self.version:
+            return
+        self._settings = settings
+        self._cached_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        """Сбрасывает кэш."""
+        self._settings = None
+        self.version += 1
+
+
+@dataclass
+class VMResourceCacheEntry:
+    """Закэшированный ресурс ВМ."""
+    resource: ObjectifiedElement
+    etag: str | None
+    cached_at: float
+
+
+class VMResourceCache:
+    """LRU-кэш ресурсов ВМ процесса с ограниченным сроком жизни.
+    Просроченная запись не удаляется сразу: её ETag
+    используется для условного перезапроса ресурса.
+    Изменённая ВМ сбрасывается во всех процессах через
+    Postgres NOTIFY в канал изменившихся ВМ."""
+
+    def __init__(
+            self,
+            *,
+            listener: PostgresListener,
+            max_size: int,
+            ttl: float
+    ) -> None:
+        self._listener = listener
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries: OrderedDict[str, VMResourceCacheEntry] = OrderedDict()
+
+    def get(self, vm_id: str) -> VMResourceCacheEntry | None:
+        """Получает запись кэша ВМ."""
+        entry = self._entries.get(vm_id)
+        if entry is not None:
+            self._entries.move_to_end(vm_id)
+        return entry
+
+    def is_fresh(self, entry: VMResourceCacheEntry) -> bool:
+        """Проверяет, не истёк ли срок жизни записи."""
+        return time.monotonic() - entry.cached_at < self._ttl
+
+    def set(
+            self,
+            vm_id: str,
+            resource: ObjectifiedElement,
+            *,
+            etag: str | None
+    ) -> None:
+        """Кэширует ресурс ВМ."""
+        self._entries[vm_id] = VMResourceCacheEntry(
+            resource=resource,
+            etag=etag,
+            cached_at=time.monotonic()
+        )
+        self._entries.move_to_end(vm_id)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def touch(self, vm_id: str) -> None:
+        """Продлевает срок жизни записи, подтверждённой vCD."""
+        entry = self._entries.get(vm_id)
+        if entry is not None:
+            entry.cached_at = time.monotonic()
+
+    async def invalidate(self, vm_id: str) -> None:
+        """Удаляет ресурс ВМ из кэша этого и остальных процессов."""
+        self.discard(vm_id)
+        await self._listener.notify(constants.VMS_CHANGED_CHANNEL, vm_id)
+
+    def discard(self, vm_id: str) -> None:
+        """Удаляет ресурс ВМ из кэша этого процесса."""
+        self._entries.pop(vm_id, None)
+
+    def clear(self) -> None:
+        """Очищает кэш."""
+        self._entries.clear()
+
+
+class VMUsageCache:
+    """Кэш процесса текущего использования ресурсов ВМ.
+    Записи старше `max_age` секунд не отдаются."""
+
+    def __init__(self, *, max_size: int, max_age: float) -> None:
+        self._max_size = max_size
+        self.max_age = max_age
+        self._entries: OrderedDict[str, tuple[list[dict], float]] = OrderedDict()
+
+    def get(self, vm_id: str) -> list[dict] | None:
+        """Получает использование ресурсов ВМ, если оно достаточно свежее."""
+        entry = self._entries.get(vm_id)
+        if entry is None:
+            return None
+        metrics, collected_at = entry
+        if time.monotonic() - collected_at >= self.max_age:
+            del self._entries[vm_id]
+            return None
+        return metrics
+
+    def set(self, vm_id: str, metrics: list[dict]) -> None:
+        """Запоминает только что полученное использование ресурсов ВМ."""
+        self._entries[vm_id] = (metrics, time.monotonic())
+        self._entries.move_to_end(vm_id)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, vm_id: str) -> None:
+        """Удаляет использование ресурсов ВМ из кэша."""
+        self._entries.pop(vm_id, None)
+
+    def clear(self) -> None:
+        """Очищает кэш."""
+        self._entries.clear()
+
+
+class VMIdCache:
+    """Кэш процесса ID ВМ в vCD -> первичный ключ таблицы `vm`.
+    Строки ВМ не удаляются, поэтому записи не устаревают,
+    а размер кэша только ограничивается."""
+
+    def __init__(self, *, max_size: int) -> None:
+        self._max_size = max_size
+        self._entries: OrderedDict[str, int] = OrderedDict()
+
+    def get_many(self, vm_ids: Iterable[str]) -> dict[str, int]:
+        """Получает известные первичные ключи ВМ."""
+        return {
+            vm_id: self._entries[vm_id]
+            for vm_id in vm_ids if vm_id in self._entries
+        }
+
+    def set_many(self, vm_pks: dict[str, int]) -> None:
+        """Запоминает первичные ключи ВМ."""
+        self._entries.update(vm_pks)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+
+class HierarchyIndex:
+    """Индекс иерархии организация -> vDC -> vApp процесса.
+    Хранит ресурс организации и ссылки на vApp по названиям
+    с ограниченным сроком жизни. Записи сбрасываются явно,
+    когда поиск по ним не удался, и тогда через Postgres NOTIFY
+    остальные процессы очищают свои индексы целиком."""
+
+    def __init__(self, *, listener: PostgresListener, ttl: float) -> None:
+        self._listener = listener
+        self._ttl = ttl
+        self._entries: dict[Hashable, tuple[Any, float]] = {}
+        listener.subscribe(
+            constants.HIERARCHY_CHANGED_CHANNEL, lambda _: self.clear()
+        )
+
+    def get(self, key: Hashable) -> Any | None:
+        """Получает значение индекса, если его срок не истёк."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, cached_at = entry
+        if time.monotonic() - cached_at >= self._ttl:
+            del self._entries[key]
+            return None
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Добавляет значение в индекс."""
+        self._entries[key] = (value, time.monotonic())
+
+    async def invalidate(self, key: Hashable) -> None:
+        """Удаляет значение из индекса и сбрасывает индексы остальных процессов."""
+        self._entries.pop(key, None)
+        await self._listener.notify(constants.HIERARCHY_CHANGED_CHANNEL)
+
+    def clear(self) -> None:
+        """Очищает индекс."""
+        self._entries.clear()
+
+
+@dataclass
+class TemplateCacheEntry:
+    """Закэшированный шаблон из каталога шаблонов
+    вместе с ресурсом шаблона vApp из vCD."""
+    catalog_template_title: str
+    vapp_template_title: str
+    vm_template_title: str
+    vapp_template_resource: ObjectifiedElement
+    cached_at: float
+
+
+class TemplateCache:
+    """Кэш шаблонов процесса по `template_catalog.id`.
+    Сбрасывается по уведомлению Postgres LISTEN/NOTIFY
+    при изменении таблиц шаблонов и по истечении срока жизни,
+    так как шаблон в самом vCD может измениться без изменения БД."""
+
+    def __init__(self, *, listener: PostgresListener, ttl: float) -> None:
+        self._listener = listener
+        self._ttl = ttl
+        self._entries: dict[int, TemplateCacheEntry] = {}
+        self.version = 0
+        listener.subscribe(
+            constants.TEMPLATES_CHANGED_CHANNEL, lambda _: self.invalidate()
+        )
+
+    async def get(self, template_id: int) -> TemplateCacheEntry | None:
+        """Получает закэшированный шаблон."""
+        if not await self._listener.ensure_connected():
+            return None
+        entry = self._entries.get(template_id)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.cached_at >= self._ttl:
+            del self._entries[template_id]
+            return None
+        return entry
+
+    def set(
+            self,
+            template_id: int,
+            *,
+            catalog_template_title: str,
+            vapp_template_title: str,
+            vm_template_title: str,
+            vapp_template_resource: ObjectifiedElement,
+            version: int
+    ) -> TemplateCacheEntry:
+        """Кэширует шаблон, если с момента его
+        чтения из БД кэш не был сброшен."""
+        entry = TemplateCacheEntry(
+            catalog_template_title=catalog_template_title,
+            vapp_template_title=vapp_template_title,
+            vm_template_title=vm_template_title,
+            vapp_template_resource=vapp_template_resource,
+            cached_at=time.monotonic()
+        )
+        if version == self.version:
+            self._entries[template_id] = entry
+        return entry
+
+    def invalidate(self) -> None:
+        """Сбрасывает кэш."""
+        self._entries.clear()
+        self.version += 1
@@ -0,0 +1,276 @@
+import logging
+
+import httpx
+from lxml import etree, objectify
+from lxml.objectify import ObjectifiedElement
+from pyvcloud.vcd.client import EntityType
+from pyvcloud.vcd.exceptions import (
+    BadRequestException,
+    UnauthorizedException,
+    AccessForbiddenException,
+    NotFoundException,
+    MethodNotAllowedException,
+    NotAcceptableException,
+    RequestTimeoutException,
+    ConflictException,
+    UnsupportedMediaTypeException,
+    InvalidContentLengthException,
+    InternalServerException,
+    UnknownApiException,
+    OperationNotSupportedException
+)
+
+logger = logging.getLogger(__name__)
+
+_EXCEPTIONS_BY_STATUS_CODE = {
+    400: BadRequestException,
+    401: UnauthorizedException,
+    403: AccessForbiddenException,
+    404: NotFoundException,
+    405: MethodNotAllowedException,
+    406: NotAcceptableException,
+    408: RequestTimeoutException,
+    409: ConflictException,
+    415: UnsupportedMediaTypeException,
+    416: InvalidContentLengthException,
+    500: InternalServerException,
+}
+
+
+def find_link_href(
+        resource: ObjectifiedElement,
+        *,
+        rel: str,
+        media_type: str | None = None,
+        name: str | None = None
+) -> str | None:
+    """Ищет ссылку ресурса по отношению, типу и названию."""
+    if not hasattr(resource, 'Link'):
+        return None
+    for link in resource.Link:
+        if link.get('rel') != rel:
+            continue
+        if media_type is not None and link.get('type') != media_type:
+            continue
+        if name is not None and link.get('name') != name:
+            continue
+        return link.get('href')
+    return None
+
+
+class AsyncVCDClient:
+    """Асинхронный клиент API vCD.
+    Повторяет используемую часть `pyvcloud.vcd.client.Client`:
+    те же ресурсы lxml.objectify и те же исключения pyvcloud,
+    но HTTP-запросы не блокируют цикл событий."""
+
+    def __init__(
+            self,
+            *,
+            uri: str,
+            api_version: str,
+            verify_ssl: bool = True,
+            timeout: float = 60,
+            max_connections: int = 100
+    ) -> None:
+        self._uri = uri.rstrip('/')
+        self._api_version = api_version
+        self._http_client = httpx.AsyncClient(
+            verify=verify_ssl,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            ),
+            headers={'Accept': f'application/*+xml;version={api_version}'}
+        )
+        self._session: ObjectifiedElement | None = None
+        self._vcloud_token: str | None = None
+        self._access_token: str | None = None
+
+    def get_api_uri(self) -> str:
+        """Получает базовую ссылку API."""
+        return f'{self._uri}/api'
+
+    def get_vcloud_token(self) -> str | None:
+        """Получает токен сессии `x-vcloud-authorization`."""
+        return self._vcloud_token
+
+    def get_access_token(self) -> str | None:
+        """Получает JWT сессии."""
+        return self._access_token
+
+    def is_authenticated(self) -> bool:
+        """Проверяет наличие сессии у клиента."""
+        return self._vcloud_token is not None
+
+    async def login(self, *, org: str, user: str, password: str) -> None:
+        """Открывает сессию через BasicAuth."""
+        response = await self._request(
+            'POST',
+            f'{self.get_api_uri()}/sessions',
+            auth=(f'{user}@{org}', password)
+        )
+        self._set_vcloud_token(response.headers['x-vcloud-authorization'])
+        self._access_token = response.headers.get('X-VMWARE-VCLOUD-ACCESS-TOKEN')
+        self._session = self._objectify_response(response)
+
+    async def rehydrate_from_token(self, token: str) -> None:
+        """Восстанавливает сессию по токену `x-vcloud-authorization`."""
+        self._set_vcloud_token(token)
+        self._session = await self.get_resource(f'{self.get_api_uri()}/session')
+
+    async def refresh_session(self) -> None:
+        """Перечитывает ресурс текущей сессии,
+        тем самым проверяя, что она ещё действительна."""
+        self._session = await self.get_resource(f'{self.get_api_uri()}/session')
+
+    def reset_session(self) -> None:
+        """Забывает текущую сессию клиента."""
+        self._session = None
+        self._vcloud_token = None
+        self._access_token = None
+        self._http_client.headers.pop('x-vcloud-authorization', None)
+
+    async def close(self) -> None:
+        """Закрывает HTTP-соединения клиента."""
+        await self._http_client.aclose()
+
+    async def get_org(self) -> ObjectifiedElement:
+        """Получает ресурс организации текущей сессии."""
+        return await self.get_linked_resource(
+            self._session, rel='down', media_type=EntityType.ORG.value
+        )
+
+    async def get_resource(self, uri: str) -> ObjectifiedElement | None:
+        """Получает ресурс по ссылке."""
+        response = await self._request('GET', uri)
+        return self._objectify_response(response)
+
+    async def get_resource_if_modified(
+            self,
+            uri: str,
+            *,
+            etag: str | None
+    ) -> tuple[ObjectifiedElement | None, str | None]:
+        """Получает ресурс условным запросом по ETag.
+        Если ресурс не изменился, то вместо него возвращается `None`."""
+        headers = {'If-None-Match': etag} if etag is not None else None
+        response = await self._request('GET', uri, headers=headers)
+        if response.status_code == httpx.codes.NOT_MODIFIED:
+            return None, etag
+        return self._objectify_response(response), response.headers.get('ETag')
+
+    async def put_resource(
+            self,
+            uri: str,
+            contents: ObjectifiedElement,
+            media_type: str
+    ) -> ObjectifiedElement | None:
+        """Изменяет ресурс по ссылке."""
+        response = await self._request(
+            'PUT', uri, contents=contents, media_type=media_type
+        )
+        return self._objectify_response(response)
+
+    async def post_resource(
+            self,
+            uri: str,
+            contents: ObjectifiedElement | None = None,
+            media_type: str | None = None
+    ) -> ObjectifiedElement | None:
+        """Отправляет ресурс по ссылке."""
+        response = await self._request(
+            'POST', uri, contents=contents, media_type=media_type
+        )
+        return self._objectify_response(response)
+
+    async def get_linked_resource(
+            self,
+            resource: ObjectifiedElement,
+            *,
+            rel: str,
+            media_type: str | None = None,
+            name: str | None = None
+    ) -> ObjectifiedElement | None:
+        """Получает связанный ресурс по ссылке из `Link`."""
+        href = self._get_link_href(
+            resource, rel=rel, media_type=media_type, name=name
+        )
+        return await self.get_resource(href)
+
+    async def post_linked_resource(
+            self,
+            resource: ObjectifiedElement,
+            *,
+            rel: str,
+            media_type: str | None = None,
+            contents: ObjectifiedElement | None = None
+    ) -> ObjectifiedElement | None:
+        """Отправляет связанный ресурс по ссылке из `Link`."""
+        href = self._get_link_href(resource, rel=rel, media_type=media_type)
+        return await self.post_resource(href, contents, media_type)
+
+    def _set_vcloud_token(self, token: str) -> None:
+        """Устанавливает токен сессии в заголовки клиента."""
+        self._vcloud_token = token
+        self._http_client.headers['x-vcloud-authorization'] = token
+
+    @staticmethod
+    def _get_link_href(
+            resource: ObjectifiedElement,
+            *,
+            rel: str,
+            media_type: str | None,
+            name: str | None = None
+    ) -> str:
+        """Получает ссылку ресурса, как `pyvcloud` -
+        при отсутствии операция считается неподдерживаемой."""
+        href = find_link_href(resource, rel=rel, media_type=media_type, name=name)
+        if href is None:
+            raise OperationNotSupportedException('Operation is not supported')
+        return href
+
+    async def _request(
+            self,
+            method: str,
+            uri: str,
+            *,
+            contents: ObjectifiedElement | None = None,
+            media_type: str | None = None,
+            headers: dict[str, str] | None = None,
+            **kwargs
+    ) -> httpx.Response:
+        """Выполняет HTTP-запрос и переводит ошибки vCD в исключения pyvcloud."""
+        headers = dict(headers or {})
+        data = None
+        if media_type is not None:
+            headers['Content-Type'] = media_type
+        if contents is not None:
+            objectify.deannotate(contents, cleanup_namespaces=True)
+            data = etree.tostring(contents)
+        response = await self._http_client.request(
+            method, uri, headers=headers, content=data, **kwargs
+        )
+        logger.debug('vCD response', {
+            'method': method,
+            'uri': uri,
+            'status_code': response.status_code
+        })
+        if response.is_success or response.status_code == httpx.codes.NOT_MODIFIED:
+            return response
+        exception_class = _EXCEPTIONS_BY_STATUS_CODE.get(
+            response.status_code, UnknownApiException
+        )
+        raise exception_class(
+            response.status_code,
+            response.headers.get('X-VMWARE-VCLOUD-REQUEST-ID'),
+            self._objectify_response(response)
+        )
+
+    @staticmethod
+    def _objectify_response(response: httpx.Response) -> ObjectifiedElement | None:
+        """Разбирает XML ответа в ресурс lxml.objectify."""
+        if not response.content:
+            return None
+        return objectify.fromstring(response.content)
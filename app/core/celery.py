@@ -3,15 +3,26 @@ from typing import Callable
 
 from celery import Celery
 
+from app.core.settings import constants
 from app.core.settings.config import (
     AppConfig,
+    CacheConfig,
     DBConfig,
     CeleryConfig,
+    StatisticsConfig,
     VCDConfig,
     get_config
 )
 from app.providers.dependencies import DependenciesProvider
-from app.tasks import create_all_vm_statistics
+from app.tasks import (
+    backfill_vm_statistics_rollups,
+    call_job_type,
+    create_all_vm_statistics,
+    maintain_vm_statistics_partitions,
+    poll_vcd_tasks,
+    renew_vcd_api_jwt,
+    sync_vm_inventory
+)
 
 
 def _create_task(
@@ -42,35 +53,98 @@ def _inject_dependencies_in_function(
 def get_celery_application(
         *,
         app_config: AppConfig,
+        cache_config: CacheConfig,
         db_config: DBConfig,
         vcd_config: VCDConfig,
-        celery_config: CeleryConfig
+        celery_config: CeleryConfig,
+        statistics_config: StatisticsConfig
 ) -> Celery:
     """Создаёт приложение Celery."""
     dependencies_provider = DependenciesProvider(
         app_config=app_config,
+        cache_config=cache_config,
         db_config=db_config,
         vcd_config=vcd_config,
-        celery_config=celery_config
+        celery_config=celery_config,
+        statistics_config=statistics_config
     )
     application = dependencies_provider.sync_provide_celery_application()
     vcd_service_provider = dependencies_provider.provide_vcd_service
     settings_repository_provider = dependencies_provider.provide_settings_repository
     template_catalog_repository_provider = dependencies_provider.provide_template_catalog_repository
     vm_repository_provider = dependencies_provider.provide_vm_repository
+    vcd_task_repository_provider = dependencies_provider.provide_vcd_task_repository
     session_provider = dependencies_provider.async_sessionmaker
+    dependencies = {
+        'session_provider': session_provider,
+        'vm_repository_provider': vm_repository_provider,
+        'vcd_task_repository_provider': vcd_task_repository_provider,
+        'template_catalog_repository_provider': template_catalog_repository_provider,
+        'settings_repository_provider': settings_repository_provider,
+        'vcd_service_provider': vcd_service_provider,
+    }
     _create_task(
         application,
         function=create_all_vm_statistics,
         decorator_data={
             'name': 'create_all_vm_statistics',
         },
+        dependencies=dependencies
+    )
+    _create_task(
+        application,
+        function=renew_vcd_api_jwt,
+        decorator_data={
+            'name': 'renew_vcd_api_jwt',
+        },
+        dependencies=dependencies
+    )
+    _create_task(
+        application,
+        function=poll_vcd_tasks,
+        decorator_data={
+            'name': 'poll_vcd_tasks',
+        },
+        dependencies=dependencies
+    )
+    _create_task(
+        application,
+        function=sync_vm_inventory,
+        decorator_data={
+            'name': 'sync_vm_inventory',
+        },
+        dependencies=dependencies
+    )
+    _create_task(
+        application,
+        function=maintain_vm_statistics_partitions,
+        decorator_data={
+            'name': 'maintain_vm_statistics_partitions',
+        },
+        dependencies={
+            **dependencies,
+            'statistics_config': statistics_config,
+        }
+    )
+    _create_task(
+        application,
+        function=backfill_vm_statistics_rollups,
+        decorator_data={
+            'name': 'backfill_vm_statistics_rollups',
+        },
+        dependencies=dependencies
+    )
+    _create_task(
+        application,
+        function=call_job_type,
+        decorator_data={
+            'name': constants.CALL_JOB_TYPE_TASK,
+        },
         dependencies={
-            'session_provider': session_provider,
-            'vm_repository_provider': vm_repository_provider,
-            'template_catalog_repository_provider': template_catalog_repository_provider,
-            'settings_repository_provider': settings_repository_provider,
-            'vcd_service_provider': vcd_service_provider,
+            **dependencies,
+            'job_repository_provider': dependencies_provider.provide_job_repository,
+            'vcd_controller_provider': dependencies_provider.provide_vcd_controller,
+            'celery_application': application,
         }
     )
     return application
@@ -80,7 +154,9 @@ config = get_config()
 logging.config.dictConfig(config['logger'])
 celery = get_celery_application(
     app_config=AppConfig(**config['app']),
+    cache_config=CacheConfig(**config.get('cache', {})),
     db_config=DBConfig(),
     celery_config=CeleryConfig(**config['celery']),
-    vcd_config=VCDConfig(),
+    vcd_config=VCDConfig(**config.get('vcd', {})),
+    statistics_config=StatisticsConfig(**config.get('statistics', {})),
 )
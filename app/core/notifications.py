@@ -0,0 +1,100 @@
+import argparse
+import logging.config
+
+from app.core.settings.config import (
+    AppConfig,
+    CacheConfig,
+    DBConfig,
+    CeleryConfig,
+    NotificationsConfig,
+    StatisticsConfig,
+    VCDConfig,
+    get_config
+)
+from app.notifications import (
+    VCDNotification,
+    VCDNotificationConsumer,
+    publish_notification
+)
+from app.providers.dependencies import DependenciesProvider
+
+
+def get_notification_consumer(
+        *,
+        app_config: AppConfig,
+        cache_config: CacheConfig,
+        db_config: DBConfig,
+        vcd_config: VCDConfig,
+        celery_config: CeleryConfig,
+        statistics_config: StatisticsConfig,
+        notifications_config: NotificationsConfig
+) -> VCDNotificationConsumer:
+    """Создаёт получателя уведомлений vCD, применяющего их к инвентарю ВМ."""
+    dependencies_provider = DependenciesProvider(
+        app_config=app_config,
+        cache_config=cache_config,
+        db_config=db_config,
+        vcd_config=vcd_config,
+        celery_config=celery_config,
+        statistics_config=statistics_config
+    )
+
+    async def apply_vcd_notifications(notifications: list[VCDNotification]) -> None:
+        """Применяет пачку уведомлений vCD в рамках одной сессии БД."""
+        async with dependencies_provider.async_sessionmaker() as session:
+            vcd_service = await dependencies_provider.provide_vcd_service(
+                settings_repository=await dependencies_provider.provide_settings_repository(session),
+                template_catalog_repository=await dependencies_provider.provide_template_catalog_repository(session),
+                vm_repository=await dependencies_provider.provide_vm_repository(session),
+                vcd_task_repository=await dependencies_provider.provide_vcd_task_repository(session)
+            )
+            await vcd_service.setup_client()
+            try:
+                await vcd_service.apply_vcd_notifications(notifications)
+            finally:
+                await vcd_service.close_client()
+
+    return VCDNotificationConsumer(
+        notifications_config=notifications_config,
+        handler=apply_vcd_notifications
+    )
+
+
+def main() -> None:
+    """Запускает получателя уведомлений vCD либо,
+    командой `publish`, публикует синтетическое уведомление."""
+    parser = argparse.ArgumentParser(description='Уведомления vCD из AMQP')
+    subparsers = parser.add_subparsers(dest='command')
+    publish_parser = subparsers.add_parser(
+        'publish', help='Опубликовать синтетическое уведомление vCD'
+    )
+    publish_parser.add_argument('entity_type', choices=['vm', 'vapp'])
+    publish_parser.add_argument('event_type', help='Например create, modify, delete')
+    publish_parser.add_argument('entity_id', help='ID ВМ или vApp из vCD')
+    publish_parser.add_argument('--failed', action='store_true', help='Неуспешная операция')
+    arguments = parser.parse_args()
+    config = get_config()
+    logging.config.dictConfig(config['logger'])
+    notifications_config = NotificationsConfig(**config.get('notifications', {}))
+    if arguments.command == 'publish':
+        publish_notification(
+            notifications_config,
+            event_type=arguments.event_type,
+            entity_type=arguments.entity_type,
+            entity_id=arguments.entity_id,
+            is_success=not arguments.failed
+        )
+        return
+    get_notification_consumer(
+        app_config=AppConfig(**config['app']),
+        cache_config=CacheConfig(**config.get('cache', {})),
+        db_config=DBConfig(),
+        celery_config=CeleryConfig(**config['celery']),
+        vcd_config=VCDConfig(**config.get('vcd', {})),
+        statistics_config=StatisticsConfig(**config.get('statistics', {})),
+        notifications_config=notifications_config
+    ).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -10,10 +10,24 @@ from pydantic import (
 from app.core.settings import constants
 
 
+class EnvOverTomlConfig:
+    """Настройки секции `config.toml` передаются при создании
+    конфигурации, но переменные окружения их переопределяют."""
+
+    @classmethod
+    def customise_sources(cls, init_settings, env_settings, file_secret_settings):
+        return env_settings, init_settings, file_secret_settings
+
+
 class DBConfig(BaseSettings):
     """Конфигурация БД."""
     url: PostgresDsn
 
+    @property
+    def asyncpg_dsn(self) -> str:
+        """DSN для прямого подключения через asyncpg."""
+        return self.url.replace('postgresql+asyncpg://', 'postgresql://', 1)
+
     class Config:
         env_prefix = 'postgres_'
 
@@ -34,11 +48,77 @@ class VCDConfig(BaseSettings):
     organization: str
     username: str
     password: str
-
-    class Config:
+    verify_ssl: bool = True
+    timeout: float = 60
+    executor_max_workers: int = 16
+    client_pool_size: int = 8
+    client_max_connections: int = 64
+    client_health_check_interval: float = 60
+    jwt_expiration_margin: int = 300
+    jwt_renewal_margin: int = 900
+    batch_concurrency: int = 16
+    batch_max_size: int = 1000
+    vm_create_batch_window: float = 0.5
+    vm_create_batch_max_size: int = 20
+    task_query_page_size: int = 128
+    task_wait_interval: float = 2
+    task_wait_timeout: float = 3600
+    query_filter_max_length: int = 2048
+    vm_query_page_size: int = 128
+    statistics_concurrency: int = 32
+    statistics_rate_limit: float = 50
+    statistics_batch_size: int = 500
+    task_poll_max_tasks: int = 10000
+    task_tracking_ttl: int = 86400
+    inventory_full_sync_interval: int = 3600
+
+    class Config(EnvOverTomlConfig):
         env_prefix = 'vcd_'
 
 
+class CacheConfig(BaseSettings):
+    """Конфигурация кэшей процесса."""
+    settings_ttl: float = 3600
+    listener_reconnect_interval: float = 30
+    vm_resource_ttl: float = 15
+    vm_resource_max_size: int = 10000
+    hierarchy_ttl: float = 600
+    templates_ttl: float = 3600
+    templates_warm_up: bool = True
+    vm_ids_max_size: int = 100000
+    vm_usage_max_age: float = 30
+    vm_usage_max_size: int = 10000
+
+    class Config(EnvOverTomlConfig):
+        env_prefix = 'cache_'
+
+
+class StatisticsConfig(BaseSettings):
+    """Конфигурация хранения статистики ВМ."""
+    partitions_ahead_days: int = 7
+    retention_days: int = 90
+
+    class Config(EnvOverTomlConfig):
+        env_prefix = 'statistics_'
+
+
+class NotificationsConfig(BaseSettings):
+    """Конфигурация получения уведомлений vCD из AMQP."""
+    broker_url: AmqpDsn
+    exchange: str = 'systemExchange'
+    queue: str = 'vcd_api_service_notifications'
+    routing_keys: list[str] = [
+        'true.#.com.vmware.vcloud.event.vm.#',
+        'true.#.com.vmware.vcloud.event.vapp.#',
+    ]
+    batch_interval: float = 1
+    batch_max_size: int = 500
+    reconnect_interval: float = 10
+
+    class Config(EnvOverTomlConfig):
+        env_prefix = 'notifications_'
+
+
 class AppConfig(BaseSettings):
     """Конфигурация приложения."""
     debug: bool
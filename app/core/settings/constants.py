@@ -1,3 +1,4 @@
+import datetime
 import os.path
 
 PRODUCTION_CONFIG_PATH = os.path.join(
@@ -8,14 +9,115 @@ DEVELOPMENT_CONFIG_PATH = os.path.join(
 )
 INCOMING_REQUEST_MESSAGE = 'Incoming request with query params'
 JOB_TYPE_WAS_SENT = 'DONE'
+INCOMING_BATCH_REQUEST_MESSAGE = 'Incoming batch request'
+BATCH_TOO_LARGE_MESSAGE = 'Too many jobs in batch'
+INCOMING_STATUSES_REQUEST_MESSAGE = 'Incoming VM statuses request'
+INCOMING_STATISTICS_REQUEST_MESSAGE = 'Incoming statistics request'
+INCOMING_INVENTORY_REQUEST_MESSAGE = 'Incoming inventory request'
+JOB_NOT_FOUND_MESSAGE = 'Job not found'
+VM_NOT_FOUND_IN_INVENTORY_MESSAGE = 'VM not found in inventory'
+JOB_ENQUEUED_MESSAGE = 'Job enqueued'
+VCD_TASKS_TRACKING_FAILED_MESSAGE = 'vCD tasks tracking failed'
+VM_STATISTICS_FAILED_MESSAGE = 'VM statistics collecting failed'
+VM_STATISTICS_SWEEP_FINISHED_MESSAGE = 'VM statistics sweep finished'
+VM_STATISTICS_PARTITIONS_DROPPED_MESSAGE = 'VM statistics partitions dropped'
+VM_STATISTICS_ROLLUPS_BACKFILLED_MESSAGE = 'VM statistics rollups backfilled'
+VM_INVENTORY_SYNCED_MESSAGE = 'VM inventory synced'
+VCD_NOTIFICATIONS_APPLIED_MESSAGE = 'vCD notifications applied'
+VCD_NOTIFICATIONS_FAILED_MESSAGE = 'vCD notifications applying failed'
+VCD_NOTIFICATIONS_CONNECTION_FAILED_MESSAGE = 'vCD notifications broker is not available'
 INVALID_JOB_TYPE_MESSAGE = 'Invalid job type'
 INVALID_VM_CONSOLE_PARAMS_MESSAGE = 'Invalid console query params'
 INTERNAL_SERVER_ERROR_MESSAGE = 'INTERNAL SERVER ERROR'
+UNHANDLED_ERROR_MESSAGE = 'Необработанная ошибка'
 VCD_JWT_EXPIRED_MESSAGE = 'vCloud Director API JWT expired'
+VCD_SESSION_EXPIRED_MESSAGE = 'vCloud Director API session expired'
+VCD_JWT_RENEWING_MESSAGE = 'vCloud Director API JWT renewing'
+POSTGRES_LISTENER_FAILED_MESSAGE = 'Postgres notifications listener is not available'
+POSTGRES_NOTIFY_FAILED_MESSAGE = 'Postgres notification was not sent'
+TEMPLATES_WARM_UP_FAILED_MESSAGE = 'Templates cache warm up failed'
 INVALID_FORMAT_VCD_JWT_MESSAGE = 'Invalid format vCloud Director JWT'
 VDC_RESOURCE_NOT_FOUND_MESSAGE = 'vDC Resource not found'
 VAPP_RESOURCE_NOT_FOUND_MESSAGE = 'vApp Resource not found'
+VAPP_TEMPLATE_RESOURCE_NOT_FOUND_MESSAGE = 'vApp template Resource not found'
 TEMPLATE_CATALOG_NOT_FOUND_MESSAGE = 'Catalog of templates not found'
 INVALID_QUERY_PARAMS_MESSAGE = 'Invalid query params'
 VM_DISK_NOT_FOUND_MESSAGE = 'VM disk not found'
 ANOTHER_VM_CREATING_MESSAGE = 'Another VM creating'
+VM_CREATING_FAILED_MESSAGE = 'VM creating failed'
+VCD_TASK_TIMEOUT_MESSAGE = 'vCD task timed out'
+VM_METRICS_NOT_AVAILABLE_MESSAGE = 'VM metrics are available only for powered on VM'
+# ключ pg_advisory_xact_lock для обновления JWT между процессами
+VCD_API_JWT_LOCK_KEY = 1_946_020_001
+SETTINGS_CHANGED_CHANNEL = 'settings_changed'
+TEMPLATES_CHANGED_CHANNEL = 'templates_changed'
+# уведомление с ID ВМ, изменившейся в vCD
+VMS_CHANGED_CHANNEL = 'vms_changed'
+# уведомление об устаревшей записи индекса иерархии в одном из процессов
+HIERARCHY_CHANGED_CHANNEL = 'hierarchy_changed'
+# ключи индекса иерархии организация -> vDC -> vApp
+ORG_INDEX_KEY = 'org'
+VAPP_INDEX_KEY = 'vapp'
+VDC_TITLES_INDEX_KEY = 'vdc_titles'
+CALL_JOB_TYPE_TASK = 'call_job_type'
+# незавершённые статусы задачи vCD
+VCD_TASK_RUNNING_STATUSES = ('queued', 'preRunning', 'running')
+VCD_TASK_SUCCESS_STATUS = 'success'
+# сколько ВМ вставляется одним запросом, чтобы не превысить лимит параметров Postgres
+VM_UPSERT_CHUNK_SIZE = 1000
+# синхронизируемые колонки таблицы vm_inventory
+VM_INVENTORY_COLUMNS = (
+    'title', 'vdc_id', 'vdc_title',
+    'vapp_id', 'vapp_title', 'power_status',
+    'cpu', 'ram', 'hdd'
+)
+# на сколько раньше прошлой синхронизации инвентаря ВМ искать задачи vCD,
+# чтобы не пропустить задачи из-за расхождения часов с vCD
+VM_INVENTORY_SYNC_OVERLAP = datetime.timedelta(minutes=1)
+# типы сущностей уведомлений vCD, которые применяются к инвентарю ВМ
+VCD_NOTIFICATION_VM_TYPE = 'vm'
+VCD_NOTIFICATION_VAPP_TYPE = 'vapp'
+VCD_NOTIFICATION_NAMESPACE = 'http://www.vmware.com/vcloud/extension/v1.5'
+# префиксы URN задачи и ВМ vCD, по которым они ищутся через query API
+VCD_TASK_URN_PREFIX = 'urn:vcloud:task:'
+VCD_VM_URN_PREFIX = 'urn:vcloud:vm:'
+# известные метрики ВМ vCD -> колонка таблицы vm_statistics
+VM_METRIC_COLUMNS = {
+    'cpu.usage.average': 'cpu_usage_average',
+    'cpu.usage.maximum': 'cpu_usage_maximum',
+    'cpu.usagemhz.average': 'cpu_usagemhz_average',
+    'mem.usage.average': 'mem_usage_average',
+    'disk.provisioned.latest': 'disk_provisioned_latest',
+    'disk.used.latest': 'disk_used_latest',
+    'disk.read.average': 'disk_read_average',
+    'disk.write.average': 'disk_write_average',
+}
+# колонки метрик с целыми значениями, остальные - вещественные
+VM_METRIC_INTEGER_COLUMNS = ('disk_provisioned_latest', 'disk_used_latest')
+# интервалы агрегатов статистики ВМ в секундах, от мелкого к крупному:
+# каждый следующий считается из предыдущего
+VM_STATISTICS_ROLLUP_RESOLUTIONS = {
+    '5m': 300,
+    '1h': 3600,
+    '1d': 86400,
+}
+RAW_STATISTICS_RESOLUTION = 'raw'
+# автоматический выбор интервала истории статистики ВМ по длине периода
+STATISTICS_AUTO_RESOLUTIONS = (
+    (datetime.timedelta(hours=6), RAW_STATISTICS_RESOLUTION),
+    (datetime.timedelta(days=2), '5m'),
+    (datetime.timedelta(days=31), '1h'),
+)
+# единицы измерения метрик ВМ с отдельной колонкой в vm_statistics
+VM_METRIC_UNITS = {
+    'cpu.usage.average': 'PERCENT',
+    'cpu.usage.maximum': 'PERCENT',
+    'cpu.usagemhz.average': 'MEGAHERTZ',
+    'mem.usage.average': 'PERCENT',
+    'disk.provisioned.latest': 'KILOBYTE',
+    'disk.used.latest': 'KILOBYTE',
+    'disk.read.average': 'KILOBYTES_PER_SECOND',
+    'disk.write.average': 'KILOBYTES_PER_SECOND',
+}
+VM_USAGE_SINGLE_FLIGHT_KEY = 'vm_usage'
+VM_POWER_STATUS_SINGLE_FLIGHT_KEY = 'vm_power_status'
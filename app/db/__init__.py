@@ -1,2 +1,2 @@
 from . import base
-from .models import vm, template, settings
+from .models import vm, template, settings, job, vcd_task
@@ -0,0 +1,37 @@
+"""settings notify
+
+Revision ID: 3f9c2d7a1b04
+Revises: 165ac0c542f0
+Create Date: 2026-10-17 10:12:41.503217
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2d7a1b04'
+down_revision = '165ac0c542f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE FUNCTION notify_settings_changed() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('settings_changed', '');
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER settings_changed
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON settings
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_settings_changed()
+    """)
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER settings_changed ON settings')
+    op.execute('DROP FUNCTION notify_settings_changed()')
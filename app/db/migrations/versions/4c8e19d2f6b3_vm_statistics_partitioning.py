@@ -0,0 +1,122 @@
+"""vm statistics partitioning
+
+Revision ID: 4c8e19d2f6b3
+Revises: e6a0c3f81d27
+Create Date: 2026-10-17 14:37:19.204881
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c8e19d2f6b3'
+down_revision = 'e6a0c3f81d27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # дневные секции vm_statistics_YYYYMMDD, создаются и удаляются
+    # периодической задачей Celery через эти функции
+    op.execute("""
+        CREATE FUNCTION create_vm_statistics_partitions(from_date date, to_date date)
+        RETURNS void AS $$
+        DECLARE
+            partition_date date := from_date;
+        BEGIN
+            WHILE partition_date <= to_date LOOP
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS %I PARTITION OF vm_statistics '
+                    'FOR VALUES FROM (%L) TO (%L)',
+                    'vm_statistics_' || to_char(partition_date, 'YYYYMMDD'),
+                    partition_date,
+                    partition_date + 1
+                );
+                partition_date := partition_date + 1;
+            END LOOP;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE FUNCTION drop_vm_statistics_partitions(before_date date)
+        RETURNS SETOF text AS $$
+        DECLARE
+            partition_name text;
+        BEGIN
+            FOR partition_name IN
+                SELECT child.relname
+                FROM pg_inherits
+                JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE parent.relname = 'vm_statistics'
+                  AND child.relname ~ '^vm_statistics_[0-9]{8}$'
+                  AND to_date(right(child.relname, 8), 'YYYYMMDD') < before_date
+            LOOP
+                EXECUTE format('DROP TABLE %I', partition_name);
+                RETURN NEXT partition_name;
+            END LOOP;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute('ALTER TABLE vm_statistics RENAME TO vm_statistics_old')
+    op.execute('ALTER INDEX vm_statistics_pkey RENAME TO vm_statistics_old_pkey')
+    # секционированная таблица копит статистику всех ВМ за весь срок хранения,
+    # поэтому ID и последовательность расширяются до bigint
+    op.execute('ALTER SEQUENCE vm_statistics_id_seq AS bigint')
+    op.execute("""
+        CREATE TABLE vm_statistics (
+            id bigint NOT NULL DEFAULT nextval('vm_statistics_id_seq'),
+            vm_id integer REFERENCES vm (id) ON DELETE RESTRICT,
+            statistics jsonb NOT NULL,
+            created_at timestamp without time zone NOT NULL,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.create_index(
+        'ix_vm_statistics_vm_id_created_at',
+        'vm_statistics',
+        ['vm_id', 'created_at'],
+        unique=False
+    )
+    op.create_index(
+        'ix_vm_statistics_created_at',
+        'vm_statistics',
+        ['created_at'],
+        unique=False,
+        postgresql_using='brin'
+    )
+    op.execute("""
+        SELECT create_vm_statistics_partitions(
+            coalesce((SELECT min(created_at)::date FROM vm_statistics_old), current_date),
+            current_date + 7
+        )
+    """)
+    op.execute("""
+        INSERT INTO vm_statistics (id, vm_id, statistics, created_at)
+        SELECT id, vm_id, statistics, created_at FROM vm_statistics_old
+    """)
+    op.execute('ALTER SEQUENCE vm_statistics_id_seq OWNED BY vm_statistics.id')
+    op.drop_table('vm_statistics_old')
+
+
+def downgrade() -> None:
+    op.execute('ALTER TABLE vm_statistics RENAME TO vm_statistics_partitioned')
+    op.execute('ALTER SEQUENCE vm_statistics_id_seq AS integer')
+    op.execute("""
+        CREATE TABLE vm_statistics (
+            id integer NOT NULL DEFAULT nextval('vm_statistics_id_seq'),
+            vm_id integer REFERENCES vm (id) ON DELETE RESTRICT,
+            statistics jsonb NOT NULL,
+            created_at timestamp without time zone NOT NULL
+        )
+    """)
+    op.execute("""
+        INSERT INTO vm_statistics (id, vm_id, statistics, created_at)
+        SELECT id, vm_id, statistics, created_at FROM vm_statistics_partitioned
+    """)
+    op.execute('ALTER SEQUENCE vm_statistics_id_seq OWNED BY vm_statistics.id')
+    op.drop_table('vm_statistics_partitioned')
+    op.execute('ALTER TABLE vm_statistics ADD CONSTRAINT vm_statistics_pkey PRIMARY KEY (id)')
+    op.execute('DROP FUNCTION drop_vm_statistics_partitions(date)')
+    op.execute('DROP FUNCTION create_vm_statistics_partitions(date, date)')
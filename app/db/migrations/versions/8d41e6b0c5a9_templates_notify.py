@@ -0,0 +1,46 @@
+"""templates notify
+
+Revision ID: 8d41e6b0c5a9
+Revises: 3f9c2d7a1b04
+Create Date: 2026-10-17 11:03:18.772015
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d41e6b0c5a9'
+down_revision = '3f9c2d7a1b04'
+branch_labels = None
+depends_on = None
+
+TEMPLATE_TABLES = (
+    'catalog_template',
+    'vapp_template',
+    'vm_template',
+    'template_catalog',
+)
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE FUNCTION notify_templates_changed() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('templates_changed', '');
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    for table in TEMPLATE_TABLES:
+        op.execute(f"""
+            CREATE TRIGGER {table}_changed
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION notify_templates_changed()
+        """)
+
+
+def downgrade() -> None:
+    for table in TEMPLATE_TABLES:
+        op.execute(f'DROP TRIGGER {table}_changed ON {table}')
+    op.execute('DROP FUNCTION notify_templates_changed()')
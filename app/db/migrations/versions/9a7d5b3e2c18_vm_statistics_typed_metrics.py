@@ -0,0 +1,74 @@
+"""vm statistics typed metrics
+
+Revision ID: 9a7d5b3e2c18
+Revises: 4c8e19d2f6b3
+Create Date: 2026-10-17 15:48:02.317540
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a7d5b3e2c18'
+down_revision = '4c8e19d2f6b3'
+branch_labels = None
+depends_on = None
+
+# метрика vCD -> колонка и её тип
+METRIC_COLUMNS = {
+    'cpu.usage.average': ('cpu_usage_average', 'real'),
+    'cpu.usage.maximum': ('cpu_usage_maximum', 'real'),
+    'cpu.usagemhz.average': ('cpu_usagemhz_average', 'real'),
+    'mem.usage.average': ('mem_usage_average', 'real'),
+    'disk.provisioned.latest': ('disk_provisioned_latest', 'bigint'),
+    'disk.used.latest': ('disk_used_latest', 'bigint'),
+    'disk.read.average': ('disk_read_average', 'real'),
+    'disk.write.average': ('disk_write_average', 'real'),
+}
+
+
+def upgrade() -> None:
+    for column, column_type in METRIC_COLUMNS.values():
+        op.add_column('vm_statistics', sa.Column(
+            column,
+            sa.BigInteger() if column_type == 'bigint' else sa.REAL(),
+            nullable=True
+        ))
+    op.alter_column('vm_statistics', 'statistics', nullable=True)
+    # в statistics остаются только метрики без отдельной колонки
+    assignments = ', '.join(
+        f"""{column} = (
+            SELECT (metric ->> 'value')::numeric::{column_type}
+            FROM jsonb_array_elements(statistics) AS metric
+            WHERE metric ->> 'metric_name' = '{metric_name}'
+            LIMIT 1
+        )"""
+        for metric_name, (column, column_type) in METRIC_COLUMNS.items()
+    )
+    metric_names = ', '.join(f"'{metric_name}'" for metric_name in METRIC_COLUMNS)
+    op.execute(f"""
+        UPDATE vm_statistics SET {assignments}, statistics = (
+            SELECT jsonb_agg(metric)
+            FROM jsonb_array_elements(statistics) AS metric
+            WHERE metric ->> 'metric_name' NOT IN ({metric_names})
+        )
+    """)
+
+
+def downgrade() -> None:
+    # единицы измерения перенесённых метрик не восстанавливаются
+    metrics = ' UNION ALL '.join(
+        f"""SELECT jsonb_build_object(
+            'metric_name', '{metric_name}', 'unit', NULL, 'value', {column}::text
+        ) WHERE {column} IS NOT NULL"""
+        for metric_name, (column, _) in METRIC_COLUMNS.items()
+    )
+    op.execute(f"""
+        UPDATE vm_statistics SET statistics = coalesce((
+            SELECT jsonb_agg(metric) FROM ({metrics}) AS metrics (metric)
+        ), '[]'::jsonb) || coalesce(statistics, '[]'::jsonb)
+    """)
+    op.alter_column('vm_statistics', 'statistics', nullable=False)
+    for column, _ in reversed(list(METRIC_COLUMNS.values())):
+        op.drop_column('vm_statistics', column)
@@ -0,0 +1,134 @@
+"""vm statistics default partition
+
+Revision ID: a3c61f8e2d47
+Revises: 5b8e2f4a7c60
+Create Date: 2026-10-17 21:12:48.503126
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3c61f8e2d47'
+down_revision = '5b8e2f4a7c60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # записи, для дня которых секция ещё не создана, например если
+    # периодическая задача не запускалась, попадают в секцию по умолчанию
+    op.execute('CREATE TABLE vm_statistics_default PARTITION OF vm_statistics DEFAULT')
+    # секция дня создаётся отдельно от секционированной таблицы, в неё
+    # переносятся записи дня из секции по умолчанию, и только потом
+    # она присоединяется, иначе присоединение не пройдёт проверку
+    op.execute("""
+        CREATE OR REPLACE FUNCTION create_vm_statistics_partitions(from_date date, to_date date)
+        RETURNS void AS $$
+        DECLARE
+            partition_date date := from_date;
+            partition_name text;
+        BEGIN
+            WHILE partition_date <= to_date LOOP
+                partition_name := 'vm_statistics_' || to_char(partition_date, 'YYYYMMDD');
+                IF to_regclass(partition_name) IS NULL THEN
+                    EXECUTE format(
+                        'CREATE TABLE %I (LIKE vm_statistics INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+                        partition_name
+                    );
+                    EXECUTE format(
+                        'WITH moved AS ('
+                        'DELETE FROM vm_statistics_default '
+                        'WHERE created_at >= %L AND created_at < %L RETURNING *'
+                        ') INSERT INTO %I SELECT * FROM moved',
+                        partition_date,
+                        partition_date + 1,
+                        partition_name
+                    );
+                    EXECUTE format(
+                        'ALTER TABLE vm_statistics ATTACH PARTITION %I '
+                        'FOR VALUES FROM (%L) TO (%L)',
+                        partition_name,
+                        partition_date,
+                        partition_date + 1
+                    );
+                END IF;
+                partition_date := partition_date + 1;
+            END LOOP;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    # устаревшие записи секции по умолчанию удаляются вместе с секциями
+    op.execute("""
+        CREATE OR REPLACE FUNCTION drop_vm_statistics_partitions(before_date date)
+        RETURNS SETOF text AS $$
+        DECLARE
+            partition_name text;
+        BEGIN
+            FOR partition_name IN
+                SELECT child.relname
+                FROM pg_inherits
+                JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE parent.relname = 'vm_statistics'
+                  AND child.relname ~ '^vm_statistics_[0-9]{8}$'
+                  AND to_date(right(child.relname, 8), 'YYYYMMDD') < before_date
+            LOOP
+                EXECUTE format('DROP TABLE %I', partition_name);
+                RETURN NEXT partition_name;
+            END LOOP;
+            DELETE FROM vm_statistics_default WHERE created_at < before_date;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+
+def downgrade() -> None:
+    # записи секции по умолчанию переносятся в дневные секции
+    op.execute("""
+        SELECT create_vm_statistics_partitions(min(created_at)::date, max(created_at)::date)
+        FROM vm_statistics_default
+        HAVING count(*) > 0
+    """)
+    op.execute('DROP TABLE vm_statistics_default')
+    op.execute("""
+        CREATE OR REPLACE FUNCTION create_vm_statistics_partitions(from_date date, to_date date)
+        RETURNS void AS $$
+        DECLARE
+            partition_date date := from_date;
+        BEGIN
+            WHILE partition_date <= to_date LOOP
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS %I PARTITION OF vm_statistics '
+                    'FOR VALUES FROM (%L) TO (%L)',
+                    'vm_statistics_' || to_char(partition_date, 'YYYYMMDD'),
+                    partition_date,
+                    partition_date + 1
+                );
+                partition_date := partition_date + 1;
+            END LOOP;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION drop_vm_statistics_partitions(before_date date)
+        RETURNS SETOF text AS $$
+        DECLARE
+            partition_name text;
+        BEGIN
+            FOR partition_name IN
+                SELECT child.relname
+                FROM pg_inherits
+                JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE parent.relname = 'vm_statistics'
+                  AND child.relname ~ '^vm_statistics_[0-9]{8}$'
+                  AND to_date(right(child.relname, 8), 'YYYYMMDD') < before_date
+            LOOP
+                EXECUTE format('DROP TABLE %I', partition_name);
+                RETURN NEXT partition_name;
+            END LOOP;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
@@ -0,0 +1,20 @@
+from sqlalchemy import (
+    Column, DateTime,
+    Integer, String
+)
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.db.base import Base
+
+
+class JobModel(Base):
+    """Модель работы, выполняемой асинхронно через Celery."""
+    __tablename__ = 'job'
+    id = Column(String(36), primary_key=True)
+    job_type = Column(String(31), nullable=False)
+    vm_id = Column(String(255), nullable=True)
+    status = Column(String(15), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    result = Column(JSONB, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
@@ -0,0 +1,18 @@
+from sqlalchemy import (
+    Column, DateTime,
+    String
+)
+
+from app.db.base import Base
+
+
+class VCDTaskModel(Base):
+    """Модель задачи vCD, запущенной операцией над ВМ."""
+    __tablename__ = 'vcd_task'
+    id = Column(String(36), primary_key=True)
+    href = Column(String(255), nullable=False)
+    vm_id = Column(String(255), nullable=False, index=True)
+    operation = Column(String(31), nullable=False)
+    status = Column(String(15), nullable=False, index=True)
+    created_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
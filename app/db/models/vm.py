@@ -1,6 +1,8 @@
 from sqlalchemy import (
-    Column, DateTime,
-    ForeignKey, Integer,
+    BigInteger, Column,
+    DateTime, Float,
+    ForeignKey, Index,
+    Integer, REAL,
     String
 )
 from sqlalchemy.dialects.postgresql import JSONB
@@ -18,11 +20,106 @@ class VMModel(Base):
     statistics = relationship('VMStatisticsModel', back_populates='vm')
 
 
+class VMInventoryModel(Base):
+    """Модель ВМ локальной копии инвентаря vCD.
+    Синхронизируется с query API vCD периодической задачей Celery."""
+    __tablename__ = 'vm_inventory'
+    vm_id = Column(String(255), primary_key=True)
+    title = Column(String(255), nullable=False)
+    vdc_id = Column(String(255), nullable=False, index=True)
+    vdc_title = Column(String(255), nullable=True)
+    vapp_id = Column(String(255), nullable=False, index=True)
+    vapp_title = Column(String(255), nullable=False)
+    power_status = Column(String(31), nullable=False)
+    cpu = Column(Integer, nullable=True)
+    ram = Column(Integer, nullable=True)
+    hdd = Column(Integer, nullable=True)
+    # когда синхронизация последний раз обнаружила изменение ВМ
+    modified_at = Column(DateTime, nullable=False)
+    # когда синхронизация последний раз видела ВМ в vCD
+    synced_at = Column(DateTime, nullable=False)
+
+
+class VMInventorySyncModel(Base):
+    """Модель состояния синхронизации инвентаря ВМ."""
+    __tablename__ = 'vm_inventory_sync'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    synced_at = Column(DateTime, nullable=False)
+    full_synced_at = Column(DateTime, nullable=False)
+
+
 class VMStatisticsModel(Base):
-    """Модель собираемой статистики ВМ из vCD."""
+    """Модель собираемой статистики ВМ из vCD.
+    Известные метрики хранятся в типизированных колонках.
+    Таблица секционирована по дням `created_at`, секции
+    создаются и удаляются периодической задачей Celery."""
     __tablename__ = 'vm_statistics'
-    id = Column(Integer, primary_key=True, autoincrement=True)
+    __table_args__ = (
+        Index('ix_vm_statistics_vm_id_created_at', 'vm_id', 'created_at'),
+        Index('ix_vm_statistics_created_at', 'created_at', postgresql_using='brin'),
+        {'postgresql_partition_by': 'RANGE (created_at)'},
+    )
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
     vm_id = Column(Integer, ForeignKey('vm.id', ondelete='RESTRICT'))
     vm = relationship('VMModel', back_populates='statistics', lazy='joined')
-    statistics = Column(JSONB, nullable=False)
-    created_at = Column(DateTime, nullable=False)
+    cpu_usage_average = Column(REAL, nullable=True)
+    cpu_usage_maximum = Column(REAL, nullable=True)
+    cpu_usagemhz_average = Column(REAL, nullable=True)
+    mem_usage_average = Column(REAL, nullable=True)
+    disk_provisioned_latest = Column(BigInteger, nullable=True)
+    disk_used_latest = Column(BigInteger, nullable=True)
+    disk_read_average = Column(REAL, nullable=True)
+    disk_write_average = Column(REAL, nullable=True)
+    # метрики, для которых нет отдельной колонки
+    statistics = Column(JSONB, nullable=True)
+    created_at = Column(DateTime, primary_key=True, nullable=False)
+
+
+class VMStatisticsRollupModel(Base):
+    """Модель агрегатов статистики ВМ за интервал времени.
+    Для каждой метрики хранятся минимум, среднее, максимум и 95-й перцентиль."""
+    __tablename__ = 'vm_statistics_rollup'
+    __table_args__ = (
+        Index('ix_vm_statistics_rollup_resolution_bucket', 'resolution', 'bucket'),
+    )
+    vm_id = Column(
+        Integer,
+        ForeignKey('vm.id', ondelete='RESTRICT'),
+        primary_key=True
+    )
+    # интервал агрегата: 5m, 1h или 1d
+    resolution = Column(String(3), primary_key=True)
+    bucket = Column(DateTime, primary_key=True)
+    samples = Column(Integer, nullable=False)
+    cpu_usage_average_min = Column(Float, nullable=True)
+    cpu_usage_average_avg = Column(Float, nullable=True)
+    cpu_usage_average_max = Column(Float, nullable=True)
+    cpu_usage_average_p95 = Column(Float, nullable=True)
+    cpu_usage_maximum_min = Column(Float, nullable=True)
+    cpu_usage_maximum_avg = Column(Float, nullable=True)
+    cpu_usage_maximum_max = Column(Float, nullable=True)
+    cpu_usage_maximum_p95 = Column(Float, nullable=True)
+    cpu_usagemhz_average_min = Column(Float, nullable=True)
+    cpu_usagemhz_average_avg = Column(Float, nullable=True)
+    cpu_usagemhz_average_max = Column(Float, nullable=True)
+    cpu_usagemhz_average_p95 = Column(Float, nullable=True)
+    mem_usage_average_min = Column(Float, nullable=True)
+    mem_usage_average_avg = Column(Float, nullable=True)
+    mem_usage_average_max = Column(Float, nullable=True)
+    mem_usage_average_p95 = Column(Float, nullable=True)
+    disk_provisioned_latest_min = Column(Float, nullable=True)
+    disk_provisioned_latest_avg = Column(Float, nullable=True)
+    disk_provisioned_latest_max = Column(Float, nullable=True)
+    disk_provisioned_latest_p95 = Column(Float, nullable=True)
+    disk_used_latest_min = Column(Float, nullable=True)
+    disk_used_latest_avg = Column(Float, nullable=True)
+    disk_used_latest_max = Column(Float, nullable=True)
+    disk_used_latest_p95 = Column(Float, nullable=True)
+    disk_read_average_min = Column(Float, nullable=True)
+    disk_read_average_avg = Column(Float, nullable=True)
+    disk_read_average_max = Column(Float, nullable=True)
+    disk_read_average_p95 = Column(Float, nullable=True)
+    disk_write_average_min = Column(Float, nullable=True)
+    disk_write_average_avg = Column(Float, nullable=True)
+    disk_write_average_max = Column(Float, nullable=True)
+    disk_write_average_p95 = Column(Float, nullable=True)
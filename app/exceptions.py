@@ -55,3 +55,11 @@ class AnotherVMCreatingException(BaseRawException):
 
 class VCDBadRequestException(BaseRawException):
     pass
+
+
+class VCDTaskTimeoutException(BaseRawException):
+    pass
+
+
+class JobNotFoundException(BaseRawException):
+    pass
@@ -0,0 +1,104 @@
+import asyncio
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _SubmittedCall:
+    """Вызов, отправленный в пул потоков."""
+    submitted_at: float
+    is_queued: bool = True
+
+
+class BlockingCallExecutor:
+    """Ограниченный пул потоков для синхронных вызовов `pyvcloud`,
+    чтобы они не блокировали цикл событий.
+    Ведёт счётчики очереди и времени ожидания запуска."""
+
+    def __init__(self, *, max_workers: int) -> None:
+        self._max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='pyvcloud'
+        )
+        self._lock = threading.Lock()
+        self._queue_depth = 0
+        self._in_progress = 0
+        self._completed = 0
+        self._total_wait_time = 0.0
+        self._max_wait_time = 0.0
+
+    async def run(self, function: Callable, /, *args, **kwargs) -> Any:
+        """Выполняет синхронную функцию в пуле потоков."""
+        loop = asyncio.get_running_loop()
+        submitted_call = _SubmittedCall(submitted_at=time.monotonic())
+        with self._lock:
+            self._queue_depth += 1
+        call = functools.partial(
+            self._call, submitted_call, function, *args, **kwargs
+        )
+        try:
+            return await loop.run_in_executor(self._executor, call)
+        finally:
+            # отменённый до запуска вызов в пуле уже не запустится
+            self._dequeue(submitted_call)
+
+    def get_statistics(self) -> dict[str, int | float]:
+        """Получает счётчики пула потоков."""
+        with self._lock:
+            average_wait_time = (
+                self._total_wait_time / self._completed
+                if self._completed else 0.0
+            )
+            return {
+                'max_workers': self._max_workers,
+                'queue_depth': self._queue_depth,
+                'in_progress': self._in_progress,
+                'completed': self._completed,
+                'average_wait_time': average_wait_time,
+                'max_wait_time': self._max_wait_time,
+            }
+
+    def shutdown(self) -> None:
+        """Останавливает пул потоков."""
+        self._executor.shutdown(wait=False)
+
+    def _dequeue(self, submitted_call: _SubmittedCall) -> None:
+        """Убирает вызов из счётчика очереди, если он ещё там."""
+        with self._lock:
+            if submitted_call.is_queued:
+                submitted_call.is_queued = False
+                self._queue_depth -= 1
+
+    def _call(
+            self,
+            submitted_call: _SubmittedCall,
+            function: Callable,
+            /,
+            *args,
+            **kwargs
+    ) -> Any:
+        """Выполняет функцию, учитывая время ожидания в очереди."""
+        wait_time = time.monotonic() - submitted_call.submitted_at
+        self._dequeue(submitted_call)
+        with self._lock:
+            self._in_progress += 1
+            self._total_wait_time += wait_time
+            self._max_wait_time = max(self._max_wait_time, wait_time)
+        logger.debug('Blocking call started', {
+            'function': getattr(function, '__qualname__', repr(function)),
+            'wait_time': wait_time
+        })
+        try:
+            return function(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._in_progress -= 1
+                self._completed += 1
@@ -0,0 +1,21 @@
+import asyncio
+import time
+
+
+class RateLimiter:
+    """Ограничитель частоты запросов: не больше `rate` запусков в секунду,
+    запуски равномерно распределяются по времени."""
+
+    def __init__(self, *, rate: float) -> None:
+        self._interval = 1 / rate
+        self._lock = asyncio.Lock()
+        self._next_at = 0.0
+
+    async def wait(self) -> None:
+        """Дожидается очереди на следующий запуск."""
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_at - now
+            self._next_at = max(now, self._next_at) + self._interval
+        if delay > 0:
+            await asyncio.sleep(delay)
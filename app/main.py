@@ -4,9 +4,11 @@ from fastapi import FastAPI
 
 from app.core.settings.config import (
     AppConfig,
+    CacheConfig,
     DBConfig,
     VCDConfig,
     CeleryConfig,
+    StatisticsConfig,
     get_config
 )
 from app.providers.dependencies import DependenciesProvider
@@ -18,22 +20,29 @@ from app.providers.stubs import (
     CeleryStub,
     VMRepositoryStub,
     SettingsRepositoryStub,
-    TemplateCatalogRepositoryStub
+    TemplateCatalogRepositoryStub,
+    JobRepositoryStub,
+    VCDTaskRepositoryStub,
+    BlockingCallExecutorStub
 )
 
 
 def get_fastapi_application(
         *,
         app_config: AppConfig,
+        cache_config: CacheConfig,
         db_config: DBConfig,
         vcd_config: VCDConfig,
-        celery_config: CeleryConfig
+        celery_config: CeleryConfig,
+        statistics_config: StatisticsConfig
 ) -> FastAPI:
     dependencies_provider = DependenciesProvider(
         app_config=app_config,
+        cache_config=cache_config,
         db_config=db_config,
         vcd_config=vcd_config,
-        celery_config=celery_config
+        celery_config=celery_config,
+        statistics_config=statistics_config
     )
     application = dependencies_provider.provide_fastapi_application()
     application.dependency_overrides = {
@@ -43,8 +52,11 @@ def get_fastapi_application(
         VMRepositoryStub: dependencies_provider.provide_vm_repository,
         TemplateCatalogRepositoryStub: dependencies_provider.provide_template_catalog_repository,
         SettingsRepositoryStub: dependencies_provider.provide_settings_repository,
+        JobRepositoryStub: dependencies_provider.provide_job_repository,
+        VCDTaskRepositoryStub: dependencies_provider.provide_vcd_task_repository,
         VCDServiceStub: dependencies_provider.provide_vcd_service,
-        VCDControllerStub: dependencies_provider.provide_vcd_controller
+        VCDControllerStub: dependencies_provider.provide_vcd_controller,
+        BlockingCallExecutorStub: dependencies_provider.provide_blocking_call_executor
     }
     return application
 
@@ -53,7 +65,9 @@ config = get_config()
 logging.config.dictConfig(config['logger'])
 app = get_fastapi_application(
     app_config=AppConfig(**config['app']),
+    cache_config=CacheConfig(**config.get('cache', {})),
     db_config=DBConfig(),
     celery_config=CeleryConfig(**config['celery']),
-    vcd_config=VCDConfig(),
+    vcd_config=VCDConfig(**config.get('vcd', {})),
+    statistics_config=StatisticsConfig(**config.get('statistics', {})),
 )
@@ -0,0 +1,211 @@
+import asyncio
+import datetime
+import logging
+import socket
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from kombu import Connection, Consumer, Exchange, Queue, binding
+from kombu.exceptions import OperationalError
+from kombu.message import Message
+from lxml import etree
+
+from app.core.settings import constants
+from app.core.settings.config import NotificationsConfig
+
+logger = logging.getLogger(__name__)
+
+_PARSER = etree.XMLParser(resolve_entities=False, no_network=True)
+
+
+@dataclass
+class VCDNotification:
+    """Уведомление vCD об изменении сущности."""
+    event_type: str
+    entity_type: str
+    entity_id: str
+    is_success: bool
+
+
+def parse_notification(body: bytes) -> VCDNotification | None:
+    """Разбирает XML уведомления vCD `vmext:Notification`.
+    Для сообщений другого формата возвращается `None`."""
+    try:
+        root = etree.fromstring(body, _PARSER)
+    except etree.XMLSyntaxError:
+        return None
+    namespace = constants.VCD_NOTIFICATION_NAMESPACE
+    entity_link = root.find(f'{{{namespace}}}EntityLink[@rel="entity"]')
+    if entity_link is None or entity_link.get('id') is None:
+        return None
+    return VCDNotification(
+        event_type=root.get('type', ''),
+        entity_type=entity_link.get('type', '').removeprefix('vcloud:'),
+        entity_id=entity_link.get('id').rsplit(':', 1)[-1],
+        is_success=root.findtext(f'{{{namespace}}}OperationSuccess') != 'false'
+    )
+
+
+def build_notification(
+        *,
+        event_type: str,
+        entity_type: str,
+        entity_id: str,
+        is_success: bool = True
+) -> tuple[bytes, str]:
+    """Формирует синтетическое уведомление vCD в том же формате,
+    что и vCD, и его ключ маршрутизации."""
+    namespace = constants.VCD_NOTIFICATION_NAMESPACE
+    root = etree.Element(
+        f'{{{namespace}}}Notification',
+        nsmap={'vmext': namespace},
+        type=f'com/vmware/vcloud/event/{entity_type}/{event_type}',
+        eventId=str(uuid.uuid4())
+    )
+    etree.SubElement(
+        root,
+        f'{{{namespace}}}EntityLink',
+        rel='entity',
+        type=f'vcloud:{entity_type}',
+        id=f'urn:vcloud:{entity_type}:{entity_id}'
+    )
+    etree.SubElement(root, f'{{{namespace}}}Timestamp').text = (
+        datetime.datetime.now().astimezone().isoformat(timespec='milliseconds')
+    )
+    etree.SubElement(root, f'{{{namespace}}}OperationSuccess').text = (
+        str(is_success).lower()
+    )
+    routing_key = (
+        f'{str(is_success).lower()}.{entity_id}'
+        f'.com.vmware.vcloud.event.{entity_type}.{event_type}'
+    )
+    return etree.tostring(root, xml_declaration=True, encoding='UTF-8'), routing_key
+
+
+def publish_notification(
+        notifications_config: NotificationsConfig,
+        *,
+        event_type: str,
+        entity_type: str,
+        entity_id: str,
+        is_success: bool = True
+) -> None:
+    """Публикует синтетическое уведомление vCD в обменник уведомлений,
+    например для проверки получателя на локальном брокере."""
+    body, routing_key = build_notification(
+        event_type=event_type,
+        entity_type=entity_type,
+        entity_id=entity_id,
+        is_success=is_success
+    )
+    exchange = _get_exchange(notifications_config)
+    with Connection(notifications_config.broker_url) as connection:
+        connection.Producer().publish(
+            body,
+            exchange=exchange,
+            routing_key=routing_key,
+            content_type='application/xml',
+            content_encoding='utf-8',
+            declare=[exchange]
+        )
+
+
+def _get_exchange(notifications_config: NotificationsConfig) -> Exchange:
+    """Обменник, в который vCD публикует уведомления."""
+    return Exchange(notifications_config.exchange, type='topic', durable=True)
+
+
+class VCDNotificationConsumer:
+    """Получатель уведомлений vCD из AMQP.
+    Собирает уведомления о ВМ и vApp пачками за `batch_interval` секунд
+    и передаёт их обработчику, а при разрыве соединения переподключается."""
+
+    def __init__(
+            self,
+            *,
+            notifications_config: NotificationsConfig,
+            handler: Callable[[list[VCDNotification]], Awaitable[None]]
+    ) -> None:
+        self._config = notifications_config
+        self._handler = handler
+        self._loop = asyncio.get_event_loop_policy().get_event_loop()
+
+    def run(self) -> None:
+        """Получает уведомления, пока процесс не остановят."""
+        while True:
+            with Connection(self._config.broker_url) as connection:
+                try:
+                    self._consume(connection)
+                except (OperationalError, *connection.connection_errors) as exception:
+                    logger.warning(constants.VCD_NOTIFICATIONS_CONNECTION_FAILED_MESSAGE, {
+                        'exception': str(exception)
+                    })
+            time.sleep(self._config.reconnect_interval)
+
+    def _consume(self, connection: Connection) -> None:
+        """Получает уведомления из очереди и передаёт их пачками."""
+        exchange = _get_exchange(self._config)
+        queue = Queue(
+            self._config.queue,
+            bindings=[
+                binding(exchange, routing_key=routing_key)
+                for routing_key in self._config.routing_keys
+            ],
+            durable=True
+        )
+        messages: list[Message] = []
+        batch_started_at = None
+        with Consumer(
+                connection,
+                queues=[queue],
+                on_message=messages.append,
+                prefetch_count=self._config.batch_max_size
+        ):
+            while True:
+                timeout = self._config.batch_interval
+                if batch_started_at is not None:
+                    timeout = max(batch_started_at + timeout - time.monotonic(), 0)
+                try:
+                    connection.drain_events(timeout=timeout)
+                except socket.timeout:
+                    pass
+                if not messages:
+                    continue
+                if batch_started_at is None:
+                    batch_started_at = time.monotonic()
+                is_batch_ready = (
+                    len(messages) >= self._config.batch_max_size
+                    or time.monotonic() - batch_started_at >= self._config.batch_interval
+                )
+                if is_batch_ready:
+                    self._apply(messages)
+                    messages.clear()
+                    batch_started_at = None
+
+    def _apply(self, messages: list[Message]) -> None:
+        """Передаёт обработчику успешные операции над ВМ и vApp
+        и подтверждает сообщения. Сообщения подтверждаются и при ошибке
+        обработчика: пропущенное изменение исправит синхронизация инвентаря."""
+        notifications = [
+            notification
+            for notification in map(parse_notification, (
+                message.body for message in messages
+            ))
+            if notification is not None
+            and notification.is_success
+            and notification.entity_type in (
+                constants.VCD_NOTIFICATION_VM_TYPE,
+                constants.VCD_NOTIFICATION_VAPP_TYPE
+            )
+        ]
+        if notifications:
+            try:
+                self._loop.run_until_complete(self._handler(notifications))
+            except Exception:
+                logger.warning(constants.VCD_NOTIFICATIONS_FAILED_MESSAGE, {
+                    'count': len(notifications)
+                }, exc_info=True)
+        for message in messages:
+            message.ack()
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from pyvcloud.vcd.client import Client
+from pyvcloud.vcd.exceptions import UnauthorizedException
+
+from app.client import AsyncVCDClient
+from app.core.settings.config import VCDConfig
+from app.executor import BlockingCallExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class VCDClientPool:
+    """Клиенты API vCD процесса.
+    Аутентифицированный асинхронный клиент один на процесс и
+    используется всеми запросами и задачами Celery одновременно,
+    число его соединений ограничено `client_max_connections`.
+    Синхронные клиенты `pyvcloud` одновременного использования
+    не допускают и выдаются по одному из пула."""
+
+    def __init__(
+            self,
+            *,
+            vcd_config: VCDConfig,
+            blocking_call_executor: BlockingCallExecutor
+    ) -> None:
+        self._vcd_config = vcd_config
+        self._blocking_call_executor = blocking_call_executor
+        # логин в vCD внутри процесса выполняет только один клиент
+        self.auth_lock = asyncio.Lock()
+        # сессию общего клиента восстанавливает только одна работа
+        self.reauth_lock = asyncio.Lock()
+        self._client: AsyncVCDClient | None = None
+        self._checked_at = 0.0
+        self._sync_semaphore = asyncio.Semaphore(vcd_config.client_pool_size)
+        self._idle_sync_clients: list[tuple[str, Client]] = []
+
+    async def acquire(self) -> AsyncVCDClient:
+        """Выдаёт общий клиент процесса.
+        Если сессия клиента истекла, то он выдаётся без аутентификации."""
+        if self._client is None:
+            self._client = self._create_client()
+        await self._check_health(self._client)
+        return self._client
+
+    def mark_checked(self) -> None:
+        """Отмечает, что сессия клиента только что подтверждена."""
+        self._checked_at = time.monotonic()
+
+    @asynccontextmanager
+    async def sync_client(self, client: AsyncVCDClient) -> AsyncIterator[Client]:
+        """Выдаёт в монопольное пользование синхронный клиент
+        `pyvcloud` с той же сессией, что и у асинхронного клиента."""
+        token = client.get_vcloud_token()
+        async with self._sync_semaphore:
+            sync_client = self._pop_idle_sync_client(token)
+            if sync_client is None:
+                sync_client = await self._create_sync_client(token)
+            try:
+                yield sync_client
+            except Exception:
+                self._idle_sync_clients.append((token, sync_client))
+                raise
+            # при отмене вызов в потоке исполнителя ещё может
+            # использовать клиент, поэтому в пул он не возвращается
+            self._idle_sync_clients.append((token, sync_client))
+
+    async def close(self) -> None:
+        """Закрывает общий клиент и забывает синхронные клиенты."""
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.close()
+        self._idle_sync_clients.clear()
+
+    def _create_client(self) -> AsyncVCDClient:
+        """Создаёт общий клиент без аутентификации."""
+        logger.debug('Shared client creating')
+        return AsyncVCDClient(
+            uri=self._vcd_config.hostname,
+            api_version=self._vcd_config.api_version,
+            verify_ssl=self._vcd_config.verify_ssl,
+            timeout=self._vcd_config.timeout,
+            max_connections=self._vcd_config.client_max_connections
+        )
+
+    def _pop_idle_sync_client(self, token: str | None) -> Client | None:
+        """Забирает свободный синхронный клиент с сессией `token`,
+        попутно отбрасывая клиенты с уже сменившейся сессией."""
+        while self._idle_sync_clients:
+            idle_token, sync_client = self._idle_sync_clients.pop()
+            if idle_token == token:
+                return sync_client
+        return None
+
+    async def _create_sync_client(self, token: str | None) -> Client:
+        """Создаёт синхронный клиент `pyvcloud` с сессией `token`."""
+        logger.debug('Sync client creating')
+        sync_client = Client(
+            uri=self._vcd_config.hostname,
+            api_version=self._vcd_config.api_version,
+            verify_ssl_certs=self._vcd_config.verify_ssl
+        )
+        await self._blocking_call_executor.run(
+            sync_client.rehydrate_from_token, token
+        )
+        return sync_client
+
+    async def _check_health(self, client: AsyncVCDClient) -> None:
+        """Проверяет сессию клиента не чаще интервала проверки
+        и сбрасывает её, если vCD её больше не принимает."""
+        if not client.is_authenticated():
+            return
+        interval = self._vcd_config.client_health_check_interval
+        if time.monotonic() - self._checked_at < interval:
+            return
+        # одновременно выдаваемый клиент проверяется один раз
+        self.mark_checked()
+        token = client.get_vcloud_token()
+        try:
+            await client.refresh_session()
+        except UnauthorizedException:
+            if client.get_vcloud_token() != token:
+                return
+            logger.warning('Shared client session expired')
+            client.reset_session()
@@ -1,3 +1,4 @@
+import logging
 from pathlib import Path
 
 from celery import Celery
@@ -11,31 +12,56 @@ from sqlalchemy.ext.asyncio import (
 from sqlalchemy.orm import sessionmaker
 
 from app.api import api
-from app.api.v1.routers import console, vcd
+from app.api.v1.routers import console, health, inventory, statistics, vcd
+from app.batcher import Batcher
+from app.cache import (
+    HierarchyIndex,
+    PostgresListener,
+    SettingsCache,
+    TemplateCache,
+    VMIdCache,
+    VMResourceCache,
+    VMUsageCache
+)
 from app.core.middleware import BaseExceptionMiddleware
+from app.core.settings import constants
 from app.core.settings.config import (
     AppConfig,
+    CacheConfig,
     DBConfig,
     CeleryConfig,
+    StatisticsConfig,
     VCDConfig
 )
 from app.exceptions import (
     BaseRawException,
+    VCDResourceNotFoundException,
+    VMCreatingException,
     handle_base_raw_exception
 )
+from app.executor import BlockingCallExecutor
+from app.pool import VCDClientPool
 from app.providers.stubs import (
+    CeleryStub,
+    JobRepositoryStub,
     VCDServiceStub,
     DBSessionStub,
     VMRepositoryStub,
     SettingsRepositoryStub,
-    TemplateCatalogRepositoryStub
+    TemplateCatalogRepositoryStub,
+    VCDTaskRepositoryStub
 )
 from app.repositories import (
+    JobRepository,
     VMRepository,
     SettingsRepository,
-    TemplateCatalogRepository
+    TemplateCatalogRepository,
+    VCDTaskRepository
 )
 from app.service import VCDService, VCDController
+from app.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
 
 
 class DependenciesProvider:
@@ -45,13 +71,62 @@ class DependenciesProvider:
             self,
             *,
             app_config: AppConfig,
+            cache_config: CacheConfig,
             db_config: DBConfig,
             celery_config: CeleryConfig,
+            statistics_config: StatisticsConfig,
             vcd_config: VCDConfig
     ) -> None:
         self.app_config = app_config
+        self.cache_config = cache_config
+        self.statistics_config = statistics_config
         self.celery_config = celery_config
         self.vcd_config = vcd_config
+        self.blocking_call_executor = BlockingCallExecutor(
+            max_workers=vcd_config.executor_max_workers
+        )
+        self.vcd_client_pool = VCDClientPool(
+            vcd_config=vcd_config,
+            blocking_call_executor=self.blocking_call_executor
+        )
+        self.postgres_listener = PostgresListener(
+            dsn=db_config.asyncpg_dsn,
+            reconnect_interval=cache_config.listener_reconnect_interval
+        )
+        self.settings_cache = SettingsCache(
+            listener=self.postgres_listener,
+            ttl=cache_config.settings_ttl
+        )
+        self.template_cache = TemplateCache(
+            listener=self.postgres_listener,
+            ttl=cache_config.templates_ttl
+        )
+        self.vm_resource_cache = VMResourceCache(
+            listener=self.postgres_listener,
+            max_size=cache_config.vm_resource_max_size,
+            ttl=cache_config.vm_resource_ttl
+        )
+        self.hierarchy_index = HierarchyIndex(
+            listener=self.postgres_listener,
+            ttl=cache_config.hierarchy_ttl
+        )
+        self.vm_id_cache = VMIdCache(max_size=cache_config.vm_ids_max_size)
+        self.vm_usage_cache = VMUsageCache(
+            max_size=cache_config.vm_usage_max_size,
+            max_age=cache_config.vm_usage_max_age
+        )
+        self.single_flight = SingleFlight()
+        self.vm_create_batcher = Batcher(
+            window=vcd_config.vm_create_batch_window,
+            max_size=vcd_config.vm_create_batch_max_size,
+            # vCD отклоняет перекомпоновку целиком из-за одной
+            # неверной спецификации, поэтому остальные создаются отдельно
+            split_exceptions=(VMCreatingException, VCDResourceNotFoundException)
+        )
+        self.postgres_listener.subscribe(
+            constants.VMS_CHANGED_CHANNEL, self._invalidate_vm_caches
+        )
+        self.celery_application: Celery | None = None
         engine = create_async_engine(
             db_config.url,
             echo=self.app_config.debug
@@ -62,24 +137,36 @@ class DependenciesProvider:
             expire_on_commit=False,
         )
 
+    def _invalidate_vm_caches(self, vm_id: str | None) -> None:
+        """Сбрасывает кэши изменившейся в vCD ВМ,
+        а если уведомления могли быть пропущены - кэши всех ВМ."""
+        if vm_id is None:
+            self.vm_resource_cache.clear()
+            self.vm_usage_cache.clear()
+            return
+        self.vm_resource_cache.discard(vm_id)
+        self.vm_usage_cache.invalidate(vm_id)
+
     async def provide_db_session(self) -> AsyncSession:
         """Создаёт асинхронную сессию БД."""
         async with self.async_sessionmaker() as session:
             yield session
 
-    @staticmethod
     async def provide_vm_repository(
+            self,
             session: AsyncSession = Depends(DBSessionStub)
     ) -> VMRepository:
         """Создаёт ВМ репозиторий."""
-        return VMRepository(session)
+        return VMRepository(session, self.vm_id_cache)
 
-    @staticmethod
     async def provide_settings_repository(
+            self,
             session: AsyncSession = Depends(DBSessionStub)
     ) -> SettingsRepository:
         """Создаёт репозиторий настроек."""
-        return SettingsRepository(session)
+        return SettingsRepository(
+            session, self.settings_cache, self.async_sessionmaker
+        )
 
     @staticmethod
     async def provide_template_catalog_repository(
@@ -88,6 +175,24 @@ class DependenciesProvider:
         """Создаёт репозиторий каталога шаблонов."""
         return TemplateCatalogRepository(session)
 
+    @staticmethod
+    async def provide_job_repository(
+            session: AsyncSession = Depends(DBSessionStub)
+    ) -> JobRepository:
+        """Создаёт репозиторий асинхронных работ."""
+        return JobRepository(session)
+
+    @staticmethod
+    async def provide_vcd_task_repository(
+            session: AsyncSession = Depends(DBSessionStub)
+    ) -> VCDTaskRepository:
+        """Создаёт репозиторий задач vCD."""
+        return VCDTaskRepository(session)
+
+    async def provide_blocking_call_executor(self) -> BlockingCallExecutor:
+        """Получает пул потоков синхронных вызовов процесса."""
+        return self.blocking_call_executor
+
     @staticmethod
     async def provide_jinja2_templates() -> Jinja2Templates:
         """Создаёт подключение к шаблонам Jinja2."""
@@ -98,6 +203,8 @@ class DependenciesProvider:
         application = FastAPI(**self.app_config.fastapi_kwargs)
         application.add_middleware(BaseExceptionMiddleware)
         application.add_exception_handler(BaseRawException, handle_base_raw_exception)
+        application.add_event_handler('startup', self.startup)
+        application.add_event_handler('shutdown', self.shutdown)
         application.mount(
             path='/static',
             app=StaticFiles(directory=Path('app', 'static')),
@@ -106,6 +213,9 @@ class DependenciesProvider:
         # роутеры, доступные по корневому пути "/"
         application.include_router(vcd.router)
         application.include_router(console.router)
+        application.include_router(statistics.router)
+        application.include_router(inventory.router)
+        application.include_router(health.router)
         # версионные роутеры
         application.include_router(
             api.api_router,
@@ -113,14 +223,46 @@ class DependenciesProvider:
         )
         return application
 
+    async def startup(self) -> None:
+        """Подготавливает кэши процесса."""
+        await self.postgres_listener.ensure_connected()
+        if self.cache_config.templates_warm_up:
+            await self.warm_up_template_cache()
+
+    async def warm_up_template_cache(self) -> None:
+        """Загружает все шаблоны в кэш шаблонов.
+        Ошибка прогрева не мешает запуску приложения."""
+        async with self.async_sessionmaker() as session:
+            vcd_service = await self.provide_vcd_service(
+                settings_repository=await self.provide_settings_repository(session),
+                template_catalog_repository=await self.provide_template_catalog_repository(session),
+                vm_repository=await self.provide_vm_repository(session),
+                vcd_task_repository=await self.provide_vcd_task_repository(session)
+            )
+            try:
+                await vcd_service.setup_client()
+                await vcd_service.warm_up_template_cache()
+            except Exception:
+                logger.warning(constants.TEMPLATES_WARM_UP_FAILED_MESSAGE, exc_info=True)
+            finally:
+                await vcd_service.close_client()
+
+    async def shutdown(self) -> None:
+        """Освобождает ресурсы процесса: соединения и пулы."""
+        await self.vcd_client_pool.close()
+        await self.postgres_listener.close()
+        self.blocking_call_executor.shutdown()
+
     async def async_provide_celery_application(self) -> Celery:
-        """Асинхронно создаёт приложение Celery"""
-        return Celery('tasks', **self.celery_config.dict())
+        """Асинхронно получает приложение Celery процесса"""
+        return self.sync_provide_celery_application()
 
     def sync_provide_celery_application(self) -> Celery:
-        """Синхронно создаёт приложение Celery
-        для синхронного потребителя Celery."""
-        return Celery('tasks', **self.celery_config.dict())
+        """Синхронно получает приложение Celery процесса,
+        создавая его при первом обращении."""
+        if self.celery_application is None:
+            self.celery_application = Celery('tasks', **self.celery_config.dict())
+        return self.celery_application
 
     async def provide_vcd_service(
             self,
@@ -128,19 +270,37 @@ class DependenciesProvider:
             settings_repository: SettingsRepository = Depends(SettingsRepositoryStub),
             template_catalog_repository: TemplateCatalogRepository = Depends(TemplateCatalogRepositoryStub),
             vm_repository: VMRepository = Depends(VMRepositoryStub),
+            vcd_task_repository: VCDTaskRepository = Depends(VCDTaskRepositoryStub),
     ) -> VCDService:
         """Создаёт сервис vCD."""
         return VCDService(
             app_config=self.app_config,
             vcd_config=self.vcd_config,
+            blocking_call_executor=self.blocking_call_executor,
+            client_pool=self.vcd_client_pool,
+            vm_resource_cache=self.vm_resource_cache,
+            vm_usage_cache=self.vm_usage_cache,
+            single_flight=self.single_flight,
+            vm_create_batcher=self.vm_create_batcher,
+            hierarchy_index=self.hierarchy_index,
+            template_cache=self.template_cache,
             settings_repository=settings_repository,
             template_catalog_repository=template_catalog_repository,
             vm_repository=vm_repository,
+            vcd_task_repository=vcd_task_repository,
         )
 
-    @staticmethod
     async def provide_vcd_controller(
+            self,
             vcd_service: VCDService = Depends(VCDServiceStub),
+            job_repository: JobRepository = Depends(JobRepositoryStub),
+            celery_application: Celery = Depends(CeleryStub),
     ) -> VCDController:
         """Создаёт контроллер vCD."""
-        return VCDController(vcd_service=vcd_service)
+        return VCDController(
+            vcd_config=self.vcd_config,
+            vcd_service=vcd_service,
+            job_repository=job_repository,
+            celery_application=celery_application,
+            blocking_call_executor=self.blocking_call_executor
+        )
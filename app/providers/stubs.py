@@ -52,3 +52,24 @@ class Jinja2TemplatesStub:
 
     def __init__(self):
         raise NotImplementedError
+
+
+class JobRepositoryStub:
+    """Заглушка получения репозитория работ."""
+
+    def __init__(self):
+        raise NotImplementedError
+
+
+class VCDTaskRepositoryStub:
+    """Заглушка получения репозитория задач vCD."""
+
+    def __init__(self):
+        raise NotImplementedError
+
+
+class BlockingCallExecutorStub:
+    """Заглушка получения пула потоков синхронных вызовов."""
+
+    def __init__(self):
+        raise NotImplementedError
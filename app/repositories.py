@@ -1,62 +1,425 @@
 import datetime
+import json
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable
 
-from sqlalchemy import insert, select
+from sqlalchemy import (
+    bindparam, case, delete,
+    func, insert, or_,
+    select, text, update
+)
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache import SettingsCache, VMIdCache
+from app.api.v1.schemas.vcd import JobStatusEnum
+from app.core.settings import constants
+from app.db.models.job import JobModel
 from app.db.models.settings import SettingsModel
 from app.db.models.template import TemplateCatalogModel
-from app.db.models.vm import VMModel, VMStatisticsModel
+from app.db.models.vcd_task import VCDTaskModel
+from app.db.models.vm import (
+    VMInventoryModel,
+    VMInventorySyncModel,
+    VMModel,
+    VMStatisticsModel,
+    VMStatisticsRollupModel
+)
+from app.utils import TIME_BUCKET_ORIGIN, ceil_time, floor_time
 
 
 class VMRepository:
     """Репозиторий взаимодействия с моделями ВМ."""
 
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(
+            self,
+            session: AsyncSession,
+            vm_id_cache: VMIdCache
+    ) -> None:
         self._session = session
+        self._vm_id_cache = vm_id_cache
+
+    async def bulk_get_or_create_ids(self, vms: dict[str, str]) -> dict[str, int]:
+        """Получает первичные ключи ВМ по их ID в vCD, создавая
+        недостающие ВМ. Принимает словарь ID ВМ -> название ВМ.
+        Неизвестные кэшу ВМ получаются одним запросом на пачку."""
+        vm_pks = self._vm_id_cache.get_many(vms)
+        missing_vms = [
+            {'vm_id': vm_id, 'title': title}
+            for vm_id, title in vms.items() if vm_id not in vm_pks
+        ]
+        chunk_size = constants.VM_UPSERT_CHUNK_SIZE
+        for start in range(0, len(missing_vms), chunk_size):
+            query = postgresql_insert(VMModel).values(
+                missing_vms[start:start + chunk_size]
+            )
+            query = query.on_conflict_do_update(
+                index_elements=[VMModel.vm_id],
+                set_={'title': query.excluded.title}
+            ).returning(VMModel.vm_id, VMModel.id)
+            result = await self._session.execute(query)
+            upserted_vm_pks = dict(result.all())
+            self._vm_id_cache.set_many(upserted_vm_pks)
+            vm_pks.update(upserted_vm_pks)
+        if missing_vms:
+            await self._session.commit()
+        return vm_pks
+
+    async def bulk_create_statistics(
+            self,
+            vm_statistics_to_create: dict[int, dict]
+    ) -> None:
+        """Создаёт одновременно множество записей статистики ВМ
+        через бинарный COPY asyncpg, без ограничения на количество параметров.
+        Принимает словарь ID модели ВМ -> значения колонок метрик."""
+        created_at = datetime.datetime.now()
+        metric_columns = tuple(constants.VM_METRIC_COLUMNS.values())
+        records = []
+        for vm_model_id, row in vm_statistics_to_create.items():
+            statistics = row['statistics']
+            records.append((
+                vm_model_id,
+                *(row[column] for column in metric_columns),
+                None if statistics is None else json.dumps(statistics),
+                created_at
+            ))
+        connection = await self._session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            VMStatisticsModel.__tablename__,
+            records=records,
+            columns=('vm_id', *metric_columns, 'statistics', 'created_at')
+        )
+        await self._session.commit()
+
+    async def create_statistics_partitions(
+            self,
+            *,
+            from_date: datetime.date,
+            to_date: datetime.date
+    ) -> None:
+        """Создаёт недостающие дневные секции статистики ВМ за период."""
+        query = select(func.create_vm_statistics_partitions(from_date, to_date))
+        await self._session.execute(query)
+        await self._session.commit()
 
-    async def get_or_create(
+    async def drop_statistics_partitions(
             self,
             *,
+            before_date: datetime.date
+    ) -> list[str]:
+        """Удаляет дневные секции статистики ВМ раньше даты
+        и возвращает названия удалённых секций."""
+        query = select(func.drop_vm_statistics_partitions(before_date))
+        result = await self._session.execute(query)
+        dropped_partitions = result.scalars().all()
+        await self._session.commit()
+        return dropped_partitions
+
+    async def get_latest_statistics(
+            self,
             vm_id: str,
-            title: str
-    ) -> VMModel:
-        """Получает либо создаёт модель ВМ при отсутствии."""
-        query = select(VMModel).where(VMModel.vm_id == vm_id)
+            *,
+            created_after: datetime.datetime
+    ) -> dict | None:
+        """Получает значения колонок последней записи статистики ВМ,
+        если она создана позже указанного времени."""
+        query = select(
+            VMStatisticsModel.__table__
+        ).join(VMModel, VMStatisticsModel.vm_id == VMModel.id).where(
+            VMModel.vm_id == vm_id,
+            VMStatisticsModel.created_at > created_after
+        ).order_by(VMStatisticsModel.created_at.desc()).limit(1)
         result = await self._session.execute(query)
-        vm_model = result.scalar_one_or_none()
-        if vm_model is None:
-            vm_model = VMModel(vm_id=vm_id, title=title)
-            self._session.add(vm_model)
-            await self._session.commit()
-        return vm_model
+        row = result.mappings().first()
+        return None if row is None else dict(row)
 
-    async def bulk_create_statistics(
+    async def stream_statistics(
+            self,
+            vm_ids: list[str],
+            *,
+            resolution: str,
+            metric_columns: list[str],
+            from_time: datetime.datetime,
+            to_time: datetime.datetime
+    ) -> AsyncIterator[dict]:
+        """Потоково получает историю статистики ВМ за период,
+        для интервала `raw` - сырые записи, для остальных - агрегаты."""
+        if resolution == constants.RAW_STATISTICS_RESOLUTION:
+            time_column = VMStatisticsModel.created_at
+            columns = [
+                getattr(VMStatisticsModel, column)
+                for column in metric_columns
+            ]
+            query = select(
+                VMModel.vm_id, time_column.label('time'), *columns
+            ).join(VMModel, VMStatisticsModel.vm_id == VMModel.id)
+        else:
+            time_column = VMStatisticsRollupModel.bucket
+            columns = [
+                getattr(VMStatisticsRollupModel, f'{column}_{aggregate}')
+                for column in metric_columns
+                for aggregate in ('min', 'avg', 'max', 'p95')
+            ]
+            query = select(
+                VMModel.vm_id, time_column.label('time'),
+                VMStatisticsRollupModel.samples, *columns
+            ).join(
+                VMModel, VMStatisticsRollupModel.vm_id == VMModel.id
+            ).where(VMStatisticsRollupModel.resolution == resolution)
+        query = query.where(
+            VMModel.vm_id.in_(vm_ids),
+            time_column >= from_time,
+            time_column < to_time
+        ).order_by(VMModel.vm_id, time_column)
+        result = await self._session.stream(query)
+        async for row in result.mappings():
+            yield dict(row)
+
+    async def refresh_statistics_rollups(
             self,
-            vm_statistics_to_create: dict
+            *,
+            from_time: datetime.datetime,
+            to_time: datetime.datetime
     ) -> None:
-        """Создаёт одновременно множество записей статистики ВМ."""
-        bulk_data = []
-        created_at = datetime.datetime.now()
-        for vm_model_id, statistics in vm_statistics_to_create.items():
-            bulk_data.append({
-                'vm_id': vm_model_id,
-                'statistics': statistics,
-                'created_at': created_at
+        """Пересчитывает агрегаты статистики ВМ всех интервалов,
+        затронутых периодом. Мелкий интервал считается из сырой статистики,
+        каждый следующий - из агрегатов предыдущего."""
+        source_resolution = None
+        for resolution, seconds in constants.VM_STATISTICS_ROLLUP_RESOLUTIONS.items():
+            interval = datetime.timedelta(seconds=seconds)
+            query = self._get_rollup_query(
+                resolution=resolution,
+                seconds=seconds,
+                source_resolution=source_resolution
+            )
+            await self._session.execute(text(query), {
+                'resolution': resolution,
+                'source_resolution': source_resolution,
+                'from_time': floor_time(from_time, interval),
+                'to_time': ceil_time(to_time, interval)
             })
-        query = insert(VMStatisticsModel).values(bulk_data)
-        await self._session.execute(query)
+            source_resolution = resolution
+        await self._session.commit()
+
+    @staticmethod
+    def _get_rollup_query(
+            *,
+            resolution: str,
+            seconds: int,
+            source_resolution: str | None
+    ) -> str:
+        """Формирует запрос пересчёта агрегатов интервала `resolution`.
+        95-й перцентиль крупных интервалов приближённо считается
+        по перцентилям вложенных интервалов."""
+        metric_columns = constants.VM_METRIC_COLUMNS.values()
+        if source_resolution is None:
+            source = VMStatisticsModel.__tablename__
+            time_column = 'created_at'
+            condition = 'vm_id IS NOT NULL'
+            samples = 'count(*)'
+            aggregates = [
+                f'min({column}), avg({column}), max({column}), '
+                f'percentile_cont(0.95) WITHIN GROUP (ORDER BY {column})'
+                for column in metric_columns
+            ]
+        else:
+            source = VMStatisticsRollupModel.__tablename__
+            time_column = 'bucket'
+            condition = 'resolution = :source_resolution'
+            samples = 'sum(samples)'
+            aggregates = [
+                f'min({column}_min), '
+                f'sum({column}_avg * samples) / '
+                f'nullif(sum(samples) FILTER (WHERE {column}_avg IS NOT NULL), 0), '
+                f'max({column}_max), '
+                f'percentile_cont(0.95) WITHIN GROUP (ORDER BY {column}_p95)'
+                for column in metric_columns
+            ]
+        rollup_columns = [
+            f'{column}_{aggregate}'
+            for column in metric_columns
+            for aggregate in ('min', 'avg', 'max', 'p95')
+        ]
+        bucket = (
+            f"timestamp '{TIME_BUCKET_ORIGIN}' + floor(extract(epoch FROM "
+            f"{time_column} - timestamp '{TIME_BUCKET_ORIGIN}') / {seconds}) "
+            f"* interval '{seconds} seconds'"
+        )
+        return f"""
+            INSERT INTO {VMStatisticsRollupModel.__tablename__}
+                (vm_id, resolution, bucket, samples, {', '.join(rollup_columns)})
+            SELECT vm_id, :resolution, {bucket}, {samples}, {', '.join(aggregates)}
+            FROM {source}
+            WHERE {condition}
+                AND {time_column} >= :from_time AND {time_column} < :to_time
+            GROUP BY 1, 3
+            ON CONFLICT (vm_id, resolution, bucket) DO UPDATE SET
+                samples = excluded.samples,
+                {', '.join(f'{column} = excluded.{column}' for column in rollup_columns)}
+        """
+
+    async def get_inventory(self, vm_id: str) -> VMInventoryModel | None:
+        """Получает ВМ инвентаря по ID."""
+        query = select(VMInventoryModel).where(VMInventoryModel.vm_id == vm_id)
+        result = await self._session.execute(query)
+        return result.scalar_one_or_none()
+
+    async def get_all_inventory(
+            self,
+            *,
+            vdc_title: str | None = None,
+            vapp_title: str | None = None,
+            power_status: str | None = None
+    ) -> list[VMInventoryModel]:
+        """Получает ВМ инвентаря, отфильтрованные по vDC, vApp и статусу."""
+        query = select(VMInventoryModel).order_by(VMInventoryModel.vm_id)
+        if vdc_title is not None:
+            query = query.where(VMInventoryModel.vdc_title == vdc_title)
+        if vapp_title is not None:
+            query = query.where(VMInventoryModel.vapp_title == vapp_title)
+        if power_status is not None:
+            query = query.where(VMInventoryModel.power_status == power_status)
+        result = await self._session.execute(query)
+        return result.scalars().all()
+
+    async def bulk_upsert_inventory(
+            self,
+            vms: list[dict],
+            *,
+            synced_at: datetime.datetime
+    ) -> None:
+        """Создаёт или обновляет ВМ инвентаря.
+        Время изменения ВМ сдвигается, только если изменились её значения."""
+        table = VMInventoryModel.__table__
+        chunk_size = constants.VM_UPSERT_CHUNK_SIZE
+        for start in range(0, len(vms), chunk_size):
+            query = postgresql_insert(VMInventoryModel).values([
+                {**vm, 'modified_at': synced_at, 'synced_at': synced_at}
+                for vm in vms[start:start + chunk_size]
+            ])
+            is_modified = or_(*(
+                table.c[column].is_distinct_from(query.excluded[column])
+                for column in constants.VM_INVENTORY_COLUMNS
+            ))
+            query = query.on_conflict_do_update(
+                index_elements=[VMInventoryModel.vm_id],
+                set_={
+                    **{
+                        column: query.excluded[column]
+                        for column in constants.VM_INVENTORY_COLUMNS
+                    },
+                    'modified_at': case(
+                        (is_modified, query.excluded.modified_at),
+                        else_=table.c.modified_at
+                    ),
+                    'synced_at': query.excluded.synced_at,
+                }
+            )
+            await self._session.execute(query)
+        await self._session.commit()
+
+    async def delete_stale_inventory(
+            self,
+            *,
+            synced_before: datetime.datetime,
+            vm_ids: list[str] | None = None,
+            vapp_ids: list[str] | None = None
+    ) -> list[str]:
+        """Удаляет ВМ инвентаря, не найденные синхронизацией,
+        и возвращает их ID. Если указаны ID ВМ или vApp,
+        то проверяются только эти ВМ и ВМ этих vApp."""
+        query = delete(VMInventoryModel).where(
+            VMInventoryModel.synced_at < synced_before
+        )
+        if vm_ids is not None or vapp_ids is not None:
+            query = query.where(or_(
+                VMInventoryModel.vm_id.in_(vm_ids or []),
+                VMInventoryModel.vapp_id.in_(vapp_ids or [])
+            ))
+        result = await self._session.execute(
+            query.returning(VMInventoryModel.vm_id)
+        )
+        await self._session.commit()
+        return result.scalars().all()
+
+    async def notify_vms_changed(self, vm_ids: list[str]) -> None:
+        """Уведомляет процессы через Postgres NOTIFY
+        об изменении ВМ в vCD, чтобы они сбросили её кэши."""
+        query = text(
+            'SELECT pg_notify(:channel, vm_id) '
+            'FROM unnest(CAST(:vm_ids AS text[])) AS vm_id'
+        )
+        await self._session.execute(query, {
+            'channel': constants.VMS_CHANGED_CHANNEL,
+            'vm_ids': vm_ids
+        })
+        await self._session.commit()
+
+    async def get_inventory_sync(self) -> VMInventorySyncModel | None:
+        """Получает состояние синхронизации инвентаря ВМ."""
+        result = await self._session.execute(select(VMInventorySyncModel))
+        return result.scalar_one_or_none()
+
+    async def set_inventory_synced(
+            self,
+            *,
+            synced_at: datetime.datetime,
+            full: bool
+    ) -> None:
+        """Сохраняет время начала успешной синхронизации инвентаря ВМ."""
+        sync_model = await self.get_inventory_sync()
+        if sync_model is None:
+            sync_model = VMInventorySyncModel(
+                synced_at=synced_at,
+                full_synced_at=synced_at
+            )
+            self._session.add(sync_model)
+        else:
+            sync_model.synced_at = synced_at
+            if full:
+                sync_model.full_synced_at = synced_at
         await self._session.commit()
 
 
 class SettingsRepository:
     """Репозиторий взаимодействия с vCD."""
 
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(
+            self,
+            session: AsyncSession,
+            settings_cache: SettingsCache,
+            session_factory: Callable[[], AsyncSession]
+    ) -> None:
         self._session = session
+        self._settings_cache = settings_cache
+        self._session_factory = session_factory
+
+    async def get_or_create(self, *, use_cache: bool = True) -> SettingsModel:
+        """Получает либо создаёт модель настроек при отсутствии.
+        Из кэша возвращается модель, не привязанная к сессии."""
+        if use_cache:
+            cached_settings = await self._settings_cache.get()
+            if cached_settings is not None:
+                return SettingsModel(**cached_settings)
+        version = self._settings_cache.version
+        settings_model = await self._get_or_create_model()
+        self._cache(settings_model, version=version)
+        return settings_model
 
-    async def get_or_create(self) -> SettingsModel | None:
-        """Получает либо создаёт модель настроек при отсутствии."""
-        query = select(SettingsModel)
+    def _cache(self, settings_model: SettingsModel, *, version: int) -> None:
+        """Кэширует значения модели настроек."""
+        self._settings_cache.set({
+            'id': settings_model.id,
+            'vcd_api_jwt': settings_model.vcd_api_jwt,
+            'default_vdc': settings_model.default_vdc,
+            'default_vapp': settings_model.default_vapp,
+        }, version=version)
+
+    async def _get_or_create_model(self) -> SettingsModel:
+        """Получает из БД либо создаёт модель настроек при отсутствии."""
+        query = select(SettingsModel).execution_options(populate_existing=True)
         result = await self._session.execute(query)
         settings_model = result.scalar_one_or_none()
         if settings_model is None:
@@ -67,9 +430,24 @@ class SettingsRepository:
 
     async def update_api_jwt(self, vcd_api_jwt: str) -> None:
         """Обновляет JWT либо создаёт при отсутствии."""
-        settings_model = await self.get_or_create()
+        settings_model = await self._get_or_create_model()
         settings_model.vcd_api_jwt = vcd_api_jwt
         await self._session.commit()
+        self._settings_cache.invalidate()
+        self._cache(settings_model, version=self._settings_cache.version)
+
+    @asynccontextmanager
+    async def lock_api_jwt(self) -> AsyncIterator['SettingsRepository']:
+        """Блокирует обновление JWT другими процессами и выдаёт
+        репозиторий отдельной сессии БД, в которой держится блокировка.
+        Блокировка снимается с завершением транзакции этой сессии,
+        не затрагивая общую сессию запроса."""
+        async with self._session_factory() as session:
+            query = select(func.pg_advisory_xact_lock(constants.VCD_API_JWT_LOCK_KEY))
+            await session.execute(query)
+            yield SettingsRepository(
+                session, self._settings_cache, self._session_factory
+            )
 
 
 class TemplateCatalogRepository:
@@ -78,9 +456,130 @@ class TemplateCatalogRepository:
     def __init__(self, session: AsyncSession) -> None:
         self._session = session
 
+    async def get_all(self) -> list[TemplateCatalogModel]:
+        """Получает все шаблоны каталога."""
+        query = select(TemplateCatalogModel)
+        result = await self._session.execute(query)
+        return list(result.scalars().unique())
+
     async def get(self, template_id: id) -> TemplateCatalogModel | None:
         query = select(TemplateCatalogModel).where(
             TemplateCatalogModel.id == template_id
         )
         result = await self._session.execute(query)
         return result.scalar_one_or_none()
+
+
+class JobRepository:
+    """Репозиторий взаимодействия с асинхронными работами."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def create(self, *, job_type: str, vm_id: str | None) -> JobModel:
+        """Создаёт работу в ожидании выполнения."""
+        job_model = JobModel(
+            id=str(uuid.uuid4()),
+            job_type=job_type,
+            vm_id=vm_id,
+            status=JobStatusEnum.PENDING.value,
+            created_at=datetime.datetime.now()
+        )
+        self._session.add(job_model)
+        await self._session.commit()
+        return job_model
+
+    async def get(self, job_id: str) -> JobModel | None:
+        """Получает работу по идентификатору."""
+        query = select(JobModel).where(JobModel.id == job_id)
+        result = await self._session.execute(query)
+        return result.scalar_one_or_none()
+
+    async def set_running(self, job_id: str) -> None:
+        """Отмечает работу выполняемой."""
+        query = update(JobModel).where(JobModel.id == job_id).values(
+            status=JobStatusEnum.RUNNING.value
+        )
+        await self._session.execute(query)
+        await self._session.commit()
+
+    async def set_finished(
+            self,
+            job_id: str,
+            *,
+            status: JobStatusEnum,
+            status_code: int,
+            result: str | list | None
+    ) -> None:
+        """Сохраняет результат завершённой работы."""
+        query = update(JobModel).where(JobModel.id == job_id).values(
+            status=status.value,
+            status_code=status_code,
+            result=result,
+            finished_at=datetime.datetime.now()
+        )
+        await self._session.execute(query)
+        await self._session.commit()
+
+
+class VCDTaskRepository:
+    """Репозиторий взаимодействия с отслеживаемыми задачами vCD."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def bulk_create(self, vcd_tasks_to_create: list[dict]) -> None:
+        """Создаёт одновременно множество отслеживаемых задач."""
+        created_at = datetime.datetime.now()
+        bulk_data = [
+            {**vcd_task, 'created_at': created_at}
+            for vcd_task in vcd_tasks_to_create
+        ]
+        query = insert(VCDTaskModel).values(bulk_data)
+        await self._session.execute(query)
+        await self._session.commit()
+
+    async def get_running(
+            self,
+            *,
+            created_after: datetime.datetime,
+            limit: int
+    ) -> list[VCDTaskModel]:
+        """Получает незавершённые задачи, ещё не вышедшие из срока отслеживания."""
+        query = select(VCDTaskModel).where(
+            VCDTaskModel.status.in_(constants.VCD_TASK_RUNNING_STATUSES),
+            VCDTaskModel.created_at > created_after
+        ).order_by(VCDTaskModel.created_at).limit(limit)
+        result = await self._session.execute(query)
+        return result.scalars().all()
+
+    async def get_all_by_vm(self, vm_id: str, *, limit: int) -> list[VCDTaskModel]:
+        """Получает последние задачи ВМ."""
+        query = select(VCDTaskModel).where(
+            VCDTaskModel.vm_id == vm_id
+        ).order_by(VCDTaskModel.created_at.desc()).limit(limit)
+        result = await self._session.execute(query)
+        return result.scalars().all()
+
+    async def bulk_update_statuses(self, statuses: dict[str, str]) -> None:
+        """Обновляет одновременно статусы множества задач по их ID."""
+        finished_at = datetime.datetime.now()
+        bulk_data = [
+            {
+                'task_id': task_id,
+                'task_status': task_status,
+                'task_finished_at': (
+                    None if task_status in constants.VCD_TASK_RUNNING_STATUSES
+                    else finished_at
+                )
+            }
+            for task_id, task_status in statuses.items()
+        ]
+        query = update(VCDTaskModel.__table__).where(
+            VCDTaskModel.__table__.c.id == bindparam('task_id')
+        ).values(
+            status=bindparam('task_status'),
+            finished_at=bindparam('task_finished_at')
+        )
+        await self._session.execute(query, bulk_data)
+        await self._session.commit()
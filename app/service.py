@@ -1,15 +1,20 @@
+import asyncio
 import logging
+import time
+from copy import deepcopy
 from datetime import datetime, timedelta
 from enum import IntEnum
-from typing import Callable, Iterable
+from typing import AsyncContextManager, AsyncIterable, Callable
+from urllib.parse import urlencode
 
 import jwt
+from celery import Celery
 from fastapi import status
 from jwt import DecodeError
 from lxml.objectify import ObjectifiedElement
 from pyvcloud.vcd.client import (
-    BasicLoginCredentials,
-    Client, NSMAP, EntityType
+    Client, NSMAP, EntityType,
+    RelationType
 )
 from pyvcloud.vcd.exceptions import (
     BadRequestException,
@@ -18,35 +23,63 @@ from pyvcloud.vcd.exceptions import (
     ConflictException,
     UnauthorizedException,
     InternalServerException,
-    EntityNotFoundException
+    EntityNotFoundException,
+    NotFoundException
 )
-from pyvcloud.vcd.org import Org
 from pyvcloud.vcd.utils import extract_id
 from pyvcloud.vcd.vapp import VApp
-from pyvcloud.vcd.vdc import VDC
 from pyvcloud.vcd.vm import VM
 
+from app.api.v1.schemas.statistics import StatisticsQueryParamsSchema
 from app.api.v1.schemas.vcd import (
     VCDQueryParamsSchema,
-    JobTypeEnum
+    VCDJobSchema,
+    JobTypeEnum,
+    JobStatusEnum,
+    MUTATING_JOB_TYPES
 )
+from app.cache import (
+    HierarchyIndex,
+    TemplateCache,
+    TemplateCacheEntry,
+    VMResourceCache,
+    VMUsageCache
+)
+from app.client import AsyncVCDClient, find_link_href
 from app.core.settings import constants
 from app.core.settings.config import VCDConfig, AppConfig
+from app.db.models.template import TemplateCatalogModel
+from app.batcher import Batcher
+from app.executor import BlockingCallExecutor
+from app.limiter import RateLimiter
+from app.notifications import VCDNotification
+from app.singleflight import SingleFlight
+from app.pool import VCDClientPool
 from app.exceptions import (
+    BaseRawException,
+    QueryParamsException,
     VMNotFoundException,
     VMPowerStateException,
     VCDAuthError,
     VCDResourceNotFoundException,
     VMCreatingException,
     TemplateCatalogNotFoundException,
-    VCDBadRequestException, AnotherVMCreatingException
+    VCDBadRequestException, AnotherVMCreatingException,
+    VCDTaskTimeoutException
 )
 from app.repositories import (
+    JobRepository,
     VMRepository,
     SettingsRepository,
-    TemplateCatalogRepository
+    TemplateCatalogRepository,
+    VCDTaskRepository
+)
+from app.utils import (
+    chunk_query_filter,
+    format_vm_metrics,
+    get_vm_console_link,
+    parse_vm_metrics
 )
-from app.utils import get_vm_console_link
 
 logger = logging.getLogger(__name__)
 
@@ -66,32 +99,170 @@ class VCDService:
             *,
             app_config: AppConfig,
             vcd_config: VCDConfig,
+            blocking_call_executor: BlockingCallExecutor,
+            client_pool: VCDClientPool,
+            vm_resource_cache: VMResourceCache,
+            vm_usage_cache: VMUsageCache,
+            single_flight: SingleFlight,
+            vm_create_batcher: Batcher,
+            hierarchy_index: HierarchyIndex,
+            template_cache: TemplateCache,
             settings_repository: SettingsRepository,
             template_catalog_repository: TemplateCatalogRepository,
             vm_repository: VMRepository,
+            vcd_task_repository: VCDTaskRepository,
     ) -> None:
         self._app_config = app_config
         self._vcd_config = vcd_config
+        self._blocking_call_executor = blocking_call_executor
+        self._client_pool = client_pool
+        self._vm_resource_cache = vm_resource_cache
+        self._vm_usage_cache = vm_usage_cache
+        self._single_flight = single_flight
+        self._vm_create_batcher = vm_create_batcher
+        self._hierarchy_index = hierarchy_index
+        self._template_cache = template_cache
         self._vm_repository = vm_repository
         self._template_catalog_repository = template_catalog_repository
         self._settings_repository = settings_repository
-        self._client: Client | None = None
+        self._vcd_task_repository = vcd_task_repository
+        self._client: AsyncVCDClient | None = None
+        # сессия БД одна на запрос, а работы пакета выполняются одновременно
+        self.session_lock = asyncio.Lock()
+        self._tracked_vcd_tasks: list[dict] = []
 
     async def setup_client(self) -> None:
-        """Создание и настройка клиента для работы с API vCD."""
-        logger.debug('Client creating')
-        self._client = Client(
-            uri=self._vcd_config.hostname,
-            api_version=self._vcd_config.api_version,
+        """Получение общего клиента для работы с API vCD
+        и его аутентификация, если сессии у клиента нет."""
+        logger.debug('Client acquiring')
+        self._client = await self._client_pool.acquire()
+        if not self._client.is_authenticated():
+            try:
+                async with self._client_pool.reauth_lock:
+                    if not self._client.is_authenticated():
+                        await self._auth_client()
+                        self._client_pool.mark_checked()
+            except BaseException:
+                await self.close_client()
+                raise
+        logger.debug('Client acquired')
+
+    def get_client_token(self) -> str | None:
+        """Получает токен текущей сессии клиента."""
+        return self._client.get_vcloud_token()
+
+    async def reauth_client(self, *, rejected_token: str | None) -> None:
+        """Повторная аутентификация клиента,
+        чью сессию vCD перестал принимать.
+        Если общий клиент уже переаутентифицирован другой
+        работой, то повторно не выполняется."""
+        async with self._client_pool.reauth_lock:
+            if self._client.get_vcloud_token() != rejected_token:
+                return
+            logger.warning(constants.VCD_SESSION_EXPIRED_MESSAGE)
+            self._client.reset_session()
+            await self._refresh_api_jwt(rejected_token=rejected_token)
+            self._client_pool.mark_checked()
+
+    async def close_client(self) -> None:
+        """Завершает работу с общим клиентом API vCD
+        и сохраняет задачи vCD, запущенные с его помощью.
+        Ссылка на общий клиент сохраняется: её может использовать
+        ещё выполняющаяся пачка созданий ВМ, запущенная этим сервисом."""
+        await self._save_tracked_vcd_tasks()
+
+    def _track_vcd_task(
+            self,
+            task_resource: ObjectifiedElement | None,
+            *,
+            vm_id: str,
+            operation: str
+    ) -> None:
+        """Запоминает задачу vCD операции над ВМ для отслеживания.
+        Задачи сохраняются разом при завершении работы с клиентом,
+        так как сессия БД может быть общей для работ пакета."""
+        if task_resource is None:
+            return
+        self._tracked_vcd_tasks.append({
+            'id': extract_id(task_resource.get('id')),
+            'href': task_resource.get('href'),
+            'vm_id': vm_id,
+            'operation': operation,
+            'status': task_resource.get('status')
+        })
+
+    async def _save_tracked_vcd_tasks(self) -> None:
+        """Сохраняет запомненные задачи vCD.
+        Ошибка сохранения не влияет на результат самой операции."""
+        if not self._tracked_vcd_tasks:
+            return
+        vcd_tasks, self._tracked_vcd_tasks = self._tracked_vcd_tasks, []
+        try:
+            await self._vcd_task_repository.bulk_create(vcd_tasks)
+        except Exception:
+            logger.warning(constants.VCD_TASKS_TRACKING_FAILED_MESSAGE, {
+                'count': len(vcd_tasks)
+            }, exc_info=True)
+
+    async def poll_vcd_tasks(self) -> None:
+        """Обновляет статусы незавершённых задач vCD,
+        опрашивая их пачками через query API."""
+        created_after = datetime.now() - timedelta(
+            seconds=self._vcd_config.task_tracking_ttl
+        )
+        vcd_task_models = await self._vcd_task_repository.get_running(
+            created_after=created_after,
+            limit=self._vcd_config.task_poll_max_tasks
+        )
+        statuses = await self._query_vcd_task_statuses([
+            vcd_task_model.id for vcd_task_model in vcd_task_models
+        ])
+        logger.debug('vCD tasks polled', {
+            'running': len(vcd_task_models),
+            'found': len(statuses)
+        })
+        if statuses:
+            await self._vcd_task_repository.bulk_update_statuses(statuses)
+
+    async def _query_vcd_task_statuses(self, task_ids: list[str]) -> dict[str, str]:
+        """Получает статусы задач vCD через query API пачками,
+        фильтр каждой из которых умещается в допустимую длину ссылки."""
+        page_size = self._vcd_config.task_query_page_size
+        query_filters = chunk_query_filter(
+            [f'id=={constants.VCD_TASK_URN_PREFIX}{task_id}' for task_id in task_ids],
+            max_size=page_size,
+            max_length=self._vcd_config.query_filter_max_length
         )
-        await self._auth_client()
-        logger.debug('Client created')
+        statuses = {}
+        for query_filter in query_filters:
+            query = urlencode({
+                'type': 'task',
+                'format': 'records',
+                'page': 1,
+                'pageSize': page_size,
+                'filter': query_filter
+            })
+            result = await self._client.get_resource(
+                f'{self._client.get_api_uri()}/query?{query}'
+            )
+            if not hasattr(result, 'TaskRecord'):
+                continue
+            statuses.update({
+                self._get_href_id(task_record.get('href')): task_record.get('status')
+                for task_record in result.TaskRecord
+            })
+        return statuses
+
+    def _sync_client(self) -> AsyncContextManager[Client]:
+        """Выдаёт синхронный клиент `pyvcloud` для операций,
+        которые ещё не переведены на `AsyncVCDClient`."""
+        return self._client_pool.sync_client(self._client)
 
-    async def _update_api_jwt(self) -> None:
+    async def _update_api_jwt(self, settings_repository: SettingsRepository) -> None:
         """Обновляет API JWT от сервиса текущим токеном."""
         logger.debug('Creating new token')
         vcd_api_jwt = self._client.get_access_token()
-        await self._settings_repository.update_api_jwt(vcd_api_jwt)
+        await settings_repository.update_api_jwt(vcd_api_jwt)
         logger.debug('New token created', {
             'vcd_api_jwt': vcd_api_jwt
         })
@@ -100,12 +271,11 @@ class VCDService:
         """Аутентификация клиента через BasicAuth."""
         logger.debug('Auth client via BasicAuth')
         try:
-            self._client.set_credentials(
-                BasicLoginCredentials(
-                    org=self._vcd_config.organization,
-                    user=self._vcd_config.username,
-                    password=self._vcd_config.password
-                ))
+            await self._client.login(
+                org=self._vcd_config.organization,
+                user=self._vcd_config.username,
+                password=self._vcd_config.password
+            )
         except UnauthorizedException as exception:
             logger.error(str(exception), {
                 'org': self._vcd_config.organization,
@@ -117,13 +287,13 @@ class VCDService:
                 status_code=status.HTTP_401_UNAUTHORIZED
             )
 
-    def _auth_client_via_vcloud_token(self, token: str) -> None:
+    async def _auth_client_via_vcloud_token(self, token: str) -> None:
         """Аутентификация клиента через vCloud Token."""
         logger.debug('Auth client via vCloud Token', {
             'vcd_api_vcloud_token': token
         })
         try:
-            self._client.rehydrate_from_token(token)
+            await self._client.rehydrate_from_token(token)
         except UnauthorizedException as exception:
             logger.error(
                 str(exception),
@@ -134,95 +304,319 @@ class VCDService:
                 status_code=status.HTTP_401_UNAUTHORIZED
             )
 
-    async def _auth_client(self) -> None:
-        """Аутентификация клиента."""
-        settings_model = await self._settings_repository.get_or_create()
-        if settings_model.vcd_api_jwt is None:
-            await self._auth_client_via_basic_auth()
-            return await self._update_api_jwt()
+    @staticmethod
+    def _get_valid_vcloud_token(
+            vcd_api_jwt: str | None,
+            *,
+            margin: timedelta
+    ) -> str | None:
+        """Получает vCloud Token из JWT, если до истечения
+        срока действия JWT остаётся больше `margin`."""
+        if vcd_api_jwt is None:
+            return None
         try:
             vcd_api_jwt_data = jwt.decode(
-                jwt=settings_model.vcd_api_jwt,
+                jwt=vcd_api_jwt,
                 options={'verify_signature': False}
             )
         except DecodeError:
             logger.error(constants.INVALID_FORMAT_VCD_JWT_MESSAGE, {
-                'vcd_api_jwt': settings_model.vcd_api_jwt
+                'vcd_api_jwt': vcd_api_jwt
             })
-            await self._auth_client_via_basic_auth()
-            return await self._update_api_jwt()
+            return None
         expires_at = datetime.fromtimestamp(vcd_api_jwt_data['exp'])
-        current_datetime_with_extra_time = datetime.now() + timedelta(minutes=5)
-        if current_datetime_with_extra_time < expires_at:
-            return self._auth_client_via_vcloud_token(vcd_api_jwt_data['jti'])
+        if datetime.now() + margin < expires_at:
+            return vcd_api_jwt_data['jti']
         logger.warning(constants.VCD_JWT_EXPIRED_MESSAGE, {
-            'vcd_api_jwt': settings_model.vcd_api_jwt,
+            'vcd_api_jwt': vcd_api_jwt,
         })
-        await self._auth_client_via_basic_auth()
-        await self._update_api_jwt()
+        return None
 
-    def _get_vapp_template_resource(
+    async def _auth_client(self) -> None:
+        """Аутентификация клиента."""
+        settings_model = await self._settings_repository.get_or_create()
+        token = self._get_valid_vcloud_token(
+            settings_model.vcd_api_jwt,
+            margin=timedelta(seconds=self._vcd_config.jwt_expiration_margin)
+        )
+        if token is not None:
+            try:
+                return await self._auth_client_via_vcloud_token(token)
+            except VCDAuthError:
+                # токен мог быть отозван раньше срока
+                self._client.reset_session()
+        await self._refresh_api_jwt(rejected_token=token)
+
+    async def _refresh_api_jwt(
+            self,
+            *,
+            rejected_token: str | None,
+            margin: timedelta | None = None
+    ) -> None:
+        """Получает новый JWT через BasicAuth.
+        Внутри процесса и между процессами логин выполняет
+        только один клиент, остальные дожидаются его и
+        переиспользуют уже обновлённый JWT.
+        JWT читается и сохраняется в отдельной сессии БД,
+        так как общая сессия может использоваться работами пакета."""
+        if margin is None:
+            margin = timedelta(seconds=self._vcd_config.jwt_expiration_margin)
+        async with self._client_pool.auth_lock, \
+                self._settings_repository.lock_api_jwt() as settings_repository:
+            settings_model = await settings_repository.get_or_create(
+                use_cache=False
+            )
+            token = self._get_valid_vcloud_token(
+                settings_model.vcd_api_jwt, margin=margin
+            )
+            if token is not None and token != rejected_token:
+                try:
+                    return await self._auth_client_via_vcloud_token(token)
+                except VCDAuthError:
+                    self._client.reset_session()
+            await self._auth_client_via_basic_auth()
+            await self._update_api_jwt(settings_repository)
+
+    async def renew_api_jwt(self) -> None:
+        """Заранее обновляет JWT, если срок его
+        действия подходит к концу, чтобы логин не
+        выполнялся во время пользовательских запросов."""
+        margin = timedelta(seconds=self._vcd_config.jwt_renewal_margin)
+        settings_model = await self._settings_repository.get_or_create()
+        token = self._get_valid_vcloud_token(
+            settings_model.vcd_api_jwt, margin=margin
+        )
+        if token is not None:
+            return
+        logger.info(constants.VCD_JWT_RENEWING_MESSAGE)
+        self._client = await self._client_pool.acquire()
+        try:
+            async with self._client_pool.reauth_lock:
+                await self._refresh_api_jwt(rejected_token=None, margin=margin)
+                self._client_pool.mark_checked()
+        finally:
+            await self.close_client()
+
+    async def _get_vapp_template_resource(
             self,
             *,
             catalog_template_title: str,
-            vapp_template_title: str,
-            org: Org
+            vapp_template_title: str
     ) -> ObjectifiedElement:
-        """Получает ресурс шаблона vApp."""
-        try:
-            catalog_item = org.get_catalog_item(
-                name=catalog_template_title,
-                item_name=vapp_template_title
+        """Получает ресурс шаблона vApp.
+        При промахе по каталогу ресурс организации перечитывается."""
+        catalog_href = None
+        for refresh in (False, True):
+            org_resource = await self._get_org_resource(refresh=refresh)
+            catalog_href = find_link_href(
+                org_resource,
+                rel=RelationType.DOWN.value,
+                media_type=EntityType.CATALOG.value,
+                name=catalog_template_title
             )
-        except EntityNotFoundException as exception:
-            logger.error(str(exception), {
+            if catalog_href is not None:
+                break
+        catalog_item_href = None
+        if catalog_href is not None:
+            catalog_resource = await self._client.get_resource(catalog_href)
+            if hasattr(catalog_resource, 'CatalogItems') and \
+                    hasattr(catalog_resource.CatalogItems, 'CatalogItem'):
+                for catalog_item in catalog_resource.CatalogItems.CatalogItem:
+                    if catalog_item.get('name') == vapp_template_title:
+                        catalog_item_href = catalog_item.get('href')
+                        break
+        if catalog_item_href is None:
+            logger.error(constants.VAPP_TEMPLATE_RESOURCE_NOT_FOUND_MESSAGE, {
                 'catalog_template_title': catalog_template_title,
                 'vapp_template_title': vapp_template_title
             })
             raise VCDResourceNotFoundException(
-                content=str(exception),
+                content=constants.VAPP_TEMPLATE_RESOURCE_NOT_FOUND_MESSAGE,
                 status_code=status.HTTP_404_NOT_FOUND
             )
-        return self._client.get_resource(catalog_item.Entity.get('href'))
+        catalog_item_resource = await self._client.get_resource(catalog_item_href)
+        return await self._client.get_resource(
+            catalog_item_resource.Entity.get('href')
+        )
 
-    def _get_client_org(self) -> Org:
-        """Получает организацию клиента."""
-        resource = self._client.get_org()
-        return Org(self._client, resource=resource)
+    async def _get_org_resource(
+            self,
+            *,
+            refresh: bool = False
+    ) -> ObjectifiedElement:
+        """Получает ресурс организации клиента из индекса иерархии."""
+        org_resource = None
+        if not refresh:
+            org_resource = self._hierarchy_index.get(constants.ORG_INDEX_KEY)
+        if org_resource is None:
+            org_resource = await self._client.get_org()
+            self._hierarchy_index.set(constants.ORG_INDEX_KEY, org_resource)
+        return org_resource
 
-    def _get_vdc(self, title: str, *, org: Org) -> VDC:
-        """Получает vDC по названию и организации."""
-        resource = org.get_vdc(title)
-        if resource is None:
-            logger.error(constants.VDC_RESOURCE_NOT_FOUND_MESSAGE, {
-                'title': title
+    async def _get_template(self, template_id: int) -> TemplateCacheEntry:
+        """Получает шаблон каталога вместе с ресурсом
+        шаблона vApp, используя кэш шаблонов."""
+        template = await self._template_cache.get(template_id)
+        if template is not None:
+            return template
+        version = self._template_cache.version
+        template_catalog_model = await self._template_catalog_repository.get(template_id)
+        if template_catalog_model is None:
+            logger.error(constants.TEMPLATE_CATALOG_NOT_FOUND_MESSAGE, {
+                'template_id': template_id
             })
-            raise VCDResourceNotFoundException(
-                content=constants.VDC_RESOURCE_NOT_FOUND_MESSAGE,
+            raise TemplateCatalogNotFoundException(
+                content=constants.TEMPLATE_CATALOG_NOT_FOUND_MESSAGE,
                 status_code=status.HTTP_404_NOT_FOUND
             )
-        return VDC(self._client, resource=resource)
+        return await self._cache_template(template_catalog_model, version=version)
 
-    def _get_vapp(self, title: str, *, vdc: VDC) -> VApp:
-        """Получает vApp по vDC и названию vApp"""
-        try:
-            resource = vdc.get_vapp(title)
-        # TypeError - если `title` is None
-        except (EntityNotFoundException, TypeError):
-            logger.error(constants.VAPP_RESOURCE_NOT_FOUND_MESSAGE, {
-                'title': title
-            })
-            raise VCDResourceNotFoundException(
-                content=constants.VAPP_RESOURCE_NOT_FOUND_MESSAGE,
-                status_code=status.HTTP_404_NOT_FOUND
+    async def _cache_template(
+            self,
+            template_catalog_model: TemplateCatalogModel,
+            *,
+            version: int
+    ) -> TemplateCacheEntry:
+        """Получает ресурс шаблона vApp и кэширует шаблон."""
+        catalog_template_title = template_catalog_model.catalog_template.title
+        vapp_template_title = template_catalog_model.vapp_template.title
+        vapp_template_resource = await self._get_vapp_template_resource(
+            catalog_template_title=catalog_template_title,
+            vapp_template_title=vapp_template_title
+        )
+        return self._template_cache.set(
+            template_catalog_model.id,
+            catalog_template_title=catalog_template_title,
+            vapp_template_title=vapp_template_title,
+            vm_template_title=template_catalog_model.vm_template.title,
+            vapp_template_resource=vapp_template_resource,
+            version=version
+        )
+
+    async def warm_up_template_cache(self) -> None:
+        """Загружает все шаблоны каталога в кэш шаблонов."""
+        version = self._template_cache.version
+        template_catalog_models = await self._template_catalog_repository.get_all()
+        for template_catalog_model in template_catalog_models:
+            try:
+                await self._cache_template(template_catalog_model, version=version)
+            except VCDResourceNotFoundException:
+                continue
+        logger.info('Templates cache warmed up', {
+            'count': len(template_catalog_models)
+        })
+
+    async def _get_vdc_href(self, title: str | None) -> str:
+        """Получает ссылку vDC по названию.
+        При промахе ресурс организации перечитывается."""
+        # без названия `find_link_href` вернул бы первый попавшийся vDC
+        refreshes = (False, True) if title is not None else ()
+        for refresh in refreshes:
+            org_resource = await self._get_org_resource(refresh=refresh)
+            href = find_link_href(
+                org_resource,
+                rel=RelationType.DOWN.value,
+                media_type=EntityType.VDC.value,
+                name=title
             )
-        return VApp(self._client, resource=resource)
+            if href is not None:
+                return href
+        logger.error(constants.VDC_RESOURCE_NOT_FOUND_MESSAGE, {
+            'title': title
+        })
+        raise VCDResourceNotFoundException(
+            content=constants.VDC_RESOURCE_NOT_FOUND_MESSAGE,
+            status_code=status.HTTP_404_NOT_FOUND
+        )
+
+    async def _get_vdc(self, title: str) -> ObjectifiedElement:
+        """Получает ресурс vDC по названию."""
+        href = await self._get_vdc_href(title)
+        try:
+            return await self._client.get_resource(href)
+        except (NotFoundException, AccessForbiddenException):
+            # vDC пересоздан, ссылка в индексе устарела
+            await self._hierarchy_index.invalidate(constants.ORG_INDEX_KEY)
+        href = await self._get_vdc_href(title)
+        return await self._client.get_resource(href)
 
     @staticmethod
-    def _vm_create(*, vapp: VApp, specification: list) -> None:
-        """Создаёт ВМ в vApp через спецификацию."""
+    def _list_vapp_entities(
+            vdc_resource: ObjectifiedElement
+    ) -> list[ObjectifiedElement]:
+        """Получает список сущностей vApp из ресурса vDC."""
+        if not hasattr(vdc_resource, 'ResourceEntities') or \
+                not hasattr(vdc_resource.ResourceEntities, 'ResourceEntity'):
+            return []
+        return [
+            resource_entity
+            for resource_entity in vdc_resource.ResourceEntities.ResourceEntity
+            if resource_entity.get('type') == EntityType.VAPP.value
+        ]
+
+    async def _get_vapp(
+            self,
+            title: str,
+            *,
+            vdc_title: str
+    ) -> ObjectifiedElement:
+        """Получает ресурс vApp по названиям vDC и vApp.
+        Ссылка на vApp берётся из индекса иерархии, а при её
+        отсутствии или устаревании ищется заново в ресурсе vDC."""
+        index_key = (constants.VAPP_INDEX_KEY, vdc_title, title)
+        href = self._hierarchy_index.get(index_key)
+        if href is not None:
+            try:
+                return await self._client.get_resource(href)
+            except (NotFoundException, AccessForbiddenException):
+                await self._hierarchy_index.invalidate(index_key)
+        vdc_resource = await self._get_vdc(vdc_title)
+        for resource_entity in self._list_vapp_entities(vdc_resource):
+            if resource_entity.get('name') == title:
+                href = resource_entity.get('href')
+                self._hierarchy_index.set(index_key, href)
+                return await self._client.get_resource(href)
+        logger.error(constants.VAPP_RESOURCE_NOT_FOUND_MESSAGE, {
+            'title': title
+        })
+        raise VCDResourceNotFoundException(
+            content=constants.VAPP_RESOURCE_NOT_FOUND_MESSAGE,
+            status_code=status.HTTP_404_NOT_FOUND
+        )
+
+    async def list_vapp_vm_ids(
+            self,
+            *,
+            vapp_title: str,
+            vdc_title: str | None
+    ) -> list[str]:
+        """Получает ID ВМ vApp. Если vDC не указан, то берётся vDC по умолчанию."""
+        if vdc_title is None:
+            settings_model = await self._settings_repository.get_or_create()
+            vdc_title = settings_model.default_vdc
+        vapp_resource = await self._get_vapp(vapp_title, vdc_title=vdc_title)
+        if not hasattr(vapp_resource, 'Children') or \
+                not hasattr(vapp_resource.Children, 'Vm'):
+            return []
+        return [extract_id(vm.get('id')) for vm in vapp_resource.Children.Vm]
+
+    async def _vm_create(
+            self,
+            *,
+            vapp_href: str,
+            specification: list
+    ) -> None:
+        """Создаёт ВМ в vApp через спецификацию и дожидается завершения
+        перекомпоновки, чтобы следующая пачка vApp не начиналась раньше.
+        Ресурс vApp запрашивается заново, так как предыдущая пачка
+        могла его изменить."""
         try:
-            vapp.add_vms(specification, power_on=False)
+            vapp_resource = await self._client.get_resource(vapp_href)
+            async with self._sync_client() as sync_client:
+                vapp = VApp(sync_client, resource=vapp_resource)
+                task_resource = await self._blocking_call_executor.run(
+                    vapp.add_vms, specification, power_on=False
+                )
         except EntityNotFoundException as exception:
             logger.error(str(exception), {
                 'specification': specification
@@ -247,6 +641,50 @@ class VCDService:
                 content=str(exception),
                 status_code=status.HTTP_400_BAD_REQUEST
             )
+        task_resource = await self._wait_vcd_task(task_resource)
+        if task_resource.get('status') != constants.VCD_TASK_SUCCESS_STATUS:
+            message = task_resource.Error.get('message') \
+                if hasattr(task_resource, 'Error') \
+                else constants.VM_CREATING_FAILED_MESSAGE
+            logger.error(message, {
+                'specification': specification
+            })
+            raise VMCreatingException(
+                content=message,
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+        vapp_resource = await self._client.get_resource(vapp_href)
+        target_vm_names = {item['target_vm_name'] for item in specification}
+        if hasattr(vapp_resource, 'Children') and \
+                hasattr(vapp_resource.Children, 'Vm'):
+            for vm in vapp_resource.Children.Vm:
+                if vm.get('name') in target_vm_names:
+                    self._track_vcd_task(
+                        task_resource,
+                        vm_id=extract_id(vm.get('id')),
+                        operation=JobTypeEnum.VM_CREATE.value
+                    )
+
+    async def _wait_vcd_task(
+            self,
+            task_resource: ObjectifiedElement
+    ) -> ObjectifiedElement:
+        """Дожидается завершения задачи vCD и возвращает её итоговый ресурс."""
+        deadline = time.monotonic() + self._vcd_config.task_wait_timeout
+        while task_resource.get('status') in constants.VCD_TASK_RUNNING_STATUSES:
+            if time.monotonic() >= deadline:
+                logger.error(constants.VCD_TASK_TIMEOUT_MESSAGE, {
+                    'task': task_resource.get('href')
+                })
+                raise VCDTaskTimeoutException(
+                    content=constants.VCD_TASK_TIMEOUT_MESSAGE,
+                    status_code=status.HTTP_504_GATEWAY_TIMEOUT
+                )
+            await asyncio.sleep(self._vcd_config.task_wait_interval)
+            task_resource = await self._client.get_resource(
+                task_resource.get('href')
+            )
+        return task_resource
 
     async def vm_create(
             self,
@@ -257,99 +695,184 @@ class VCDService:
             template_id: int,
             vm_title: str,
     ) -> None:
-        """Создаёт ВМ."""
-        settings_model = await self._settings_repository.get_or_create()
+        """Создаёт ВМ. Одновременные создания ВМ в одном vApp
+        объединяются в одну перекомпоновку vApp с несколькими спецификациями,
+        так как vCD выполняет перекомпоновки vApp только по одной."""
+        async with self.session_lock:
+            settings_model = await self._settings_repository.get_or_create()
         vdc_title = vdc_title or settings_model.default_vdc
         vapp_title = vapp_title or settings_model.default_vapp
-        org = self._get_client_org()
-        vdc = self._get_vdc(vdc_title, org=org)
-        vapp = self._get_vapp(vapp_title, vdc=vdc)
-        template_catalog_model = await self._template_catalog_repository.get(template_id)
-        if template_catalog_model is None:
-            logger.error(constants.TEMPLATE_CATALOG_NOT_FOUND_MESSAGE, {
-                'template_id': template_id
-            })
-            raise TemplateCatalogNotFoundException(
-                content=constants.TEMPLATE_CATALOG_NOT_FOUND_MESSAGE,
-                status_code=status.HTTP_404_NOT_FOUND
-            )
-        catalog_template_title = template_catalog_model.catalog_template.title
-        vapp_template_title = template_catalog_model.vapp_template.title
-        vm_template_title = template_catalog_model.vm_template.title
-        vapp_template_resource = self._get_vapp_template_resource(
-            catalog_template_title=catalog_template_title,
-            vapp_template_title=vapp_template_title,
-            org=org
-        )
+        vapp_resource = await self._get_vapp(vapp_title, vdc_title=vdc_title)
+        async with self.session_lock:
+            template = await self._get_template(template_id)
         specification = {
-            'vapp': vapp_template_resource,
-            'source_vm_name': vm_template_title,
+            # pyvcloud собирает запрос из элементов шаблона,
+            # поэтому закэшированный ресурс передаётся копией
+            'vapp': deepcopy(template.vapp_template_resource),
+            'source_vm_name': template.vm_template_title,
             'target_vm_name': vm_title,
             'hostname': 'hostname',
             'password': os_password
         }
-        self._vm_create(vapp=vapp, specification=[specification])
+        vapp_href = vapp_resource.get('href')
+        await self._vm_create_batcher.submit(
+            vapp_href,
+            specification,
+            lambda specifications: self._vm_create(
+                vapp_href=vapp_href,
+                specification=specifications
+            )
+        )
 
-    def vm_power_off(self, *, vm_id: str) -> None:
+    async def vm_power_off(self, *, vm_id: str) -> None:
         """Выключает ВМ."""
-        vm = self._get_vm_by_id(vm_id)
+        vm_resource = await self._get_vm_by_id(vm_id)
         try:
-            vm.power_off()
+            task_resource = await self._client.post_linked_resource(
+                vm_resource, rel=RelationType.POWER_OFF.value
+            )
+            await self._vm_resource_cache.invalidate(vm_id)
+            self._track_vcd_task(
+                task_resource,
+                vm_id=vm_id,
+                operation=JobTypeEnum.VM_POWER_OFF.value
+            )
         except OperationNotSupportedException as exception:
             logger.error(str(exception), {
                 'vm_id': vm_id,
-                'power_state': vm.get_power_state()
+                'power_state': self._get_vm_power_state(vm_resource)
             })
             raise VMPowerStateException(
                 content=str(exception),
                 status_code=status.HTTP_409_CONFLICT
             )
 
-    def vm_power_on(self, *, vm_id: str) -> None:
+    async def vm_power_on(self, *, vm_id: str) -> None:
         """Включает ВМ."""
-        vm = self._get_vm_by_id(vm_id)
+        vm_resource = await self._get_vm_by_id(vm_id)
         try:
-            vm.power_on()
+            task_resource = await self._client.post_linked_resource(
+                vm_resource, rel=RelationType.POWER_ON.value
+            )
+            await self._vm_resource_cache.invalidate(vm_id)
+            self._track_vcd_task(
+                task_resource,
+                vm_id=vm_id,
+                operation=JobTypeEnum.VM_POWER_ON.value
+            )
         except OperationNotSupportedException as exception:
             logger.error(str(exception), {
                 'vm_id': vm_id,
-                'power_state': vm.get_power_state()
+                'power_state': self._get_vm_power_state(vm_resource)
             })
             raise VMPowerStateException(
                 content=str(exception),
                 status_code=status.HTTP_409_CONFLICT
             )
 
-    def vm_power_reset(self, *, vm_id: str) -> None:
+    async def vm_power_reset(self, *, vm_id: str) -> None:
         """Сброс ВМ по питанию."""
-        vm = self._get_vm_by_id(vm_id)
+        vm_resource = await self._get_vm_by_id(vm_id)
         try:
-            vm.power_reset()
+            task_resource = await self._client.post_linked_resource(
+                vm_resource, rel=RelationType.POWER_RESET.value
+            )
+            await self._vm_resource_cache.invalidate(vm_id)
+            self._track_vcd_task(
+                task_resource,
+                vm_id=vm_id,
+                operation=JobTypeEnum.VM_POWER_RESET.value
+            )
         except OperationNotSupportedException as exception:
             logger.error(str(exception), {
                 'vm_id': vm_id,
-                'power_state': vm.get_power_state()
+                'power_state': self._get_vm_power_state(vm_resource)
             })
             raise VMPowerStateException(
                 content=str(exception),
                 status_code=status.HTTP_409_CONFLICT
             )
 
-    def vm_get_power_status(self, *, vm_id: str) -> str:
-        """Получение статуса ВМ."""
-        vm = self._get_vm_by_id(vm_id)
-        vm_power_state = vm.get_power_state()
+    async def vm_get_power_status(self, *, vm_id: str) -> str:
+        """Получение статуса ВМ. Одновременные запросы по одной ВМ
+        объединяются в один запрос к vCD."""
+        return await self._single_flight.run(
+            (constants.VM_POWER_STATUS_SINGLE_FLIGHT_KEY, vm_id),
+            lambda: self._fetch_vm_power_status(vm_id)
+        )
+
+    async def _fetch_vm_power_status(self, vm_id: str) -> str:
+        """Запрашивает статус ВМ у vCD."""
+        vm_resource = await self._get_vm_by_id(vm_id, cached=True)
+        vm_power_state = self._get_vm_power_state(vm_resource)
         return VMPowerStatus(vm_power_state).name
 
-    def vm_get_console_url(self, *, vm_id: str) -> str:
+    async def vm_get_power_statuses(
+            self, *, vm_ids: list[str]
+    ) -> dict[str, str | None]:
+        """Получение статусов нескольких ВМ пачками через query API
+        вместо получения ресурса каждой ВМ.
+        Статус - название из `VMPowerStatus`, как у `vm_get_power_status`.
+        Для ВМ, не найденных в vCD или в состоянии, которого
+        нет в `VMPowerStatus` (например `PARTIALLY_POWERED_OFF`
+        или `FAILED_CREATION`), возвращается `None`."""
+        statuses = dict.fromkeys(vm_ids)
+        async for vm_record in self._query_vm_records([
+            f'id=={constants.VCD_VM_URN_PREFIX}{vm_id}' for vm_id in statuses
+        ]):
+            vm_status = vm_record.get('status')
+            if vm_status in VMPowerStatus.__members__:
+                statuses[self._get_vm_record_id(vm_record)] = vm_status
+        logger.debug('VM power statuses queried', {
+            'requested': len(statuses),
+            'found': sum(vm_status is not None for vm_status in statuses.values())
+        })
+        return statuses
+
+    async def _query_vm_records(
+            self,
+            conditions: list[str]
+    ) -> AsyncIterable[ObjectifiedElement]:
+        """Получает записи ВМ, подходящие под любое из условий query API,
+        например `id==<URN ВМ>` или `container==<ссылка vApp>`.
+        Условия запрашиваются пачками не больше страницы, фильтр каждой
+        из которых умещается в допустимую длину ссылки.
+        Статус записи - состояние vCD как есть, например `POWERED_ON`
+        или `PARTIALLY_POWERED_OFF`."""
+        query_filters = chunk_query_filter(
+            conditions,
+            max_size=self._vcd_config.vm_query_page_size,
+            max_length=self._vcd_config.query_filter_max_length
+        )
+        for query_filter in query_filters:
+            query = urlencode({
+                'type': 'vm',
+                'format': 'records',
+                'page': 1,
+                'pageSize': self._vcd_config.vm_query_page_size,
+                'filter': query_filter
+            })
+            uri = f'{self._client.get_api_uri()}/query?{query}'
+            while uri is not None:
+                result = await self._client.get_resource(uri)
+                if hasattr(result, 'VMRecord'):
+                    for vm_record in result.VMRecord:
+                        yield vm_record
+                uri = find_link_href(result, rel=RelationType.NEXT_PAGE.value)
+
+    async def vm_get_console_url(self, *, vm_id: str) -> str:
         """Получение ссылки на консоль ВМ."""
-        vm = self._get_vm_by_id(vm_id)
+        vm_resource = await self._get_vm_by_id(vm_id)
         try:
-            screen_data = vm.list_mks_ticket()
+            async with self._sync_client() as sync_client:
+                vm = VM(sync_client, resource=vm_resource)
+                screen_data = await self._blocking_call_executor.run(
+                    vm.list_mks_ticket
+                )
         except ConflictException as exception:
             logger.error(str(exception), {
                 'vm_id': vm_id,
-                'power_state': vm.get_power_state()
+                'power_state': self._get_vm_power_state(vm_resource)
             })
             raise VMPowerStateException(
                 content=str(exception),
@@ -366,27 +889,88 @@ class VCDService:
                 ticket=ticket
             )
 
-    def vm_create_snapshot(self, *, vm_id: str) -> None:
+    async def vm_create_snapshot(self, *, vm_id: str) -> None:
         """Создаёт снэпшот ВМ."""
-        vm = self._get_vm_by_id(vm_id)
-        vm.snapshot_create(memory=True)
+        vm_resource = await self._get_vm_by_id(vm_id)
+        async with self._sync_client() as sync_client:
+            vm = VM(sync_client, resource=vm_resource)
+            await self._blocking_call_executor.run(
+                vm.snapshot_create, memory=True
+            )
+        await self._vm_resource_cache.invalidate(vm_id)
+
+    async def _list_vm_current_metrics(
+            self,
+            vm_resource: ObjectifiedElement
+    ) -> list[dict[str, str]]:
+        """Получает текущие метрики ВМ в формате
+        `pyvcloud.vcd.vm.VM.list_all_current_metrics`."""
+        if self._get_vm_power_state(vm_resource) != VMPowerStatus.POWERED_ON:
+            raise OperationNotSupportedException(
+                constants.VM_METRICS_NOT_AVAILABLE_MESSAGE
+            )
+        return await self._get_vm_current_metrics(vm_resource.get('href'))
+
+    async def _get_vm_current_metrics(self, vm_href: str) -> list[dict[str, str]]:
+        """Получает текущие метрики ВМ по её ссылке."""
+        metrics = await self._client.get_resource(vm_href + '/metrics/current')
+        if not hasattr(metrics, 'Metric'):
+            return []
+        return [
+            {
+                'metric_name': metric.get('name'),
+                'unit': metric.get('unit'),
+                'value': metric.get('value')
+            }
+            for metric in metrics.Metric
+        ]
+
+    async def vm_get_current_usage(self, *, vm_id: str) -> list[dict[str, str]]:
+        """Получает текущее использование ресурсов ВМ.
+        Достаточно свежее значение берётся из памяти процесса или
+        из собранной статистики, иначе запрашивается у vCD одним
+        запросом на всех одновременно ожидающих."""
+        metrics = await self._get_recent_vm_usage(vm_id)
+        if metrics is not None:
+            return metrics
+        return await self._single_flight.run(
+            (constants.VM_USAGE_SINGLE_FLIGHT_KEY, vm_id),
+            lambda: self._fetch_vm_current_usage(vm_id)
+        )
+
+    async def _get_recent_vm_usage(self, vm_id: str) -> list[dict[str, str]] | None:
+        """Получает использование ресурсов ВМ не старше допустимого."""
+        max_age = self._vm_usage_cache.max_age
+        if not max_age:
+            return None
+        metrics = self._vm_usage_cache.get(vm_id)
+        if metrics is not None:
+            return metrics
+        async with self.session_lock:
+            row = await self._vm_repository.get_latest_statistics(
+                vm_id,
+                created_after=datetime.now() - timedelta(seconds=max_age)
+            )
+        return None if row is None else format_vm_metrics(row)
 
-    def vm_get_current_usage(self, *, vm_id: str) -> list[dict[str, str]]:
-        """Получает текущее использование ресурсов ВМ."""
-        vm = self._get_vm_by_id(vm_id)
+    async def _fetch_vm_current_usage(self, vm_id: str) -> list[dict[str, str]]:
+        """Запрашивает текущее использование ресурсов ВМ у vCD."""
+        vm_resource = await self._get_vm_by_id(vm_id, cached=True)
         try:
-            return vm.list_all_current_metrics()
+            metrics = await self._list_vm_current_metrics(vm_resource)
         except OperationNotSupportedException as exception:
             logger.error(str(exception), {
                 'vm_id': vm_id,
-                'power_state': vm.get_power_state()
+                'power_state': self._get_vm_power_state(vm_resource)
             })
             raise VMPowerStateException(
                 content=str(exception),
                 status_code=status.HTTP_409_CONFLICT
             )
+        self._vm_usage_cache.set(vm_id, metrics)
+        return metrics
 
-    def vm_set_hdd(
+    async def vm_set_hdd(
             self,
             *,
             vm_id: str,
@@ -399,9 +983,9 @@ class VCDService:
         element_name_key = '{' + NSMAP['rasd'] + '}ElementName'
         host_resource_key = '{' + NSMAP['rasd'] + '}HostResource'
         capacity_key = '{' + NSMAP['vcloud'] + '}capacity'
-        vm = self._get_vm_by_id(vm_id)
-        uri = vm.href + '/virtualHardwareSection/disks'
-        disk_list = self._client.get_resource(uri)
+        vm_resource = await self._get_vm_by_id(vm_id)
+        uri = vm_resource.get('href') + '/virtualHardwareSection/disks'
+        disk_list = await self._client.get_resource(uri)
         if disk_number is None:
             disk_number = 1
         for disk in disk_list.Item:
@@ -411,15 +995,16 @@ class VCDService:
                 disk[virtual_quantity_key] = hdd
                 disk[host_resource_key].set(capacity_key, str(hdd))
                 try:
-                    self._client.put_resource(
+                    await self._client.put_resource(
                         uri, disk_list, EntityType.RASD_ITEMS_LIST.value
                     )
+                    await self._vm_resource_cache.invalidate(vm_id)
                     break
                 except BadRequestException as exception:
                     logger.error(str(exception), {
                         'vm_id': vm_id,
                         'hdd': hdd,
-                        'power_state': vm.get_power_state()
+                        'power_state': self._get_vm_power_state(vm_resource)
                     })
                     raise VCDBadRequestException(
                         content=str(exception),
@@ -429,54 +1014,100 @@ class VCDService:
             logger.error(constants.VM_DISK_NOT_FOUND_MESSAGE, {
                 'vm_id': vm_id,
                 'hdd': hdd,
-                'power_state': vm.get_power_state()
+                'power_state': self._get_vm_power_state(vm_resource)
             })
             raise VCDBadRequestException(
                 content=constants.VM_DISK_NOT_FOUND_MESSAGE,
                 status_code=status.HTTP_400_BAD_REQUEST
             )
 
-    def vm_set_cpu(self, *, vm_id: str, cpu: int) -> None:
+    async def vm_set_cpu(self, *, vm_id: str, cpu: int) -> None:
         """Устанавливает значение vCPU ВМ в количестве."""
-        vm = self._get_vm_by_id(vm_id)
+        vm_resource = await self._get_vm_by_id(vm_id)
+        uri = vm_resource.get('href') + '/virtualHardwareSection/cpu'
         try:
-            vm.modify_cpu(cpu)
+            item = await self._client.get_resource(uri)
+            item['{' + NSMAP['rasd'] + '}ElementName'] = f'{cpu} virtual CPU(s)'
+            item['{' + NSMAP['rasd'] + '}VirtualQuantity'] = cpu
+            item['{' + NSMAP['vmw'] + '}CoresPerSocket'] = cpu
+            task_resource = await self._client.put_resource(
+                uri, item, EntityType.RASD_ITEM.value
+            )
+            await self._vm_resource_cache.invalidate(vm_id)
+            self._track_vcd_task(
+                task_resource,
+                vm_id=vm_id,
+                operation=JobTypeEnum.VM_SET_CPU.value
+            )
         except BadRequestException as exception:
             logger.error(str(exception), {
                 'vm_id': vm_id,
                 'cpu': cpu,
-                'power_state': vm.get_power_state()
+                'power_state': self._get_vm_power_state(vm_resource)
             })
             raise VCDBadRequestException(
                 content=str(exception),
                 status_code=status.HTTP_400_BAD_REQUEST
             )
 
-    def vm_set_ram(self, *, vm_id: str, ram: int) -> None:
+    async def vm_set_ram(self, *, vm_id: str, ram: int) -> None:
         """Устанавливает значение vRAM ВМ в МБ."""
-        vm = self._get_vm_by_id(vm_id)
+        vm_resource = await self._get_vm_by_id(vm_id)
+        uri = vm_resource.get('href') + '/virtualHardwareSection/memory'
         try:
-            vm.modify_memory(ram)
+            item = await self._client.get_resource(uri)
+            item['{' + NSMAP['rasd'] + '}ElementName'] = f'{ram} MB of memory'
+            item['{' + NSMAP['rasd'] + '}VirtualQuantity'] = ram
+            task_resource = await self._client.put_resource(
+                uri, item, EntityType.RASD_ITEM.value
+            )
+            await self._vm_resource_cache.invalidate(vm_id)
+            self._track_vcd_task(
+                task_resource,
+                vm_id=vm_id,
+                operation=JobTypeEnum.VM_SET_RAM.value
+            )
         except BadRequestException as exception:
             logger.error(str(exception), {
                 'vm_id': vm_id,
                 'ram': ram,
-                'power_state': vm.get_power_state()
+                'power_state': self._get_vm_power_state(vm_resource)
             })
             raise VCDBadRequestException(
                 content=str(exception),
                 status_code=status.HTTP_400_BAD_REQUEST
             )
 
+    @staticmethod
+    def _get_vm_power_state(vm_resource: ObjectifiedElement) -> int:
+        """Получает состояние питания ВМ из её ресурса."""
+        return int(vm_resource.get('status'))
+
     def _get_vm_href(self, *, vm_id: str) -> str:
         """Получает ссылку ВМ по ID."""
         return f'{self._client.get_api_uri()}/vApp/vm-{vm_id}'
 
-    def _get_vm_by_id(self, vm_id: str) -> VM:
-        """Получение ВМ по ID."""
+    def _get_vapp_href(self, *, vapp_id: str) -> str:
+        """Получает ссылку vApp по ID."""
+        return f'{self._client.get_api_uri()}/vApp/vapp-{vapp_id}'
+
+    async def _get_vm_by_id(
+            self,
+            vm_id: str,
+            *,
+            cached: bool = False
+    ) -> ObjectifiedElement:
+        """Получение ресурса ВМ по ID.
+        С `cached` ресурс отдаётся из кэша, пока не истёк его срок,
+        а затем перезапрашивается условным запросом по ETag."""
+        entry = self._vm_resource_cache.get(vm_id) if cached else None
+        if entry is not None and self._vm_resource_cache.is_fresh(entry):
+            return entry.resource
         try:
-            vm = VM(self._client, href=self._get_vm_href(vm_id=vm_id))
-            vm.reload()
+            vm_resource, etag = await self._client.get_resource_if_modified(
+                self._get_vm_href(vm_id=vm_id),
+                etag=entry.etag if entry is not None else None
+            )
         except AccessForbiddenException as exception:
             logger.error(str(exception), {'vm_id': vm_id})
             raise VMNotFoundException(
@@ -495,48 +1126,351 @@ class VCDService:
                 content=str(exception),
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
-        return vm
+        if vm_resource is None:
+            self._vm_resource_cache.touch(vm_id)
+            return entry.resource
+        self._vm_resource_cache.set(vm_id, vm_resource, etag=etag)
+        return vm_resource
+
+    async def _iterate_vm_records(self) -> AsyncIterable[ObjectifiedElement]:
+        """Итерация по записям ВМ организации через query API.
+        Одна страница записей заменяет обход vDC и vApp."""
+        query = urlencode({
+            'type': 'vm',
+            'format': 'records',
+            'page': 1,
+            'pageSize': self._vcd_config.vm_query_page_size,
+            'filter': 'isVAppTemplate==false'
+        })
+        uri = f'{self._client.get_api_uri()}/query?{query}'
+        while uri is not None:
+            result = await self._client.get_resource(uri)
+            if hasattr(result, 'VMRecord'):
+                for vm_record in result.VMRecord:
+                    yield vm_record
+            uri = find_link_href(result, rel=RelationType.NEXT_PAGE.value)
+
+    @staticmethod
+    def _get_vm_record_id(vm_record: ObjectifiedElement) -> str:
+        """Получает ID ВМ из ссылки её записи вида `.../vApp/vm-{vm_id}`."""
+        return vm_record.get('href').rsplit('/', 1)[-1].removeprefix('vm-')
+
+    async def sync_vm_inventory(self) -> None:
+        """Синхронизирует локальный инвентарь ВМ с vCD.
+        Полная синхронизация перечитывает записи всех ВМ и удаляет пропавшие,
+        а между полными перечитываются только ВМ и vApp, задачи vCD
+        над которыми завершились с начала прошлой синхронизации."""
+        started_at = datetime.now()
+        sync_model = await self._vm_repository.get_inventory_sync()
+        is_full = sync_model is None or (
+            started_at - sync_model.full_synced_at
+        ).total_seconds() >= self._vcd_config.inventory_full_sync_interval
+        if is_full:
+            vdc_titles = await self._query_vdc_titles()
+            self._hierarchy_index.set(constants.VDC_TITLES_INDEX_KEY, vdc_titles)
+            vms = [
+                self._get_vm_inventory_item(vm_record, vdc_titles=vdc_titles)
+                async for vm_record in self._iterate_vm_records()
+            ]
+            await self._vm_repository.bulk_upsert_inventory(vms, synced_at=started_at)
+            deleted_vm_ids = await self._vm_repository.delete_stale_inventory(
+                synced_before=started_at
+            )
+            synced = len(vms)
+        else:
+            vm_hrefs, vapp_hrefs = await self._query_finished_task_objects(
+                finished_after=sync_model.synced_at - constants.VM_INVENTORY_SYNC_OVERLAP
+            )
+            synced_vm_ids, deleted_vm_ids = await self._refresh_vm_inventory(
+                vm_hrefs, vapp_hrefs, synced_at=started_at
+            )
+            synced = len(synced_vm_ids)
+        await self._vm_repository.set_inventory_synced(
+            synced_at=started_at, full=is_full
+        )
+        logger.info(constants.VM_INVENTORY_SYNCED_MESSAGE, {
+            'full': is_full,
+            'synced': synced,
+            'deleted': len(deleted_vm_ids),
+            'duration': (datetime.now() - started_at).total_seconds()
+        })
+
+    async def apply_vcd_notifications(
+            self, notifications: list[VCDNotification]
+    ) -> None:
+        """Применяет уведомления vCD об изменении ВМ и vApp:
+        перечитывает затронутые ВМ в инвентарь и уведомляет процессы,
+        чтобы они сбросили кэши этих ВМ."""
+        vm_hrefs = sorted({
+            self._get_vm_href(vm_id=notification.entity_id)
+            for notification in notifications
+            if notification.entity_type == constants.VCD_NOTIFICATION_VM_TYPE
+        })
+        vapp_hrefs = sorted({
+            self._get_vapp_href(vapp_id=notification.entity_id)
+            for notification in notifications
+            if notification.entity_type == constants.VCD_NOTIFICATION_VAPP_TYPE
+        })
+        synced_vm_ids, deleted_vm_ids = await self._refresh_vm_inventory(
+            vm_hrefs, vapp_hrefs, synced_at=datetime.now()
+        )
+        changed_vm_ids = sorted({*synced_vm_ids, *deleted_vm_ids})
+        if changed_vm_ids:
+            await self._vm_repository.notify_vms_changed(changed_vm_ids)
+        logger.info(constants.VCD_NOTIFICATIONS_APPLIED_MESSAGE, {
+            'notifications': len(notifications),
+            'synced': len(synced_vm_ids),
+            'deleted': len(deleted_vm_ids)
+        })
+
+    async def _refresh_vm_inventory(
+            self,
+            vm_hrefs: list[str],
+            vapp_hrefs: list[str],
+            *,
+            synced_at: datetime
+    ) -> tuple[list[str], list[str]]:
+        """Перечитывает в инвентарь ВМ и все ВМ vApp по их ссылкам,
+        удаляя не найденные в vCD. Возвращает ID перечитанных и удалённых ВМ."""
+        if not vm_hrefs and not vapp_hrefs:
+            return [], []
+        vdc_titles = await self._get_vdc_titles()
+        vms = [
+            self._get_vm_inventory_item(vm_record, vdc_titles=vdc_titles)
+            async for vm_record in self._query_vm_records([
+                *(f'href=={href}' for href in vm_hrefs),
+                *(f'container=={href}' for href in vapp_hrefs)
+            ])
+        ]
+        await self._vm_repository.bulk_upsert_inventory(vms, synced_at=synced_at)
+        deleted_vm_ids = await self._vm_repository.delete_stale_inventory(
+            synced_before=synced_at,
+            vm_ids=[self._get_href_id(href, prefix='vm-') for href in vm_hrefs],
+            vapp_ids=[self._get_href_id(href, prefix='vapp-') for href in vapp_hrefs]
+        )
+        return [vm['vm_id'] for vm in vms], deleted_vm_ids
+
+    async def _query_finished_task_objects(
+            self, *, finished_after: datetime
+    ) -> tuple[list[str], list[str]]:
+        """Получает ссылки ВМ и vApp, задачи vCD над которыми
+        завершились после указанного времени."""
+        query = urlencode({
+            'type': 'task',
+            'format': 'records',
+            'page': 1,
+            'pageSize': self._vcd_config.task_query_page_size,
+            'filter': (
+                f'endDate=ge={finished_after.astimezone().isoformat(timespec="milliseconds")};'
+                '(objectType==vm,objectType==vApp)'
+            )
+        })
+        uri = f'{self._client.get_api_uri()}/query?{query}'
+        hrefs = {'vm': set(), 'vApp': set()}
+        while uri is not None:
+            result = await self._client.get_resource(uri)
+            if hasattr(result, 'TaskRecord'):
+                for task_record in result.TaskRecord:
+                    object_type = task_record.get('objectType')
+                    if object_type in hrefs:
+                        hrefs[object_type].add(task_record.get('object'))
+            uri = find_link_href(result, rel=RelationType.NEXT_PAGE.value)
+        return sorted(hrefs['vm']), sorted(hrefs['vApp'])
+
+    async def _get_vdc_titles(self) -> dict[str, str]:
+        """Получает названия vDC организации по их ID
+        из индекса иерархии, а при отсутствии - через query API."""
+        vdc_titles = self._hierarchy_index.get(constants.VDC_TITLES_INDEX_KEY)
+        if vdc_titles is None:
+            vdc_titles = await self._query_vdc_titles()
+            self._hierarchy_index.set(constants.VDC_TITLES_INDEX_KEY, vdc_titles)
+        return vdc_titles
+
+    async def _query_vdc_titles(self) -> dict[str, str]:
+        """Получает названия vDC организации по их ID через query API."""
+        query = urlencode({
+            'type': 'orgVdc',
+            'format': 'records',
+            'page': 1,
+            'pageSize': self._vcd_config.vm_query_page_size
+        })
+        uri = f'{self._client.get_api_uri()}/query?{query}'
+        vdc_titles = {}
+        while uri is not None:
+            result = await self._client.get_resource(uri)
+            if hasattr(result, 'OrgVdcRecord'):
+                for vdc_record in result.OrgVdcRecord:
+                    vdc_id = self._get_href_id(vdc_record.get('href'))
+                    vdc_titles[vdc_id] = vdc_record.get('name')
+            uri = find_link_href(result, rel=RelationType.NEXT_PAGE.value)
+        return vdc_titles
 
-    def _iterate_vdcs(self, org: Org) -> Iterable[VDC]:
-        """Итерация по VDC."""
-        for vdc_item in org.list_vdcs():
-            yield VDC(self._client, href=vdc_item['href'])
+    def _get_vm_inventory_item(
+            self,
+            vm_record: ObjectifiedElement,
+            *,
+            vdc_titles: dict[str, str]
+    ) -> dict:
+        """Переводит запись ВМ из query API в значения колонок инвентаря.
+        Объём дисков - суммарный объём хранилища, выделенный ВМ, в МБ."""
+        vdc_id = self._get_href_id(vm_record.get('vdc'))
+        return {
+            'vm_id': self._get_vm_record_id(vm_record),
+            'title': vm_record.get('name'),
+            'vdc_id': vdc_id,
+            'vdc_title': vdc_titles.get(vdc_id),
+            'vapp_id': self._get_href_id(vm_record.get('container'), prefix='vapp-'),
+            'vapp_title': vm_record.get('containerName'),
+            'power_status': vm_record.get('status'),
+            'cpu': self._get_record_int(vm_record, 'numberOfCpus'),
+            'ram': self._get_record_int(vm_record, 'memoryMB'),
+            'hdd': self._get_record_int(vm_record, 'totalStorageAllocatedMb'),
+        }
 
-    def _iterate_vapps(self, vdc: VDC) -> Iterable[VApp]:
-        """Итерация по vApp."""
-        for resource in vdc.list_resources():
-            if resource['type'] == 'application/vnd.vmware.vcloud.vApp+xml':
-                vapp_href = vdc.get_vapp_href(resource['name'])
-                yield VApp(self._client, href=vapp_href)
+    @staticmethod
+    def _get_href_id(href: str, *, prefix: str = '') -> str:
+        """Получает ID ресурса из последнего сегмента его ссылки."""
+        return href.rsplit('/', 1)[-1].removeprefix(prefix)
 
-    def _iterate_vms_resources(self) -> Iterable[ObjectifiedElement]:
-        """Итерация по ресурсам ВМ."""
-        org = self._get_client_org()
-        for vdc in self._iterate_vdcs(org):
-            for vapp in self._iterate_vapps(vdc):
-                for vm_resource in vapp.get_all_vms():
-                    yield vm_resource
+    @staticmethod
+    def _get_record_int(record: ObjectifiedElement, attribute: str) -> int | None:
+        """Получает целочисленный атрибут записи query API, если он есть."""
+        value = record.get(attribute)
+        return None if value is None else int(value)
 
     async def create_all_vm_statistics(self) -> None:
-        """Создаёт статистику потребления ресурсов
-        каждой ВМ, каждого vApp, каждого vDC."""
-        bulk_vm_statistics = {}
-        for vm_resource in self._iterate_vms_resources():
-            vm_id = extract_id(vm_resource.attrib['id'])
-            vm_name = extract_id(vm_resource.attrib['name'])
-            try:
-                vm_statistics = self.vm_get_current_usage(
-                    vm_id=vm_id
+        """Создаёт статистику потребления ресурсов каждой ВМ организации.
+        Метрики собираются фиксированным числом сборщиков из ограниченной
+        очереди записей ВМ с ограничением частоты запросов
+        и сохраняются пачками по мере получения,
+        после чего пересчитываются агрегаты затронутых интервалов."""
+        started_at = time.monotonic()
+        swept_from = datetime.now()
+        concurrency = self._vcd_config.statistics_concurrency
+        vm_records = asyncio.Queue(maxsize=concurrency)
+        rate_limiter = RateLimiter(rate=self._vcd_config.statistics_rate_limit)
+        batch = {}
+        tasks = [
+            asyncio.create_task(
+                self._enqueue_vm_records(vm_records, workers=concurrency)
+            ),
+            *(
+                asyncio.create_task(self._collect_vm_statistics_worker(
+                    vm_records,
+                    batch=batch,
+                    rate_limiter=rate_limiter
+                ))
+                for _ in range(concurrency)
+            )
+        ]
+        try:
+            swept, *worker_collected = await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+        collected = sum(worker_collected) + await self._save_vm_statistics(batch)
+        if collected:
+            async with self.session_lock:
+                await self._vm_repository.refresh_statistics_rollups(
+                    from_time=swept_from,
+                    to_time=datetime.now()
                 )
-            except VMPowerStateException:
-                continue
-            vm_model = await self._vm_repository.get_or_create(
-                vm_id=vm_id,
-                title=vm_name
+        logger.info(constants.VM_STATISTICS_SWEEP_FINISHED_MESSAGE, {
+            'duration': time.monotonic() - started_at,
+            'vms': swept,
+            'collected': collected,
+            'failed': swept - collected
+        })
+
+    async def _enqueue_vm_records(
+            self,
+            vm_records: asyncio.Queue,
+            *,
+            workers: int
+    ) -> int:
+        """Передаёт сборщикам записи включённых ВМ организации
+        и возвращает их количество. Очередь ограничена, поэтому
+        следующие страницы запрашиваются по мере сбора метрик.
+        В конце каждому сборщику передаётся `None`."""
+        count = 0
+        async for vm_record in self._iterate_vm_records():
+            # метрики есть только у включённых ВМ
+            if vm_record.get('status') == VMPowerStatus.POWERED_ON.name:
+                count += 1
+                await vm_records.put(vm_record)
+        for _ in range(workers):
+            await vm_records.put(None)
+        return count
+
+    async def _collect_vm_statistics_worker(
+            self,
+            vm_records: asyncio.Queue,
+            *,
+            batch: dict[str, tuple[str, list[dict[str, str]]]],
+            rate_limiter: RateLimiter
+    ) -> int:
+        """Собирает метрики ВМ из очереди до получения `None`,
+        добавляя их в общую пачку и сохраняя её при заполнении.
+        Возвращает количество сохранённых этим сборщиком ВМ."""
+        collected = 0
+        while True:
+            vm_record = await vm_records.get()
+            if vm_record is None:
+                return collected
+            vm_statistics = await self._collect_vm_statistics(
+                vm_record, rate_limiter=rate_limiter
             )
-            bulk_vm_statistics[vm_model.id] = vm_statistics
-        if bulk_vm_statistics:
-            await self._vm_repository.bulk_create_statistics(bulk_vm_statistics)
+            if vm_statistics is None:
+                continue
+            vm_id = self._get_vm_record_id(vm_record)
+            self._vm_usage_cache.set(vm_id, vm_statistics)
+            batch[vm_id] = (vm_record.get('name'), vm_statistics)
+            if len(batch) >= self._vcd_config.statistics_batch_size:
+                full_batch = dict(batch)
+                batch.clear()
+                collected += await self._save_vm_statistics(full_batch)
+
+    async def _save_vm_statistics(
+            self,
+            batch: dict[str, tuple[str, list[dict[str, str]]]]
+    ) -> int:
+        """Сохраняет пачку статистики ВМ и возвращает её размер.
+        Сбор метрик в это время продолжается, поэтому сессия БД
+        занимается под блокировкой, как и в работах пакета."""
+        if not batch:
+            return 0
+        async with self.session_lock:
+            vm_pks = await self._vm_repository.bulk_get_or_create_ids({
+                vm_id: vm_title for vm_id, (vm_title, _) in batch.items()
+            })
+            await self._vm_repository.bulk_create_statistics({
+                vm_pks[vm_id]: parse_vm_metrics(statistics)
+                for vm_id, (_, statistics) in batch.items()
+            })
+        return len(batch)
+
+    async def _collect_vm_statistics(
+            self,
+            vm_record: ObjectifiedElement,
+            *,
+            rate_limiter: RateLimiter
+    ) -> list[dict[str, str]] | None:
+        """Получает текущие метрики ВМ для статистики.
+        Ошибка одной ВМ не прерывает сбор, вместо метрик возвращается `None`."""
+        vm_href = vm_record.get('href')
+        await rate_limiter.wait()
+        token = self.get_client_token()
+        try:
+            try:
+                return await self._get_vm_current_metrics(vm_href)
+            except UnauthorizedException:
+                await self.reauth_client(rejected_token=token)
+                return await self._get_vm_current_metrics(vm_href)
+        except Exception:
+            logger.warning(constants.VM_STATISTICS_FAILED_MESSAGE, {
+                'vm_href': vm_href
+            }, exc_info=True)
+            return None
 
 
 class VCDController:
@@ -547,9 +1481,17 @@ class VCDController:
     def __init__(
             self,
             *,
+            vcd_config: VCDConfig,
             vcd_service: VCDService,
+            job_repository: JobRepository,
+            celery_application: Celery,
+            blocking_call_executor: BlockingCallExecutor,
     ) -> None:
+        self._vcd_config = vcd_config
         self._vcd_service = vcd_service
+        self._job_repository = job_repository
+        self._celery_application = celery_application
+        self._blocking_call_executor = blocking_call_executor
         self.job_types = {
             JobTypeEnum.VM_CREATE.value: self.vm_create,
             JobTypeEnum.VM_POWER_ON.value: self.vm_power_on,
@@ -567,10 +1509,167 @@ class VCDController:
     async def call_job_type_handler(
             self, params: VCDQueryParamsSchema
     ) -> str | None:
-        """Вызывает обработчик `JOB_TYPE`."""
-        job_type_handler: Callable = self.job_types[params.job_type]
+        """Вызывает обработчик `JOB_TYPE`, получая клиента из пула."""
         await self._vcd_service.setup_client()
-        return await job_type_handler(params)
+        try:
+            return await self._call_job_type_handler(params)
+        finally:
+            await self._vcd_service.close_client()
+
+    @staticmethod
+    def is_enqueueable(params: VCDQueryParamsSchema) -> bool:
+        """Проверяет, запрошено ли асинхронное выполнение изменяющей работы."""
+        return params.is_async and params.job_type in MUTATING_JOB_TYPES
+
+    async def enqueue_job_type_handler(self, params: VCDQueryParamsSchema) -> str:
+        """Ставит работу `JOB_TYPE` в очередь Celery
+        и возвращает идентификатор работы."""
+        job_model = await self._job_repository.create(
+            job_type=params.job_type,
+            vm_id=params.vm_id
+        )
+        await self._blocking_call_executor.run(
+            self._celery_application.send_task,
+            constants.CALL_JOB_TYPE_TASK,
+            kwargs={'job_id': job_model.id, 'params': params.to_dict()}
+        )
+        logger.info(constants.JOB_ENQUEUED_MESSAGE, {
+            'job_id': job_model.id,
+            'job_type': params.job_type
+        })
+        return job_model.id
+
+    async def call_enqueued_job_type_handler(
+            self, job_id: str, params: VCDQueryParamsSchema
+    ) -> None:
+        """Выполняет работу из очереди Celery и сохраняет её результат."""
+        await self._job_repository.set_running(job_id)
+        try:
+            response = await self.call_job_type_handler(params)
+        except BaseRawException as exception:
+            await self._job_repository.set_finished(
+                job_id,
+                status=JobStatusEnum.FAILED,
+                status_code=exception.status_code,
+                result=exception.content
+            )
+            return
+        except Exception:
+            logger.error(constants.UNHANDLED_ERROR_MESSAGE, exc_info=True)
+            await self._job_repository.set_finished(
+                job_id,
+                status=JobStatusEnum.FAILED,
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                result=constants.INTERNAL_SERVER_ERROR_MESSAGE
+            )
+            return
+        await self._job_repository.set_finished(
+            job_id,
+            status=JobStatusEnum.SUCCEEDED,
+            status_code=status.HTTP_200_OK,
+            result=constants.JOB_TYPE_WAS_SENT if response is None else response
+        )
+
+    async def list_statistics_vm_ids(
+            self, params: StatisticsQueryParamsSchema
+    ) -> list[str]:
+        """Получает ID ВМ, по которым запрошена история статистики."""
+        if params.vm_id is not None:
+            return [params.vm_id]
+        await self._vcd_service.setup_client()
+        try:
+            return await self._vcd_service.list_vapp_vm_ids(
+                vapp_title=params.vapp_title,
+                vdc_title=params.vdc_title
+            )
+        finally:
+            await self._vcd_service.close_client()
+
+    async def vm_get_power_statuses(
+            self, vm_ids: list[str]
+    ) -> dict[str, str | None]:
+        """Получает статусы нескольких ВМ в рамках одной сессии vCD."""
+        if len(vm_ids) > self._vcd_config.batch_max_size:
+            logger.error(constants.BATCH_TOO_LARGE_MESSAGE, {
+                'count': len(vm_ids)
+            })
+            raise QueryParamsException(
+                content=constants.BATCH_TOO_LARGE_MESSAGE,
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+        await self._vcd_service.setup_client()
+        token = self._vcd_service.get_client_token()
+        try:
+            try:
+                return await self._vcd_service.vm_get_power_statuses(vm_ids=vm_ids)
+            except UnauthorizedException:
+                await self._vcd_service.reauth_client(rejected_token=token)
+                return await self._vcd_service.vm_get_power_statuses(vm_ids=vm_ids)
+        finally:
+            await self._vcd_service.close_client()
+
+    async def call_job_type_handlers(
+            self, jobs: list[VCDJobSchema]
+    ) -> list[dict]:
+        """Вызывает обработчики пакета `JOB_TYPE` одновременно
+        в рамках одной сессии vCD и возвращает результат каждой работы."""
+        if len(jobs) > self._vcd_config.batch_max_size:
+            logger.error(constants.BATCH_TOO_LARGE_MESSAGE, {
+                'count': len(jobs)
+            })
+            raise QueryParamsException(
+                content=constants.BATCH_TOO_LARGE_MESSAGE,
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+        semaphore = asyncio.Semaphore(self._vcd_config.batch_concurrency)
+        await self._vcd_service.setup_client()
+        try:
+            return await asyncio.gather(*(
+                self._call_batch_job(job, semaphore=semaphore)
+                for job in jobs
+            ))
+        finally:
+            await self._vcd_service.close_client()
+
+    async def _call_batch_job(
+            self,
+            job: VCDJobSchema,
+            *,
+            semaphore: asyncio.Semaphore
+    ) -> dict:
+        """Вызывает обработчик работы из пакета,
+        превращая исключения в результат работы."""
+        result = {'JOB_TYPE': job.job_type, 'VM_ID': job.vm_id}
+        try:
+            params = job.to_query_params()
+            async with semaphore:
+                response = await self._call_job_type_handler(params)
+        except BaseRawException as exception:
+            result['status_code'] = exception.status_code
+            result['content'] = exception.content
+            return result
+        except Exception:
+            logger.error(constants.UNHANDLED_ERROR_MESSAGE, exc_info=True)
+            result['status_code'] = status.HTTP_500_INTERNAL_SERVER_ERROR
+            result['content'] = constants.INTERNAL_SERVER_ERROR_MESSAGE
+            return result
+        result['status_code'] = status.HTTP_200_OK
+        result['content'] = constants.JOB_TYPE_WAS_SENT if response is None else response
+        return result
+
+    async def _call_job_type_handler(
+            self, params: VCDQueryParamsSchema
+    ) -> str | list | None:
+        """Вызывает обработчик `JOB_TYPE` с уже полученным клиентом."""
+        job_type_handler: Callable = self.job_types[params.job_type]
+        token = self._vcd_service.get_client_token()
+        try:
+            return await job_type_handler(params)
+        except UnauthorizedException:
+            # сессия клиента из пула истекла между проверками,
+            # до vCD операция не дошла, поэтому её можно повторить
+            await self._vcd_service.reauth_client(rejected_token=token)
+            return await job_type_handler(params)
 
     async def vm_create(self, params: VCDQueryParamsSchema) -> None:
         """Создаёт ВМ."""
@@ -585,21 +1684,21 @@ class VCDController:
 
     async def vm_set_cpu(self, params: VCDQueryParamsSchema) -> None:
         """Устанавливает значение vCPU ВМ."""
-        self._vcd_service.vm_set_cpu(
+        await self._vcd_service.vm_set_cpu(
             vm_id=params.vm_id,
             cpu=params.cpu
         )
 
     async def vm_set_ram(self, params: VCDQueryParamsSchema) -> None:
         """Устанавливает значение vRAM ВМ."""
-        self._vcd_service.vm_set_ram(
+        await self._vcd_service.vm_set_ram(
             vm_id=params.vm_id,
             ram=params.ram
         )
 
     async def vm_set_hdd(self, params: VCDQueryParamsSchema) -> None:
         """Устанавливает значение vHDD ВМ."""
-        self._vcd_service.vm_set_hdd(
+        await self._vcd_service.vm_set_hdd(
             vm_id=params.vm_id,
             hdd=params.hdd,
             disk_number=params.disk_number
@@ -608,34 +1707,34 @@ class VCDController:
     async def vm_power_off(self, params: VCDQueryParamsSchema) -> None:
         """Выключает ВМ."""
         logger.debug('VM powering off')
-        self._vcd_service.vm_power_off(vm_id=params.vm_id)
+        await self._vcd_service.vm_power_off(vm_id=params.vm_id)
 
     async def vm_power_on(self, params: VCDQueryParamsSchema) -> None:
         """Включает ВМ."""
         logger.debug('VM powering on')
-        self._vcd_service.vm_power_on(vm_id=params.vm_id)
+        await self._vcd_service.vm_power_on(vm_id=params.vm_id)
 
     async def vm_power_reset(self, params: VCDQueryParamsSchema) -> None:
         """Сброс ВМ по питанию."""
         logger.debug('VM resetting power')
-        self._vcd_service.vm_power_reset(vm_id=params.vm_id)
+        await self._vcd_service.vm_power_reset(vm_id=params.vm_id)
 
     async def vm_create_snapshot(self, params: VCDQueryParamsSchema) -> None:
         """Создаёт снэпшот ВМ."""
         logger.debug('VM creating snapshot')
-        self._vcd_service.vm_create_snapshot(vm_id=params.vm_id)
+        await self._vcd_service.vm_create_snapshot(vm_id=params.vm_id)
 
     async def vm_get_power_status(self, params: VCDQueryParamsSchema) -> str:
         """Получение статуса ВМ."""
         logger.debug('VM getting power status')
-        return self._vcd_service.vm_get_power_status(vm_id=params.vm_id)
+        return await self._vcd_service.vm_get_power_status(vm_id=params.vm_id)
 
     async def vm_get_console_url(self, params: VCDQueryParamsSchema) -> str:
         """Получение ссылки на консоль ВМ."""
         logger.debug('VM getting console url')
-        return self._vcd_service.vm_get_console_url(vm_id=params.vm_id)
+        return await self._vcd_service.vm_get_console_url(vm_id=params.vm_id)
 
     async def vm_get_current_usage(self, params: VCDQueryParamsSchema) -> list[dict]:
         """Получает текущее использование VCDQueryParamsSchema ВМ."""
         logger.debug('VM getting current usage')
-        return self._vcd_service.vm_get_current_usage(vm_id=params.vm_id)
+        return await self._vcd_service.vm_get_current_usage(vm_id=params.vm_id)
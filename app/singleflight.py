@@ -0,0 +1,31 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """Объединение одновременных одинаковых вызовов процесса:
+    пока вызов по ключу выполняется, остальные вызовы
+    с тем же ключом дожидаются его результата.
+    Вызов выполняется отдельной задачей, поэтому отмена
+    любого из ожидающих, в том числе первого, не отменяет его
+    для остальных."""
+
+    def __init__(self) -> None:
+        self._tasks: dict[Hashable, asyncio.Task] = {}
+
+    async def run(self, key: Hashable, function: Callable[[], Awaitable]) -> Any:
+        """Выполняет функцию или присоединяется к уже выполняемому вызову."""
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.create_task(function())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._finish(key, task))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        """Забывает завершённый вызов."""
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # все ожидавшие могли быть отменены и не забрать исключение
+        if not task.cancelled():
+            task.exception()
@@ -1,15 +1,25 @@
 import asyncio
+import datetime
+import logging
 from typing import Awaitable, Protocol
 
+from celery import Celery
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker
 
+from app.api.v1.schemas.vcd import VCDJobSchema
+from app.core.settings import constants
+from app.core.settings.config import StatisticsConfig
 from app.repositories import (
+    JobRepository,
     VMRepository,
     SettingsRepository,
-    TemplateCatalogRepository
+    TemplateCatalogRepository,
+    VCDTaskRepository
 )
-from app.service import VCDService
+from app.service import VCDService, VCDController
+
+logger = logging.getLogger(__name__)
 
 
 class SettingsRepositoryProtocol(Protocol):
@@ -46,33 +56,227 @@ class VCDServiceProtocol(Protocol):
             *,
             settings_repository: SettingsRepository,
             template_catalog_repository: TemplateCatalogRepository,
-            vm_repository: VMRepository
+            vm_repository: VMRepository,
+            vcd_task_repository: VCDTaskRepository
     ) -> Awaitable[VCDService]:
         ...
 
 
-def create_all_vm_statistics(
+class VCDTaskRepositoryProtocol(Protocol):
+
+    def __call__(
+            self,
+            session: AsyncSession
+    ) -> Awaitable[VCDTaskRepository]:
+        ...
+
+
+class JobRepositoryProtocol(Protocol):
+
+    def __call__(
+            self,
+            session: AsyncSession
+    ) -> Awaitable[JobRepository]:
+        ...
+
+
+class VCDControllerProtocol(Protocol):
+
+    def __call__(
+            self,
+            *,
+            vcd_service: VCDService,
+            job_repository: JobRepository,
+            celery_application: Celery
+    ) -> Awaitable[VCDController]:
+        ...
+
+
+async def _provide_vcd_service(
+        session: AsyncSession,
         *,
-        session_provider: sessionmaker,
         settings_repository_provider: SettingsRepositoryProtocol,
         template_catalog_repository_provider: TemplateCatalogRepositoryProtocol,
         vm_repository_provider: VMRepositoryProtocol,
+        vcd_task_repository_provider: VCDTaskRepositoryProtocol,
         vcd_service_provider: VCDServiceProtocol,
+) -> VCDService:
+    """Создаёт сервис vCD в рамках сессии БД."""
+    vm_repository = await vm_repository_provider(session)
+    vcd_task_repository = await vcd_task_repository_provider(session)
+    template_catalog_repository = await template_catalog_repository_provider(session)
+    settings_repository = await settings_repository_provider(session)
+    return await vcd_service_provider(
+        settings_repository=settings_repository,
+        template_catalog_repository=template_catalog_repository,
+        vm_repository=vm_repository,
+        vcd_task_repository=vcd_task_repository
+    )
+
+
+def _run(coroutine: Awaitable) -> None:
+    """Выполняет корутину в цикле событий процесса Celery."""
+    loop = asyncio.get_event_loop_policy().get_event_loop()
+    loop.run_until_complete(coroutine)
+
+
+def create_all_vm_statistics(
+        *,
+        session_provider: sessionmaker,
+        **providers
 ) -> None:
     """Запускает скрипт для сбора статистики потребления ресурсов ВМ."""
 
     async def execute() -> None:
+        async with session_provider() as session:
+            vcd_service = await _provide_vcd_service(session, **providers)
+            await vcd_service.setup_client()
+            try:
+                await vcd_service.create_all_vm_statistics()
+            finally:
+                await vcd_service.close_client()
+
+    _run(execute())
+
+
+def renew_vcd_api_jwt(
+        *,
+        session_provider: sessionmaker,
+        **providers
+) -> None:
+    """Заранее обновляет JWT vCD до истечения его срока."""
+
+    async def execute() -> None:
+        async with session_provider() as session:
+            vcd_service = await _provide_vcd_service(session, **providers)
+            await vcd_service.renew_api_jwt()
+
+    _run(execute())
+
+
+def maintain_vm_statistics_partitions(
+        *,
+        session_provider: sessionmaker,
+        vm_repository_provider: VMRepositoryProtocol,
+        statistics_config: StatisticsConfig,
+        **providers
+) -> None:
+    """Заранее создаёт секции статистики ВМ
+    и удаляет секции старше срока хранения."""
+
+    async def execute() -> None:
+        today = datetime.date.today()
         async with session_provider() as session:
             vm_repository = await vm_repository_provider(session)
-            template_catalog_repository = await template_catalog_repository_provider(session)
-            settings_repository = await settings_repository_provider(session)
-            vcd_service = await vcd_service_provider(
-                settings_repository=settings_repository,
-                template_catalog_repository=template_catalog_repository,
-                vm_repository=vm_repository
+            await vm_repository.create_statistics_partitions(
+                from_date=today,
+                to_date=today + datetime.timedelta(
+                    days=statistics_config.partitions_ahead_days
+                )
+            )
+            dropped_partitions = await vm_repository.drop_statistics_partitions(
+                before_date=today - datetime.timedelta(
+                    days=statistics_config.retention_days
+                )
             )
+        if dropped_partitions:
+            logger.info(constants.VM_STATISTICS_PARTITIONS_DROPPED_MESSAGE, {
+                'partitions': dropped_partitions
+            })
+
+    _run(execute())
+
+
+def backfill_vm_statistics_rollups(
+        from_date: str,
+        to_date: str,
+        *,
+        session_provider: sessionmaker,
+        vm_repository_provider: VMRepositoryProtocol,
+        **providers
+) -> None:
+    """Пересчитывает агрегаты статистики ВМ за период
+    с `from_date` по `to_date` включительно, по одному дню за раз."""
+
+    async def execute() -> None:
+        day = datetime.date.fromisoformat(from_date)
+        last_day = datetime.date.fromisoformat(to_date)
+        async with session_provider() as session:
+            vm_repository = await vm_repository_provider(session)
+            while day <= last_day:
+                from_time = datetime.datetime.combine(day, datetime.time())
+                await vm_repository.refresh_statistics_rollups(
+                    from_time=from_time,
+                    to_time=from_time + datetime.timedelta(days=1)
+                )
+                logger.info(constants.VM_STATISTICS_ROLLUPS_BACKFILLED_MESSAGE, {
+                    'day': day.isoformat()
+                })
+                day += datetime.timedelta(days=1)
+
+    _run(execute())
+
+
+def poll_vcd_tasks(
+        *,
+        session_provider: sessionmaker,
+        **providers
+) -> None:
+    """Пакетно опрашивает vCD о состоянии задач операций над ВМ."""
+
+    async def execute() -> None:
+        async with session_provider() as session:
+            vcd_service = await _provide_vcd_service(session, **providers)
             await vcd_service.setup_client()
-            await vcd_service.create_all_vm_statistics()
+            try:
+                await vcd_service.poll_vcd_tasks()
+            finally:
+                await vcd_service.close_client()
 
-    loop = asyncio.get_event_loop_policy().get_event_loop()
-    loop.run_until_complete(execute())
+    _run(execute())
+
+
+def sync_vm_inventory(
+        *,
+        session_provider: sessionmaker,
+        **providers
+) -> None:
+    """Синхронизирует локальный инвентарь ВМ с vCD."""
+
+    async def execute() -> None:
+        async with session_provider() as session:
+            vcd_service = await _provide_vcd_service(session, **providers)
+            await vcd_service.setup_client()
+            try:
+                await vcd_service.sync_vm_inventory()
+            finally:
+                await vcd_service.close_client()
+
+    _run(execute())
+
+
+def call_job_type(
+        job_id: str,
+        params: dict,
+        *,
+        session_provider: sessionmaker,
+        job_repository_provider: JobRepositoryProtocol,
+        vcd_controller_provider: VCDControllerProtocol,
+        celery_application: Celery,
+        **providers
+) -> None:
+    """Выполняет работу `JOB_TYPE`, поставленную в очередь API."""
+
+    async def execute() -> None:
+        async with session_provider() as session:
+            vcd_service = await _provide_vcd_service(session, **providers)
+            vcd_controller = await vcd_controller_provider(
+                vcd_service=vcd_service,
+                job_repository=await job_repository_provider(session),
+                celery_application=celery_application
+            )
+            await vcd_controller.call_enqueued_job_type_handler(
+                job_id, VCDJobSchema(**params).to_query_params()
+            )
+
+    _run(execute())
@@ -1,8 +1,16 @@
+import datetime
 import logging
 import re
+from decimal import Decimal
+from urllib.parse import quote_plus
+
+from app.core.settings import constants
 
 logger = logging.getLogger(__name__)
 
+# начало отсчёта интервалов агрегатов, совпадает с SQL агрегации
+TIME_BUCKET_ORIGIN = datetime.datetime(2000, 1, 1)
+
 
 def get_vm_console_query_params(query: str) -> tuple:
     """Извлекает параметры запроса для
@@ -22,3 +30,86 @@ def get_vm_console_link(
 ) -> str:
     """Формирует ссылку на консоль управления ВМ"""
     return f'{hostname}/console?host={host}&port={port}&ticket={ticket}'
+
+
+def chunk_query_filter(
+        conditions: list[str],
+        *,
+        max_size: int,
+        max_length: int
+) -> list[str]:
+    """Объединяет условия query API vCD через ИЛИ в фильтры `(a,b,...)`,
+    каждый из которых содержит не больше `max_size` условий
+    и в закодированном для ссылки виде не длиннее `max_length`."""
+    filters = []
+    chunk = []
+    length = len(quote_plus('()'))
+    for condition in conditions:
+        condition_length = len(quote_plus(f'{condition},'))
+        if chunk and (len(chunk) >= max_size or length + condition_length > max_length):
+            filters.append('(' + ','.join(chunk) + ')')
+            chunk, length = [], len(quote_plus('()'))
+        chunk.append(condition)
+        length += condition_length
+    if chunk:
+        filters.append('(' + ','.join(chunk) + ')')
+    return filters
+
+
+def parse_vm_metrics(metrics: list[dict[str, str]]) -> dict:
+    """Разбирает текущие метрики ВМ в значения колонок `vm_statistics`.
+    Метрики без отдельной колонки остаются списком в `statistics`."""
+    row = dict.fromkeys(constants.VM_METRIC_COLUMNS.values())
+    unknown_metrics = []
+    for metric in metrics:
+        column = constants.VM_METRIC_COLUMNS.get(metric['metric_name'])
+        if column is None or metric['value'] is None:
+            unknown_metrics.append(metric)
+            continue
+        value = float(metric['value'])
+        row[column] = (
+            int(value) if column in constants.VM_METRIC_INTEGER_COLUMNS
+            else value
+        )
+    row['statistics'] = unknown_metrics or None
+    return row
+
+
+def floor_time(
+        time: datetime.datetime,
+        interval: datetime.timedelta
+) -> datetime.datetime:
+    """Округляет время вниз до начала интервала."""
+    return time - (time - TIME_BUCKET_ORIGIN) % interval
+
+
+def ceil_time(
+        time: datetime.datetime,
+        interval: datetime.timedelta
+) -> datetime.datetime:
+    """Округляет время вверх до начала следующего интервала."""
+    floored_time = floor_time(time, interval)
+    return floored_time if floored_time == time else floored_time + interval
+
+
+def format_vm_metrics(row: dict) -> list[dict[str, str]]:
+    """Собирает текущие метрики ВМ из значений колонок `vm_statistics`,
+    обратно `parse_vm_metrics`."""
+    metrics = [
+        {
+            'metric_name': metric_name,
+            'unit': constants.VM_METRIC_UNITS[metric_name],
+            'value': _format_vm_metric_value(row[column], column=column)
+        }
+        for metric_name, column in constants.VM_METRIC_COLUMNS.items()
+        if row[column] is not None
+    ]
+    return metrics + (row['statistics'] or [])
+
+
+def _format_vm_metric_value(value: float, *, column: str) -> str:
+    """Форматирует значение метрики в десятичной записи, как её отдаёт vCD.
+    Значения REAL округляются до 7 значащих цифр - точности колонки."""
+    if column in constants.VM_METRIC_INTEGER_COLUMNS:
+        return str(int(value))
+    return format(Decimal(f'{value:.7g}'), 'f')